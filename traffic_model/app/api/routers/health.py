@@ -1,8 +1,41 @@
 from fastapi import APIRouter
 
+from app.api.services import gating, raw_ingest, stream_hub, workers
+from app.api.services.rendering import get_upload_sampler
+from infra.adapters import backend_client, cctv_stream, stream_url
+from infra.configs.settings import BATCH_ENABLED
+from vision.inference.batching import get_batch_scheduler
+from vision.inference.registry import get_shared_engine
+
 router = APIRouter()
 
 
 @router.get("")
 def health():
     return {"status": "up"}
+
+
+@router.get("/inference")
+def inference_stats():
+    """
+    배치 추론 스케줄러 상태 (큐 길이, 배치 크기 분포, 요청별 대기시간),
+    카메라별 트래커 세션 수, 워커 풀 대기 작업 수, 모션 게이트 결정 분포,
+    스트림별 디코딩 fps / 버린 프레임 / 재연결 횟수, 스트림 허브 채널별 구독자 수,
+    raw 프레임 ingest 연결/프레임/busy 수
+    """
+    engine = get_shared_engine()
+    base = {
+        "engine": engine.name,
+        "trackers": engine.trackers.snapshot(),
+        "workers": workers.snapshot(),
+        "backend": backend_client.snapshot(),
+        "motion_gate": gating.snapshot(),
+        "annotated_upload": get_upload_sampler().snapshot(),
+        "streams": cctv_stream.snapshot(),
+        "stream_url": stream_url.snapshot(),
+        "stream_hub": stream_hub.snapshot(),
+        "raw_ingest": raw_ingest.snapshot(),
+    }
+    if not BATCH_ENABLED:
+        return {"batching": False, **base}
+    return {"batching": True, **base, **get_batch_scheduler().snapshot()}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.services.raw_ingest import RawIngestSession
+
+router = APIRouter()
+
+
+@router.websocket("/ws")
+async def ingest_ws(websocket: WebSocket):
+    """
+    raw 프레임 ingest (JPEG + multipart /analyze/frame 대체)
+    바이너리 메시지 하나 = 프레임 하나 (형식은 app/api/services/raw_protocol.py), 프레임마다 JSON ack
+    연결을 유지한 채로 계속 보내면 되고, 한 연결로 여러 카메라를 섞어 보내도 됨
+    """
+    await websocket.accept()
+    session = RawIngestSession(websocket.send_json, "websocket")
+    try:
+        while True:
+            msg = await websocket.receive()
+            if msg["type"] == "websocket.disconnect":
+                break
+            data = msg.get("bytes")
+            if data is None:
+                await websocket.send_json({"ok": False, "error": "바이너리 메시지만 받습니다"})
+                continue
+            await session.handle(data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
@@ -2,31 +2,37 @@
 
 
 import asyncio
-import base64
 import os
 import time
-from datetime import datetime, timezone
 from typing import List, Optional, Tuple, Dict, Any
 import torch
 
 import cv2
 import numpy as np
-import requests
 from PIL import ImageFont, ImageDraw, Image
 from fastapi import APIRouter, Query, HTTPException, WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketDisconnect, WebSocketState
 from fastapi.responses import StreamingResponse
 
-from infra.adapters.cctv_stream import FrameStream
-from vision.inference.engines.yolo_ultralytics import YOLOEngine
-from vision.pipelines.preprocess import enhance_frame
+from infra.adapters.backend_client import get_backend_client
+from infra.adapters.stream_url import StreamUrlError, get_stream_url_resolver
+from infra.monitoring import metrics
+from vision.pipelines.preprocess import enhance_frame, prepare_for_inference, rescale_detections
 from vision.pipelines.postprocess import summarize_tracks
+from vision.pipelines.roi import bbox_centers, points_in_polygon
 from infra.configs.roi_store import get_roi_polygon
 
-from app.api.services.frame_analysis import analyze_np_frame
+from app.api.services.frame_analysis import annotate_predictions
+from app.api.services.gating import gated_predict
+from app.api.services.workers import PoolSaturated, run_cpu, run_inference
+from app.api.services import view_protocol
+from app.api.services.rendering import RENDER_CLIENT, resolve_render_mode
+from app.api.services.stream_hub import HubClosed, HubFrame, StreamHub
+from vision.inference.registry import get_shared_engine
 
 
 router = APIRouter(prefix="/view", tags=["view"])
+_ENGINE = get_shared_engine()
 
 # 한글 폰트 캐시
 _FONT: Optional[ImageFont.FreeTypeFont] = None
@@ -38,12 +44,6 @@ BACKEND_BASE = os.getenv("BACKEND_BASE", "http://backend:3001")
 TARGET_FPS: float = 30.0
 _FRAME_INTERVAL: float = 1.0 / TARGET_FPS
 
-# cctv_id -> (url, expires_at)
-_STREAM_URL_CACHE: Dict[int, Tuple[str, float]] = {}
-_CACHE_TTL_SECONDS: float = 60.0  # 또는 backend의 cachedUntil을 사용할 수 있으면 그걸로
-_BACKOFF_SECONDS_ON_429: float = 30.0
-_LAST_429_AT: Dict[int, float] = {}  # cctv_id -> last 429 timestamp
-
 # gpu 환경인지 cpu 환경인지 판단을 위한 상수
 # GPU 자동 감지: CUDA가 있으면 True, 없으면 False
 try:
@@ -58,125 +58,26 @@ else:
     GPU_ENABLED = gpu_available  # 자동 감지값 사용
 
 
-def _get_stream_url_from_backend(cctv_id: int) -> str:
-    """
-    backend의 CCTV 스트림 API(/api/cctv/:id/stream)를 통해
-    cctvStreamResolver가 해석한 실제 스트림 URL(HLS 등)을 조회한다.
-    """
-    now = time.time()
-
-    # 1) 429 직후에는 일정 시간 동안 바로 재시도하지 않기 (백오프)
-    last_429 = _LAST_429_AT.get(cctv_id)
-    if last_429 is not None and now - last_429 < _BACKOFF_SECONDS_ON_429:
-        raise HTTPException(
-            status_code=503,
-            detail=f"cctv_id={cctv_id} 스트림 조회가 잠시 제한되었습니다. 잠시 후 다시 시도해주세요.",
-        )
-
-    # 2) 캐시에 유효한 url 있으면 재사용
-    cached = _STREAM_URL_CACHE.get(cctv_id)
-    if cached is not None:
-        url, expires_at = cached
-        if now < expires_at:
-            return url
-        else:
-            # 만료된 캐시는 제거
-            _STREAM_URL_CACHE.pop(cctv_id, None)
-
-    # 3) 백엔드에 요청
-    try:
-        resp = requests.get(
-            f"{BACKEND_BASE}/api/cctv/{cctv_id}/stream", timeout=2.0
-        )
-        resp.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        # 429 인 경우 -> 백오프 시간 기록
-        if resp is not None and resp.status_code == 429:
-            _LAST_429_AT[cctv_id] = now
-        raise HTTPException(
-            status_code=502,
-            detail=f"backend CCTV 스트림 API 호출 실패: {e}",
-        ) from e
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"backend CCTV 스트림 API 호출 실패: {e}",
-        ) from e
-
-    payload = resp.json()
-
-    # { success: true, data: { cctv, streamUrl, cachedUntil } }
-    if not payload.get("success"):
-        raise HTTPException(
-            status_code=502,
-            detail=f"backend CCTV 스트림 API 응답 오류: {payload.get('message', 'unknown error')}",
-        )
-
-    data = payload.get("data") or {}
-    url = data.get("streamUrl")
-    if not url:
-        raise HTTPException(
-            status_code=502,
-            detail=f"cctv_id={cctv_id}에 대한 streamUrl이 없습니다.",
-        )
-
-    # backend에서 cachedUntil 제공한다면, TTL로 사용
-    cached_until = data.get("cachedUntil")
-    if cached_until is not None:
-        # 숫자(UNIX timestamp)인 경우
-        if isinstance(cached_until, (int, float)):
-            expires_at = float(cached_until)
-        # 문자열(예: "2025-11-23T21:50:20.474Z")인 경우
-        elif isinstance(cached_until, str):
-            try:
-                # 'Z' -> '+00:00' 으로 바꿔서 UTC로 파싱
-                dt = datetime.fromisoformat(
-                    cached_until.replace("Z", "+00:00"))
-                expires_at = dt.replace(tzinfo=timezone.utc).timestamp()
-            except ValueError:
-                # 파싱 실패 시 기본 TTL 사용
-                expires_at = time.time() + _CACHE_TTL_SECONDS
-        else:
-            # 예상치 못한 타입이면 기본 TTL 사용
-            expires_at = time.time() + _CACHE_TTL_SECONDS
-    else:
-        expires_at = time.time() + _CACHE_TTL_SECONDS
-
-    _STREAM_URL_CACHE[cctv_id] = (url, expires_at)
-
-    return url
-
-
 def _send_detection_to_backend(
     cctv_id: int,
     preds: List[dict],
     roi_polygon: Optional[np.ndarray],
 ) -> None:
-    """모델에서 검출 결과를 백엔드로 전송 (실시간 시각화와 통계용)"""
-    try:
-        payload = {
-            "cctvId": cctv_id,
-            "timestamp": time.time(),
-            "detections": [
-                {
-                    "cls": d["cls"],
-                    "conf": d["conf"],
-                    "bbox": d["bbox"],
-                }
-                for d in preds
-            ],
-            "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None,
-        }
-        requests.post(
-            f"{BACKEND_BASE}/api/detection",
-            json=payload,
-            timeout=0.5,
-        )
-        # 디버깅용 로그
-        print(
-            f"[stream_view] backend 전송 완료: cctv_id={cctv_id}, count={len(preds)}")
-    except Exception as e:
-        print("[stream_view] 객체 검출 결과 전송 실패:", e)
+    """모델에서 검출 결과를 백엔드로 전송 (실시간 시각화와 통계용) - 대기열에 넣고 바로 반환"""
+    payload = {
+        "cctvId": cctv_id,
+        "timestamp": time.time(),
+        "detections": [
+            {
+                "cls": d["cls"],
+                "conf": d["conf"],
+                "bbox": d["bbox"],
+            }
+            for d in preds
+        ],
+        "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None,
+    }
+    get_backend_client(BACKEND_BASE).submit_detection(payload)
 
 
 def _load_korean_font(font_size: int = 20) -> ImageFont.FreeTypeFont:
@@ -226,59 +127,48 @@ def draw_text_korean(
     return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
 
 
-def _is_inside_polygon(cx: float, cy: float, polygon: np.ndarray) -> bool:
-    result: float = cv2.pointPolygonTest(polygon, (cx, cy), False)
-    return result >= 0.0
-
-
-def _process_frame(
+def _render_frame(
     frame: np.ndarray,
-    font: ImageFont.FreeTypeFont,
+    annotated: Optional[np.ndarray],
+    preds: List[dict],
     roi_polygon: Optional[np.ndarray],
     cctv_id: int,
+    draw: bool = True,
 ) -> Tuple[np.ndarray, Optional[np.ndarray], List[dict]]:
     """
-    한 프레임에 대해:
+    추론 결과를 받아:
     - ROI 갱신/시각화
-    - YOLO 추론 + ROI 필터링
-    - vis_frame에 bbox/라벨/센터점까지 그린 결과
-    를 반환
+    - ROI 필터링
+    - vis_frame에 bbox/라벨/센터점까지 그린 결과 (draw=False 면 원본 프레임 그대로)
+    를 반환 (frame/annotated 모두 BGR)
     """
-    vis_frame = frame.copy()
-
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    preds, annotated_bytes = analyze_np_frame(rgb)
-
-    annotated_np = cv2.imdecode(
-        np.frombuffer(annotated_bytes, dtype=np.uint8),
-        cv2.IMREAD_COLOR,
-    )
-
-    if annotated_np is not None:
-        vis_frame = annotated_np
+    if not draw:
+        vis_frame = frame
+    elif annotated is not None:
+        # annotate_predictions 가 이미 복사본에 그렸으므로 그대로 사용
+        vis_frame = annotated
+    else:
+        vis_frame = frame.copy()
 
     # 1) ROI 갱신
     if roi_polygon is None:
         roi_polygon = get_roi_polygon(cctv_id)
 
     # 2) ROI 시각화
-    if roi_polygon is not None:
-        overlay = vis_frame.copy()
-        cv2.fillPoly(overlay, [roi_polygon], (0, 255, 0))
-        vis_frame = cv2.addWeighted(overlay, 0.2, vis_frame, 0.8, 0.0)
-        cv2.polylines(vis_frame, [roi_polygon], True, (0, 255, 0), 2)
-
-    # 5) ROI 안의 디텍션만 사용 + 박스/라벨 그리기
-    filtered: List[dict] = []
-    for d in preds:
-        x1, y1, x2, y2 = map(int, d["bbox"])
-        cx = (x1 + x2) / 2.0
-        cy = (y1 + y2) / 2.0
-
-        if roi_polygon is not None and not _is_inside_polygon(cx, cy, roi_polygon):
-            continue
-
-        filtered.append(d)
+    if draw and roi_polygon is not None:
+        with metrics.stage("render"):
+            overlay = vis_frame.copy()
+            cv2.fillPoly(overlay, [roi_polygon], (0, 255, 0))
+            vis_frame = cv2.addWeighted(overlay, 0.2, vis_frame, 0.8, 0.0)
+            cv2.polylines(vis_frame, [roi_polygon], True, (0, 255, 0), 2)
+
+    # 5) ROI 안의 디텍션만 사용 (중심점 배열을 한 번에 판정)
+    filtered: List[dict] = preds
+    if roi_polygon is not None and preds:
+        with metrics.stage("roi_filter"):
+            inside = points_in_polygon(
+                bbox_centers([d["bbox"] for d in preds]), roi_polygon)
+            filtered = [d for d, ok in zip(preds, inside.tolist()) if ok]
 
     # 요약 정보 로그
     if filtered:
@@ -288,67 +178,233 @@ def _process_frame(
     return vis_frame, roi_polygon, filtered
 
 
+async def _process_frame(
+    frame: np.ndarray,
+    font: ImageFont.FreeTypeFont,
+    roi_polygon: Optional[np.ndarray],
+    cctv_id: int,
+    draw: bool = True,
+) -> Tuple[np.ndarray, Optional[np.ndarray], List[dict]]:
+    """
+    한 프레임에 대해 전처리(cpu 풀) + YOLO 추론(추론 풀) + 시각화/ROI 필터링(cpu 풀)을 수행.
+    추론 스레드에서는 engine.predict 만 돌림 (analysis.analyze_image 와 같은 분할)
+    draw=False(render=client)면 그리지 않고 원본 프레임과 검출 결과만 돌려준다.
+    풀이 포화 상태면 PoolSaturated 가 올라가므로 호출 쪽에서 프레임을 버리면 된다.
+    """
+    # FrameStream/imdecode 프레임은 BGR 이고 모델/시각화도 BGR 기준이므로 색 변환 없이 그대로 사용
+    async def _detect():
+        x, scale = await run_cpu(prepare_for_inference, frame)
+        preds = await run_inference(_ENGINE.predict, x, cctv_id)
+        return rescale_detections(preds, scale)
+
+    # 움직임이 없으면 추론을 건너뛰고 직전 결과를 현재 프레임 위에 다시 그림
+    preds, _ = await gated_predict(cctv_id, frame, _detect)
+    annotated: Optional[np.ndarray] = None
+    if draw:
+        annotated = await run_cpu(metrics.timed("render", annotate_predictions), frame, preds)
+    return await run_cpu(_render_frame, frame, annotated, preds, roi_polygon, cctv_id, draw)
+
+
+def _encode_jpeg(vis_frame: np.ndarray) -> Optional[bytes]:
+    ok, jpg = cv2.imencode(".jpg", vis_frame)
+    if not ok:
+        return None
+    return jpg.tobytes()
+
+
+def _scale_polygon(polygon: Optional[np.ndarray], scale: float) -> Optional[np.ndarray]:
+    if polygon is None:
+        return None
+    return np.round(polygon * scale).astype(polygon.dtype)
+
+
+def _scale_preds(preds: List[dict], scale: float) -> List[dict]:
+    return [{**d, "bbox": [v * scale for v in d["bbox"]]} for d in preds]
+
+
+async def _resolve_stream_url(cctv_id: int) -> str:
+    """
+    backend의 CCTV 스트림 API(/api/cctv/:id/stream)를 통해
+    cctvStreamResolver가 해석한 실제 스트림 URL(HLS 등)을 조회한다. (캐시/동시 조회 합치기는 stream_url 참고)
+    """
+    try:
+        url = await get_stream_url_resolver(BACKEND_BASE).resolve(cctv_id)
+    except StreamUrlError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+    print(f"[detections_ws] stream url: {url}")
+    return url
+
+
+async def _process_hub_frame(
+    cctv_id: int,
+    frame: np.ndarray,
+    roi_polygon: Optional[np.ndarray],
+    draw: bool,
+    raw: bool,
+    scale: float = 1.0,
+) -> HubFrame:
+    """
+    허브 채널에서 프레임마다 한 번: 추론 + ROI 필터링 + 백엔드 전송 + JPEG 인코딩
+    draw: render=server 구독자가 있으면 시각화한 JPEG, raw: render=client 구독자가 있으면 원본 JPEG
+    scale: 축소 디코딩(STREAM_DECODE_WIDTH) 비율. 시청자에게는 축소 프레임 좌표, 백엔드에는 원본 좌표로 보냄
+    """
+    now = time.time()
+    metrics.bind_camera(cctv_id)
+    if roi_polygon is None and scale != 1.0:
+        roi_polygon = _scale_polygon(get_roi_polygon(cctv_id), scale)
+    vis_frame, roi_polygon, filtered = await _process_frame(
+        frame, _load_korean_font(20), roi_polygon, cctv_id, draw)
+    if filtered:
+        if scale != 1.0:
+            _send_detection_to_backend(
+                cctv_id, _scale_preds(filtered, 1.0 / scale), _scale_polygon(roi_polygon, 1.0 / scale))
+        else:
+            _send_detection_to_backend(cctv_id, filtered, roi_polygon)
+
+    encode = metrics.timed("encode", _encode_jpeg)
+    annotated_jpeg = await run_cpu(encode, vis_frame) if draw else None
+    raw_jpeg = await run_cpu(encode, frame) if raw else None
+    return HubFrame(now, filtered, roi_polygon, annotated_jpeg, raw_jpeg)
+
+
+_HUB = StreamHub(_resolve_stream_url, _process_hub_frame, target_fps=TARGET_FPS)
+
+
+class _ViewSender:
+    """
+    /view/ws 연결 하나의 전송 상태 (형식은 view_protocol 참고)
+    - json: 기존 형식 그대로
+    - binary: JPEG 바이트 + 압축한 detections, ROI 는 바뀔 때만
+    """
+
+    def __init__(self, websocket: WebSocket, fmt: str) -> None:
+        self.websocket = websocket
+        self.format = fmt
+        self.seq = 0
+        self.classes: List[str] = list(get_shared_engine().want)
+        self.class_index: Dict[str, int] = {c: i for i, c in enumerate(self.classes)}
+        self._roi_sent = False
+        self._last_roi: Optional[np.ndarray] = None
+
+    async def start(self) -> None:
+        if self.format == view_protocol.FORMAT_BINARY:
+            await self.websocket.send_json(view_protocol.hello_message(self.classes))
+
+    async def send(
+        self,
+        timestamp: float,
+        jpeg: bytes,
+        detections: List[dict],
+        roi_polygon: Optional[np.ndarray],
+    ) -> None:
+        if self.format == view_protocol.FORMAT_JSON:
+            await self.websocket.send_json(
+                view_protocol.json_message(timestamp, jpeg, detections, roi_polygon))
+            return
+
+        if not self._roi_sent or not _same_roi(self._last_roi, roi_polygon):
+            await self.websocket.send_json(view_protocol.roi_message(roi_polygon))
+            self._roi_sent = True
+            self._last_roi = roi_polygon
+        await self.websocket.send_bytes(
+            view_protocol.pack_frame(timestamp, self.seq, jpeg, detections, self.class_index))
+        self.seq += 1
+
+
+def _same_roi(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return a is b or np.array_equal(a, b)
+
+
 @router.websocket("/ws")
-async def view_ws(websocket: WebSocket, cctv_id: int = Query(..., ge=1), mode: str | None = Query(None),):
+async def view_ws(
+    websocket: WebSocket,
+    cctv_id: int = Query(..., ge=1),
+    mode: str | None = Query(None),
+    fmt: str = Query(view_protocol.FORMAT_JSON, alias="format"),
+    render: str | None = Query(None),
+):
     """
     WebSocket 기반 실사용 스트림:
-    - 모델이 처리한 프레임(JPEG) + detections + ROI를 JSON으로 전송.
+    - 모델이 처리한 프레임(JPEG) + detections + ROI를 전송.
+    - format=json(기본): 기존 JSON(data URL) 형식, format=binary: JPEG 바이너리 + 압축 메타데이터
+    - render=client: 서버에서 bbox/ROI 를 그리지 않고 원본 프레임 + detections + ROI 좌표만 전송
     - 프론트는 이 데이터를 canvas에 바로 그려 사용.
     """
     await websocket.accept()
+    if fmt not in view_protocol.FORMATS:
+        await websocket.send_json({"error": f"지원하지 않는 format: {fmt}"})
+        await websocket.close(code=1008, reason="unsupported format")
+        return
+    try:
+        draw = resolve_render_mode(render) != RENDER_CLIENT
+    except ValueError as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close(code=1008, reason="unsupported render")
+        return
     effective_mode = mode or ("pull" if GPU_ENABLED else "push")
+    sender = _ViewSender(websocket, fmt)
+    await sender.start()
 
     if effective_mode == "pull":
-        # 기존 동작: CCTV URL -> FrameStream -> _process_frame
+        # CCTV URL -> FrameStream -> _process_frame 는 허브 채널에서 cctv_id 당 한 번만 하고
+        # 같은 cctv_id 를 보는 연결끼리 결과를 공유
         try:
-            url = _get_stream_url_from_backend(cctv_id)
-            print(f"[detections_ws] stream url: {url}")
-
+            sub = await _HUB.subscribe(cctv_id, draw)
         except HTTPException as e:
             print(f"[detections_ws] failed to get stream url: {e.detail}")
             await websocket.send_json({"error": e.detail})
             await websocket.close(code=1011, reason=e.detail)
             return
+        except HubClosed as e:
+            # 서버 종료 중
+            await websocket.send_json({"error": str(e)})
+            await websocket.close(code=1001, reason="server shutting down")
+            return
 
-        fs = FrameStream(url)
-        roi_polygon = None
-        last_ts = 0.0
-        font = _load_korean_font(20)
+        # pull 모드는 클라이언트 메시지를 받지 않으므로 끊김은 별도 태스크로 감지
+        closed = asyncio.Event()
 
-        while True:
-            frame = fs.read_one()
-            if frame is None:
-                await asyncio.sleep(0.02)
-                continue
-            now = time.time()
-            if now - last_ts < _FRAME_INTERVAL:
-                continue
-            last_ts = now
-
-            vis_frame, roi_polygon, filtered = _process_frame(
-                frame, font, roi_polygon, cctv_id)
-            if filtered:
-                _send_detection_to_backend(cctv_id, filtered, roi_polygon)
-
-            ok, jpg = cv2.imencode(".jpg", vis_frame)
-            if not ok:
-                continue
-            b64 = base64.b64encode(jpg.tobytes()).decode("ascii")
-            await websocket.send_json({
-                "timestamp": now,
-                "image": f"data:image/jpeg;base64,{b64}",
-                "detections": [
-                    {"trackId": d.get(
-                        "track_id"), "cls": d["cls"], "conf": d["conf"], "bbox": d["bbox"]}
-                    for d in filtered
-                ],
-                "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None,
-            })
+        async def _watch_disconnect():
+            try:
+                while True:
+                    msg = await websocket.receive()
+                    if msg["type"] == "websocket.disconnect":
+                        break
+            except Exception:
+                pass
+            finally:
+                closed.set()
+
+        watcher = asyncio.create_task(_watch_disconnect())
+        try:
+            while not closed.is_set():
+                try:
+                    item = await sub.get(timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                if item is None:
+                    # 채널이 오류로 끝남
+                    await websocket.close(code=1011, reason="stream closed")
+                    break
+                jpeg = item.jpeg(draw)
+                if jpeg is None:
+                    continue
+                await sender.send(item.timestamp, jpeg, item.detections, item.roi_polygon)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            watcher.cancel()
+            _HUB.unsubscribe(sub)
     else:
         # push 모드: 클라이언트(ffmpeg 등)가 JPEG 바이너리를 WS로 전송
         roi_polygon = None
         last_ts = 0.0
         font = _load_korean_font(20)
+        metrics.bind_camera(cctv_id)
+        decode = metrics.timed("decode", cv2.imdecode)
+        encode = metrics.timed("encode", _encode_jpeg)
         try:
             while True:
                 try:
@@ -360,36 +416,34 @@ async def view_ws(websocket: WebSocket, cctv_id: int = Query(..., ge=1), mode: s
                 if not frame_bytes:
                     continue
 
-                buf = np.frombuffer(frame_bytes, dtype=np.uint8)
-                frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
-                if frame is None:
-                    continue
-
                 now = time.time()
                 if now - last_ts < _FRAME_INTERVAL:
                     continue
-                last_ts = now
 
-                vis_frame, roi_polygon, filtered = _process_frame(
-                    frame, font, roi_polygon, cctv_id
-                )
-                if filtered:
-                    _send_detection_to_backend(cctv_id, filtered, roi_polygon)
+                buf = np.frombuffer(frame_bytes, dtype=np.uint8)
+                try:
+                    frame = await run_cpu(decode, buf, cv2.IMREAD_COLOR)
+                except PoolSaturated:
+                    continue
+                if frame is None:
+                    continue
+                last_ts = now
 
-                ok, jpg = cv2.imencode(".jpg", vis_frame)
-                if not ok:
+                try:
+                    vis_frame, roi_polygon, filtered = await _process_frame(
+                        frame, font, roi_polygon, cctv_id, draw
+                    )
+                    if filtered:
+                        _send_detection_to_backend(cctv_id, filtered, roi_polygon)
+
+                    # render=client 면 받은 JPEG 를 다시 인코딩하지 않고 그대로 돌려보냄
+                    jpeg = await run_cpu(encode, vis_frame) if draw else frame_bytes
+                except PoolSaturated:
+                    # 워커 풀이 포화 상태면 이번 프레임은 버림
+                    continue
+                if jpeg is None:
                     continue
-                b64 = base64.b64encode(jpg.tobytes()).decode("ascii")
-                await websocket.send_json({
-                    "timestamp": now,
-                    "image": f"data:image/jpeg;base64,{b64}",
-                    "detections": [
-                        {"trackId": d.get(
-                            "track_id"), "cls": d["cls"], "conf": d["conf"], "bbox": d["bbox"]}
-                        for d in filtered
-                    ],
-                    "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None,
-                })
+                await sender.send(now, jpeg, filtered, roi_polygon)
 
         except Exception as e:
             detail = getattr(e, "detail", str(e))
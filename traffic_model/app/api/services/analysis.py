@@ -0,0 +1,125 @@
+# /analyze/frame (JPEG 업로드) 와 /ingest (raw 프레임) 공통 분석 경로
+# 디코딩이 끝난 BGR 프레임 -> 모션 게이트 + 추론 -> ROI 필터링 -> 백엔드 전송 -> 응답 dict
+
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.api.services.gating import gated_predict
+from app.api.services.rendering import RENDER_CLIENT, RENDER_SERVER, get_upload_sampler, roi_geometry
+from app.api.services.workers import CameraSlots, run_cpu, run_inference
+from infra.adapters.backend_client import get_backend_client
+from infra.configs.roi_store import get_compiled_roi
+from infra.configs.settings import BATCH_ENABLED
+from infra.monitoring import metrics
+from vision.inference.batching import get_batch_scheduler
+from vision.inference.registry import get_shared_engine
+from vision.pipelines.preprocess import prepare_for_inference, rescale_detections
+from vision.pipelines.render import draw_detections
+
+engine = get_shared_engine()
+
+BACKEND_BASE = os.getenv("BACKEND_BASE", "http://localhost:3001")
+# 업로드/raw ingest 가 같은 카메라 슬롯을 공유 (cctv_id 당 동시에 한 프레임)
+camera_slots = CameraSlots()
+
+
+def encode_annotated(img_array: np.ndarray, preds, roi_dir, scale=(1.0, 1.0)) -> bytes:
+    """
+    LiveModelViewer 스타일로 annotated 이미지 생성 (img_array 는 BGR)
+    scale: 축소 디코딩한 프레임이면 원본 좌표 preds/ROI 를 프레임 크기에 맞춰 그림
+    """
+    sx, sy = scale
+    if sx != 1.0 or sy != 1.0:
+        preds = [{**d, "bbox": [d["bbox"][0] * sx, d["bbox"][1] * sy, d["bbox"][2] * sx, d["bbox"][3] * sy]}
+                 for d in preds]
+        roi_dir = {k: (None if v is None else np.round(v * (sx, sy)).astype(v.dtype)) for k, v in roi_dir.items()}
+    with metrics.stage("render"):
+        annotated_np = draw_detections(img_array, preds, roi_dir)
+
+    with metrics.stage("encode"):
+        ok, buf = cv2.imencode(".jpg", annotated_np, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    if not ok:
+        raise ValueError("annotated 이미지 인코딩 실패")
+    return buf.tobytes()
+
+
+async def analyze_image(
+    cctv_id: int,
+    frame_id: Optional[int],
+    img_array: np.ndarray,
+    render_mode: str = RENDER_SERVER,
+    decode_scale: Tuple[float, float] = (1.0, 1.0),
+) -> Dict[str, Any]:
+    """
+    img_array: BGR 프레임 (decode_scale = 프레임 크기 / 원본 크기, 축소 디코딩이 아니면 (1, 1))
+    풀 포화는 PoolSaturated, 배치 큐 포화는 BatchQueueFull 로 올라감 (호출 쪽에서 응답 변환)
+    camera_slots 확보는 호출 쪽 책임
+    """
+    roi = get_compiled_roi(cctv_id)
+
+    async def _detect():
+        # 프레임 전처리(선택적 축소 + 보정) + 추론
+        x, scale = await run_cpu(prepare_for_inference, img_array)
+        if BATCH_ENABLED:
+            # 다른 CCTV 프레임과 묶어서 한 번에 추론 (트래킹은 cctv_id 별로)
+            # batch = 대기 + 배치 추론 (배치 스레드 안의 inference/tracking 은 엔진에서 따로 기록)
+            with metrics.stage("batch"):
+                preds = await get_batch_scheduler().predict(x, cctv_id)
+        else:
+            preds = await run_inference(engine.predict, x, cctv_id)  # track_id 포함
+        # 모델 입력 축소 -> 디코딩 크기 -> 원본 좌표
+        preds = rescale_detections(preds, scale)
+        return rescale_detections(preds, decode_scale)
+
+    # 움직임이 없으면 전처리/추론을 건너뛰고 직전 결과 사용 (MOTION_GATE_ENABLED)
+    preds, _ = await gated_predict(cctv_id, img_array, _detect)
+
+    # ROI 필터링 (ROI 밖 제외 + 방향별 track_id 중복 제거 + direction 부여)
+    with metrics.stage("roi_filter"):
+        preds = roi.filter_detections(preds)
+
+    detections = [
+        {"trackId": d.get("track_id"), "cls": d["cls"], "conf": float(d["conf"]), "bbox": d["bbox"].tolist() if hasattr(
+            d["bbox"], "tolist") else d["bbox"], "direction": d.get("direction")}
+        for d in preds
+    ]
+    payload = {
+        "cctvId": cctv_id,
+        "frameId": frame_id,
+        "timestamp": time.time(),
+        "detections": detections,
+        "roiPolygon": None,
+    }
+
+    # 시각화(그리기 + JPEG 인코딩)는 server 모드이거나 샘플링에 걸린 프레임만
+    image = None
+    if render_mode == RENDER_SERVER or get_upload_sampler().should_upload(cctv_id, preds):
+        annotated_img_bytes = await run_cpu(encode_annotated, img_array, preds, roi.polygons, decode_scale)
+        image = (frame_id, annotated_img_bytes)
+
+    # 백엔드 전송은 대기열에 넣고 바로 응답 (JSON -> 이미지 순서로 전송됨)
+    get_backend_client(BACKEND_BASE).submit_detection(payload, image=image)
+
+    if render_mode == RENDER_CLIENT:
+        # 프론트 canvas 에서 그릴 수 있도록 bbox/track/direction + ROI 좌표까지 반환
+        return {
+            "ok": True,
+            "cctv_id": cctv_id,
+            "detections_count": len(preds),
+            "detections": detections,
+            "roi": roi_geometry(roi.polygons),
+        }
+
+    return {
+        "ok": True,
+        "cctv_id": cctv_id,
+        "detections_count": len(preds),
+        "detections": [
+            {"cls": d["cls"], "conf": float(d["conf"])}
+            for d in preds
+        ],
+    }
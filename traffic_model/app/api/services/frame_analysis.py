@@ -1,43 +1,53 @@
 # 해당 파일은 gpu 사용할 때 사용할 코드임. 삭제하지 말것!!
 
-import io
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 import numpy as np
-from PIL import Image
-from vision.pipelines.preprocess import enhance_frame
-from vision.inference.engines.yolo_ultralytics import YOLOEngine
+from vision.pipelines.preprocess import prepare_for_inference, rescale_detections
+from vision.inference.registry import get_shared_engine
 
-_engine = YOLOEngine()
+_engine = get_shared_engine()
+
+
+def annotate_predictions(img_array: np.ndarray, preds: List[dict]) -> np.ndarray:
+    """
+    ultralytics Results.plot() 과 같은 스타일로 검출 결과를 그림 (img_array 는 BGR, Annotator 색도 BGR).
+    추론 결과(dict)만으로 그리므로 모델을 다시 돌릴 필요가 없음
+    """
+    from ultralytics.utils.plotting import Annotator, colors
+
+    annotator = Annotator(img_array.copy(), example=",".join(_engine.want))
+    for d in reversed(preds):
+        track_id = d.get("track_id")
+        name = ("" if track_id is None else f"id:{track_id} ") + d["cls"]
+        cls_idx = _engine.want.index(d["cls"]) if d["cls"] in _engine.want else 0
+        annotator.box_label(
+            d["bbox"],
+            f"{name} {float(d['conf']):.2f}",
+            color=colors(track_id if track_id is not None else cls_idx, True),
+        )
+    return annotator.result()
 
 
 def analyze_np_frame(
     img_array: np.ndarray,
-) -> Tuple[List[dict], bytes]:
+    cctv_id: Optional[int] = None,
+    annotate: bool = True,
+) -> Tuple[List[dict], Optional[np.ndarray]]:
     """
-    numpy 이미지 배열(RGB/BGR)을 받아:
-    - YOLO 추론
-    - 바운딩 박스가 그려진 JPEG 바이트 생성
+    BGR numpy 이미지 배열을 받아 (모델은 ultralytics 규약대로 BGR 입력 기준):
+    - YOLO 추론 (검출 + 트래킹 한 번)
+    - annotate=True 이면 바운딩 박스가 그려진 BGR 이미지
     를 반환
     """
-    # RGB 보장
+    # 3채널 보장
     if img_array.ndim == 2:
         img_array = np.stack([img_array] * 3, axis=-1)
     if img_array.shape[2] == 4:
         img_array = img_array[:, :, :3]
 
-    x = enhance_frame(img_array)
-
-    _engine._ensure()
-    res = _engine.model.predict(
-        source=img_array, conf=0.25, iou=0.7, verbose=False
-    )[0]
-    preds = _engine.predict(x)
-
-    annotated_img = res.plot()
-    annotated_pil = Image.fromarray(annotated_img)
-    buf = io.BytesIO()
-    annotated_pil.save(buf, format="JPEG", quality=95)
-    annotated_bytes = buf.getvalue()
+    x, scale = prepare_for_inference(img_array)
+    preds = rescale_detections(_engine.predict(x, cctv_id), scale)
 
-    return preds, annotated_bytes
+    annotated = annotate_predictions(img_array, preds) if annotate else None
+    return preds, annotated
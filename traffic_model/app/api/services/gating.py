@@ -0,0 +1,47 @@
+# analyze_frame / view_ws 공통: 모션 게이트 결정에 따라 검출을 돌리거나 직전 결과를 재사용
+
+from typing import Awaitable, Callable, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.api.services.workers import run_cpu
+from infra.configs.settings import MOTION_GATE_ENABLED
+from vision.inference.registry import get_shared_engine
+from vision.pipelines.motion import ADVANCE, DETECT, REUSE, SCENE_CHANGE, get_motion_gate
+
+
+async def gated_predict(
+    cctv_id: Optional[Hashable],
+    frame: np.ndarray,
+    detect: Callable[[], Awaitable[List[dict]]],
+) -> Tuple[List[dict], str]:
+    """
+    detect: 전처리 + 추론 후 원본 좌표 preds 를 돌려주는 코루틴 함수
+    반환: (preds, 결정). 결정이 DETECT/SCENE_CHANGE 가 아니면 preds 는 직전 검출 결과 사본
+    """
+    if not MOTION_GATE_ENABLED or cctv_id is None:
+        return await detect(), DETECT
+
+    gate = get_motion_gate()
+    action = await run_cpu(gate.check, cctv_id, frame)
+
+    if action == REUSE:
+        return gate.cached(cctv_id), action
+
+    if action == ADVANCE:
+        # 트래커 갱신은 가벼우므로 cpu 풀에서 처리 (추론 풀을 쓰지 않음)
+        await run_cpu(get_shared_engine().advance, cctv_id)
+        return gate.cached(cctv_id), action
+
+    if action == SCENE_CHANGE:
+        get_shared_engine().trackers.reset(cctv_id)
+
+    preds = await detect()
+    gate.commit(cctv_id, preds)
+    return preds, action
+
+
+def snapshot() -> dict:
+    if not MOTION_GATE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_motion_gate().snapshot()}
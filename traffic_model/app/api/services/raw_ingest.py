@@ -0,0 +1,275 @@
+# raw 프레임 ingest 세션 (websocket / Unix socket 공통)
+# 연결 하나 = RawIngestSession 하나. 메시지를 받는 즉시 파싱 + 카메라 슬롯 확보 후 분석 태스크로 넘기고
+# 다음 메시지를 계속 받음 (한 연결로 여러 카메라를 보내도 느린 카메라가 다른 카메라를 막지 않음)
+# 응답(ack)은 프레임마다 JSON 하나, 처리 순서대로 (frame_id 로 매칭)
+# 형식은 app/api/services/raw_protocol.py 참고
+
+import asyncio
+import json
+import os
+import socket
+import struct
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import numpy as np
+
+from app.api.services import raw_protocol
+from app.api.services.analysis import analyze_image, camera_slots
+from app.api.services.rendering import RENDER_CLIENT, RENDER_SERVER
+from app.api.services.workers import PoolSaturated, run_cpu
+from infra.adapters.shm_ring import ShmFrameStale, ShmRing
+from infra.monitoring import metrics
+from infra.configs.settings import (
+    RAW_INGEST_MAX_BYTES,
+    RAW_INGEST_MAX_INFLIGHT,
+    RAW_INGEST_SHM_ENABLED,
+    RAW_INGEST_SHM_PREFIX,
+)
+from vision.inference.batching import BatchQueueFull
+
+SendAck = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_LENGTH = struct.Struct("<I")
+
+_stats = {
+    "connections": 0,
+    "active_connections": 0,
+    "frames": 0,
+    "bytes": 0,
+    "busy": 0,
+    "stale": 0,
+    "errors": 0,
+    "shm_attached": 0,
+}
+
+
+class RawIngestSession:
+    def __init__(self, send: SendAck, transport: str) -> None:
+        self._send = send
+        self.transport = transport
+        self.ring: Optional[ShmRing] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._reads: Set[asyncio.Future] = set()  # 공유 메모리/메시지 버퍼에서 변환 중인 작업
+        self._send_lock = asyncio.Lock()
+        _stats["connections"] += 1
+        _stats["active_connections"] += 1
+
+    async def handle(self, message) -> None:
+        """메시지 하나 처리. 분석은 태스크로 넘기고 바로 돌아옴 (형식 오류/busy 는 여기서 바로 ack)"""
+        if len(message) > RAW_INGEST_MAX_BYTES:
+            await self._ack_error(None, None, f"메시지가 너무 큽니다: {len(message)} > {RAW_INGEST_MAX_BYTES} bytes")
+            return
+        try:
+            header, body = raw_protocol.unpack_header(message)
+        except ValueError as e:
+            await self._ack_error(None, None, str(e))
+            return
+
+        if header.kind == raw_protocol.KIND_ATTACH:
+            await self._attach(bytes(body).decode("utf-8", "replace"))
+            return
+
+        _stats["frames"] += 1
+        _stats["bytes"] += len(message)
+        try:
+            if header.kind == raw_protocol.KIND_SHM:
+                if self.ring is None:
+                    raise ValueError("공유 메모리 링을 먼저 attach 해야 합니다 (kind 3)")
+                # 다른 링으로 다시 attach 해도 이 프레임은 보낸 시점의 링에서 읽음
+                ref = (self.ring, *raw_protocol.unpack_shm_ref(body))
+            else:
+                ref = None
+            raw_protocol.frame_nbytes(header.fmt, header.width, header.height)
+        except ValueError as e:
+            await self._ack_error(header.cctv_id, header.frame_id, str(e))
+            return
+
+        if len(self._tasks) >= RAW_INGEST_MAX_INFLIGHT:
+            await self._ack_busy(header, f"연결당 처리 중인 프레임이 {RAW_INGEST_MAX_INFLIGHT}개를 넘었습니다.")
+            return
+        try:
+            camera_slots.acquire(header.cctv_id)
+        except PoolSaturated as e:
+            await self._ack_busy(header, e.detail)
+            return
+
+        released = False
+
+        def release_slot(_=None) -> None:
+            # 한 번만 반납 (늦게 온 콜백이 같은 카메라의 다음 프레임 슬롯을 풀지 않도록)
+            nonlocal released
+            if not released:
+                released = True
+                camera_slots.release(header.cctv_id)
+
+        task = asyncio.create_task(self._analyze(header, body, ref, release_slot))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # 태스크가 첫 단계 전에 취소되면 _analyze 의 finally 가 돌지 않으므로 완료 콜백에서도 반납
+        task.add_done_callback(release_slot)
+
+    async def _analyze(self, header: raw_protocol.RawHeader, body, ref, release_slot: Callable[[], None]) -> None:
+        render_mode = RENDER_CLIENT if header.flags & raw_protocol.FLAG_RENDER_CLIENT else RENDER_SERVER
+        metrics.bind_camera(header.cctv_id)
+        try:
+            # 연결이 끊겨 태스크가 취소돼도 변환(슬롯 view 읽기)은 끝까지 가도록 shield, 링은 그 뒤에 닫음
+            read = asyncio.ensure_future(run_cpu(metrics.timed("decode", self._to_bgr), header, body, ref))
+            self._reads.add(read)
+            read.add_done_callback(self._reads.discard)
+            try:
+                img = await asyncio.shield(read)
+            except ShmFrameStale as e:
+                _stats["stale"] += 1
+                await self._ack(header, {"ok": False, "stale": True, "error": str(e)})
+                return
+            except ValueError as e:
+                await self._ack_error(header.cctv_id, header.frame_id, str(e))
+                return
+            result = await analyze_image(header.cctv_id, header.frame_id, img, render_mode)
+        except (PoolSaturated, BatchQueueFull) as e:
+            await self._ack_busy(header, getattr(e, "detail", str(e)))
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._ack_error(header.cctv_id, header.frame_id, str(e))
+            return
+        finally:
+            release_slot()
+        await self._ack(header, result)
+
+    def _to_bgr(self, header: raw_protocol.RawHeader, body, ref) -> np.ndarray:
+        if ref is None:
+            return raw_protocol.to_bgr(body, header.fmt, header.width, header.height)
+        ring, slot, seq = ref
+        # 슬롯 view 에서 바로 변환. bgr24 는 producer 가 곧 덮어쓰므로 사본
+        return ring.read(
+            slot, seq, lambda view: raw_protocol.to_bgr(view, header.fmt, header.width, header.height, copy=True))
+
+    async def _attach(self, name: str) -> None:
+        if not RAW_INGEST_SHM_ENABLED:
+            await self._ack_error(None, None, "공유 메모리 ingest 가 꺼져 있습니다 (RAW_INGEST_SHM_ENABLED)")
+            return
+        name = name.lstrip("/")
+        if not name.startswith(RAW_INGEST_SHM_PREFIX):
+            await self._ack_error(None, None, f"허용되지 않는 공유 메모리 이름: {name} (접두사 {RAW_INGEST_SHM_PREFIX})")
+            return
+        try:
+            ring = ShmRing.attach(name)
+        except (OSError, ValueError) as e:
+            await self._ack_error(None, None, f"공유 메모리 attach 실패: {e}")
+            return
+        await self._release_ring()
+        self.ring = ring
+        _stats["shm_attached"] += 1
+        await self._send_json({"ok": True, "attached": name, "slots": ring.slots, "slot_size": ring.slot_size})
+
+    async def _release_ring(self) -> None:
+        if self.ring is None:
+            return
+        # 슬롯 view 를 읽는 중에 닫으면 안 되므로 진행 중인 변환이 끝나길 기다림
+        if self._reads:
+            await asyncio.gather(*self._reads, return_exceptions=True)
+        self.ring.close()
+        self.ring = None
+
+    async def _ack(self, header: raw_protocol.RawHeader, result: Dict[str, Any]) -> None:
+        await self._send_json({"frame_id": header.frame_id, **result})
+
+    async def _ack_busy(self, header: raw_protocol.RawHeader, detail: str) -> None:
+        _stats["busy"] += 1
+        await self._ack(header, {"ok": False, "busy": True, "cctv_id": header.cctv_id, "error": detail})
+
+    async def _ack_error(self, cctv_id: Optional[int], frame_id: Optional[int], error: str) -> None:
+        _stats["errors"] += 1
+        await self._send_json({"frame_id": frame_id, "ok": False, "cctv_id": cctv_id, "error": error})
+
+    async def _send_json(self, msg: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            try:
+                await self._send(msg)
+            except Exception:
+                # 연결이 끊긴 뒤의 ack 는 버림 (수신 루프 쪽에서 세션을 정리함)
+                pass
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._release_ring()
+        _stats["active_connections"] -= 1
+
+
+# ---------- Unix socket ----------
+# 메시지마다 앞에 길이(u32 little-endian) + raw_protocol 메시지, ack 도 길이(u32) + JSON(utf-8)
+
+_unix_server: Optional[asyncio.AbstractServer] = None
+
+
+async def _handle_unix(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    async def send(msg: Dict[str, Any]) -> None:
+        data = json.dumps(msg, ensure_ascii=False).encode("utf-8")
+        writer.write(_LENGTH.pack(len(data)) + data)
+        await writer.drain()
+
+    session = RawIngestSession(send, "unix")
+    try:
+        while True:
+            try:
+                (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+            except asyncio.IncompleteReadError:
+                break
+            if length > RAW_INGEST_MAX_BYTES:
+                # 길이 필드가 깨졌으면 스트림 경계를 잃었으므로 연결을 끊음
+                await session._ack_error(None, None, f"메시지가 너무 큽니다: {length} > {RAW_INGEST_MAX_BYTES} bytes")
+                break
+            await session.handle(await reader.readexactly(length))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        await session.close()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def _socket_in_use(path: str) -> bool:
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        s.close()
+
+
+async def start_unix_server(path: str) -> None:
+    """
+    path 에 Unix socket 서버 시작. 다른 워커가 이미 같은 경로에서 받고 있으면 건너뜀
+    (uvicorn --workers N 이면 먼저 뜬 워커 하나만 받음. 워커별로 받으려면 경로를 다르게)
+    """
+    global _unix_server
+    if os.path.exists(path):
+        if _socket_in_use(path):
+            print(f"[raw_ingest] {path} 를 다른 프로세스가 사용 중이라 Unix socket ingest 를 띄우지 않음")
+            return
+        os.unlink(path)  # 이전 실행이 남긴 소켓 파일
+    _unix_server = await asyncio.start_unix_server(_handle_unix, path=path)
+    print(f"[raw_ingest] Unix socket ingest 시작: {path}")
+
+
+async def stop_unix_server() -> None:
+    global _unix_server
+    if _unix_server is None:
+        return
+    _unix_server.close()
+    await _unix_server.wait_closed()
+    _unix_server = None
+
+
+def snapshot() -> Dict[str, Any]:
+    return {**_stats, "unix_socket": _unix_server is not None}
@@ -0,0 +1,142 @@
+# /ingest raw 프레임 형식 (JPEG 인코딩/디코딩 + multipart 없이 디코딩된 프레임을 그대로 받음)
+#
+# 메시지 하나 = header + body (little-endian). websocket 은 바이너리 메시지 하나,
+# Unix socket 은 앞에 메시지 길이(u32) 를 붙여서 연속으로 보냄
+#   header : magic "RF"(2s) version(u8) kind(u8) format(u8) flags(u8) cctv_id(u32)
+#            frame_id(u64) width(u16) height(u16) timestamp(f64)                       = 30 bytes
+#   kind 1 (frame)  : body = 픽셀 데이터 그대로 (format 별 크기는 frame_nbytes)
+#   kind 2 (shm)    : body = slot(u32) seq(u64). 같은 호스트 producer 가 공유 메모리 링에 쓴 슬롯 참조
+#   kind 3 (attach) : body = 공유 메모리 링 이름 (utf-8). 연결마다 한 번, kind 2 를 보내기 전에
+#                     (cctv_id/frame_id/width/height 는 무시)
+#   format : 0 = bgr24 (HxWx3), 1 = nv12, 2 = i420 (YUV420 planar, width/height 짝수), 3 = gray
+#   flags  : bit0 = render=client (응답에 bbox/ROI 포함, annotated 는 샘플링 업로드만)
+#
+# 응답: 프레임마다 JSON 텍스트 하나 ({"frame_id", "cctv_id", "ok", ...} = /analyze/frame 응답 + frame_id)
+#   같은 카메라 이전 프레임을 처리 중이거나 워커 풀이 포화면 {"ok": false, "busy": true} 로 바로 응답 (프레임 버림)
+
+import struct
+from typing import NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+VERSION = 1
+MAGIC = b"RF"
+
+KIND_FRAME = 1
+KIND_SHM = 2
+KIND_ATTACH = 3
+
+FORMAT_BGR24 = 0
+FORMAT_NV12 = 1
+FORMAT_I420 = 2
+FORMAT_GRAY = 3
+FORMAT_NAMES = {FORMAT_BGR24: "bgr24", FORMAT_NV12: "nv12", FORMAT_I420: "i420", FORMAT_GRAY: "gray"}
+
+FLAG_RENDER_CLIENT = 0x01
+
+_HEADER = struct.Struct("<2sBBBBIQHHd")
+_SHM_REF = struct.Struct("<IQ")
+HEADER_SIZE = _HEADER.size
+
+_YUV_CODES = {FORMAT_NV12: cv2.COLOR_YUV2BGR_NV12, FORMAT_I420: cv2.COLOR_YUV2BGR_I420}
+
+
+class RawHeader(NamedTuple):
+    kind: int
+    fmt: int
+    flags: int
+    cctv_id: int
+    frame_id: int
+    width: int
+    height: int
+    timestamp: float
+
+
+def frame_nbytes(fmt: int, width: int, height: int) -> int:
+    """format 별 픽셀 데이터 크기. 지원하지 않는 조합이면 ValueError"""
+    if width <= 0 or height <= 0:
+        raise ValueError(f"잘못된 프레임 크기: {width}x{height}")
+    if fmt == FORMAT_BGR24:
+        return width * height * 3
+    if fmt == FORMAT_GRAY:
+        return width * height
+    if fmt in _YUV_CODES:
+        if width % 2 or height % 2:
+            raise ValueError(f"{FORMAT_NAMES[fmt]} 은 width/height 가 짝수여야 합니다: {width}x{height}")
+        return width * height * 3 // 2
+    raise ValueError(f"지원하지 않는 format: {fmt}")
+
+
+def to_bgr(data, fmt: int, width: int, height: int, copy: bool = False) -> np.ndarray:
+    """
+    픽셀 데이터(bytes / memoryview) -> BGR uint8 HxWx3
+    bgr24 는 변환 없이 view 를 그대로 돌려줌 (copy=True 면 사본: 공유 메모리처럼 곧 덮어써질 버퍼일 때)
+    YUV/gray 는 cvtColor 결과가 새 배열이라 원본 버퍼를 붙잡지 않음
+    """
+    nbytes = frame_nbytes(fmt, width, height)
+    if len(data) < nbytes:
+        raise ValueError(f"픽셀 데이터가 부족합니다: {len(data)} < {nbytes} bytes ({FORMAT_NAMES[fmt]} {width}x{height})")
+    buf = np.frombuffer(data, dtype=np.uint8, count=nbytes)
+    if fmt == FORMAT_BGR24:
+        img = buf.reshape(height, width, 3)
+        return img.copy() if copy else img
+    if fmt == FORMAT_GRAY:
+        return cv2.cvtColor(buf.reshape(height, width), cv2.COLOR_GRAY2BGR)
+    return cv2.cvtColor(buf.reshape(height * 3 // 2, width), _YUV_CODES[fmt])
+
+
+def unpack_header(data) -> Tuple[RawHeader, memoryview]:
+    """메시지 -> (header, body view). body 는 복사하지 않음"""
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"메시지가 너무 짧습니다: {len(data)} bytes")
+    magic, version, kind, fmt, flags, cctv_id, frame_id, width, height, timestamp = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("raw 프레임 메시지가 아닙니다 (magic 불일치)")
+    if version != VERSION:
+        raise ValueError(f"지원하지 않는 버전: {version}")
+    if kind not in (KIND_FRAME, KIND_SHM, KIND_ATTACH):
+        raise ValueError(f"지원하지 않는 kind: {kind}")
+    header = RawHeader(kind, fmt, flags, cctv_id, frame_id, width, height, timestamp)
+    return header, memoryview(data)[HEADER_SIZE:]
+
+
+def unpack_shm_ref(body) -> Tuple[int, int]:
+    """kind 2 body -> (slot, seq)"""
+    if len(body) < _SHM_REF.size:
+        raise ValueError("shm 메시지 body 가 너무 짧습니다")
+    return _SHM_REF.unpack_from(body, 0)
+
+
+def pack_header(
+    kind: int,
+    cctv_id: int = 0,
+    frame_id: int = 0,
+    width: int = 0,
+    height: int = 0,
+    fmt: int = FORMAT_BGR24,
+    flags: int = 0,
+    timestamp: float = 0.0,
+) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, kind, fmt, flags, cctv_id, frame_id, width, height, timestamp)
+
+
+def pack_frame(cctv_id: int, frame_id: int, img: np.ndarray, fmt: int = FORMAT_BGR24,
+               flags: int = 0, timestamp: float = 0.0) -> bytes:
+    """
+    producer 쪽 (파이썬 클라이언트/부하 도구). img 는 format 레이아웃 그대로의 uint8 배열
+    (bgr24: HxWx3, gray: HxW, nv12/i420: (H*3/2)xW)
+    """
+    height, width = img.shape[:2]
+    if fmt in _YUV_CODES:
+        height = height * 2 // 3
+    return pack_header(KIND_FRAME, cctv_id, frame_id, width, height, fmt, flags, timestamp) + np.ascontiguousarray(img).tobytes()
+
+
+def pack_shm_frame(cctv_id: int, frame_id: int, width: int, height: int, fmt: int, slot: int, seq: int,
+                   flags: int = 0, timestamp: float = 0.0) -> bytes:
+    return pack_header(KIND_SHM, cctv_id, frame_id, width, height, fmt, flags, timestamp) + _SHM_REF.pack(slot, seq)
+
+
+def pack_attach(ring_name: str) -> bytes:
+    return pack_header(KIND_ATTACH) + ring_name.encode("utf-8")
@@ -0,0 +1,95 @@
+# 서버 시각화(server) / 클라이언트 시각화(client) 모드 선택과
+# client 모드에서 annotated 이미지를 백엔드에 올릴지 결정하는 샘플러
+
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Set
+
+import numpy as np
+
+from infra.configs.settings import (
+    ANNOTATED_UPLOAD_INTERVAL_SECONDS,
+    ANNOTATED_UPLOAD_MIN_INTERVAL_SECONDS,
+    ANNOTATED_UPLOAD_ON_EVENT,
+    RENDER_MODE,
+    TRACKER_IDLE_TTL_SECONDS,
+    TRACKER_MAX_SESSIONS,
+)
+from vision.inference.tracking import CameraStates
+
+RENDER_SERVER = "server"
+RENDER_CLIENT = "client"
+RENDER_MODES = (RENDER_SERVER, RENDER_CLIENT)
+
+
+def resolve_render_mode(value: Optional[str]) -> str:
+    """요청 값이 없으면 RENDER_MODE 기본값. 알 수 없는 값은 ValueError"""
+    mode = (value or RENDER_MODE).lower()
+    if mode not in RENDER_MODES:
+        raise ValueError(f"지원하지 않는 render 모드: {value} ({', '.join(RENDER_MODES)})")
+    return mode
+
+
+def roi_geometry(polygons: Dict[str, Optional[np.ndarray]]) -> Dict[str, Optional[list]]:
+    """프론트에서 그릴 ROI 좌표 (방향별 [[x, y], ...])"""
+    return {k: (v.tolist() if v is not None else None) for k, v in polygons.items()}
+
+
+class _CameraUploadState:
+    def __init__(self) -> None:
+        self.last_upload = 0.0
+        self.track_ids: Set[int] = set()
+
+
+class AnnotatedUploadSampler:
+    """
+    cctv_id 별로 annotated 이미지 업로드 여부를 결정
+    - interval 초마다 한 번 (0 이면 끔)
+    - on_event: 이전 프레임에 없던 track_id 가 나타나면 (min_interval 이내 연속 업로드는 제외)
+    - 카메라 상태는 트래커 세션과 같은 기준(idle_ttl / max_cameras LRU)으로 정리
+    """
+
+    def __init__(
+        self,
+        interval: float = ANNOTATED_UPLOAD_INTERVAL_SECONDS,
+        on_event: bool = ANNOTATED_UPLOAD_ON_EVENT,
+        min_interval: float = ANNOTATED_UPLOAD_MIN_INTERVAL_SECONDS,
+        max_cameras: int = TRACKER_MAX_SESSIONS,
+        idle_ttl: float = TRACKER_IDLE_TTL_SECONDS,
+    ) -> None:
+        self.interval = interval
+        self.on_event = on_event
+        self.min_interval = min_interval
+        self._states: CameraStates[_CameraUploadState] = CameraStates(_CameraUploadState, max_cameras, idle_ttl)
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.skipped = 0
+
+    def should_upload(self, cctv_id: Hashable, preds: List[dict]) -> bool:
+        now = time.monotonic()
+        track_ids = {int(d["track_id"]) for d in preds if d.get("track_id") is not None}
+        with self._lock:
+            state = self._states.get(cctv_id, now)
+            new_tracks = bool(track_ids - state.track_ids)
+            state.track_ids = track_ids
+            elapsed = now - state.last_upload
+
+            upload = (self.interval > 0 and elapsed >= self.interval) or (
+                self.on_event and new_tracks and elapsed >= self.min_interval)
+            if upload:
+                state.last_upload = now
+                self.uploads += 1
+            else:
+                self.skipped += 1
+        return upload
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cameras": len(self._states), "uploads": self.uploads, "skipped": self.skipped}
+
+
+_SAMPLER = AnnotatedUploadSampler()
+
+
+def get_upload_sampler() -> AnnotatedUploadSampler:
+    return _SAMPLER
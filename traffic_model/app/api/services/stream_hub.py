@@ -0,0 +1,275 @@
+# /view/ws pull 모드용 스트림 허브
+# 같은 cctv_id 를 여러 명이 보고 있어도 디코딩(FrameStream) / 추론 / 백엔드 전송은 채널 하나에서 한 번만 하고
+# 결과를 구독자마다 최신 1개짜리 큐로 나눠줌 (느린 구독자는 자기 프레임만 버리고 다른 구독자를 막지 않음)
+# - 첫 구독자가 들어오면 스트림 URL 조회 + FrameStream + 분석 태스크 시작
+# - 마지막 구독자가 나가면 STREAM_HUB_LINGER_SECONDS 뒤에 정리 (새로고침으로 바로 다시 들어오면 그대로 재사용)
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.api.services.workers import PoolSaturated
+from infra.adapters.cctv_stream import FrameStream
+from infra.configs.settings import STREAM_CAMERA_FPS, STREAM_HUB_LINGER_SECONDS
+
+_HUBS: "weakref.WeakSet[StreamHub]" = weakref.WeakSet()
+
+
+class HubClosed(Exception):
+    """허브가 종료 중이라 구독할 수 없음 (서버 shutdown)"""
+
+
+@dataclass
+class HubFrame:
+    """채널이 한 프레임 처리한 결과 (구독자 전원이 같은 객체를 공유하므로 수정 금지)"""
+
+    timestamp: float
+    detections: List[dict]  # ROI 필터링 후
+    roi_polygon: Optional[np.ndarray]
+    annotated_jpeg: Optional[bytes]  # render=server 구독자용
+    raw_jpeg: Optional[bytes]  # render=client 구독자용
+
+    def jpeg(self, draw: bool) -> Optional[bytes]:
+        return self.annotated_jpeg if draw else self.raw_jpeg
+
+
+# (cctv_id) -> 스트림 URL
+ResolveUrl = Callable[[int], Awaitable[str]]
+# (cctv_id, frame(BGR), roi_polygon, annotated 필요 여부, 원본 필요 여부, 프레임 축소 비율) -> HubFrame
+ProcessFrame = Callable[[int, np.ndarray, Optional[np.ndarray], bool, bool, float], Awaitable[HubFrame]]
+
+
+class Subscription:
+    """구독자 하나. get() 은 항상 가장 최근 결과만 돌려주고, 채널이 끝나면 None"""
+
+    def __init__(self, cctv_id: int, draw: bool) -> None:
+        self.cctv_id = cctv_id
+        self.draw = draw
+        self.dropped = 0
+        self.closed = False
+        self._queue: "asyncio.Queue[Optional[HubFrame]]" = asyncio.Queue(maxsize=1)
+
+    def _offer(self, item: Optional[HubFrame]) -> None:
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(item)
+
+    def _close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._offer(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[HubFrame]:
+        """timeout 이 지나면 asyncio.TimeoutError"""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class _Channel:
+    def __init__(self, hub: "StreamHub", cctv_id: int) -> None:
+        self.hub = hub
+        self.cctv_id = cctv_id
+        self.subscribers: Set[Subscription] = set()
+        self.stream: Optional[FrameStream] = None
+        self.started_at = time.time()
+        self.frames = 0
+        self.saturated = 0
+        self.last_error: Optional[str] = None
+        # close() 가 불린 뒤에는 새 구독자를 받지 않음 (태스크 취소가 아직 처리되지 않았어도)
+        self.closing = False
+
+        loop = asyncio.get_running_loop()
+        self.ready: asyncio.Future = loop.create_future()
+        # 기다리는 구독자가 모두 취소돼도 "exception was never retrieved" 경고가 나지 않도록
+        self.ready.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._linger: Optional[asyncio.TimerHandle] = None
+        self.task = asyncio.create_task(self._run(), name=f"stream-hub-{cctv_id}")
+
+    async def _run(self) -> None:
+        try:
+            url = await self.hub.resolve_url(self.cctv_id)
+        except asyncio.CancelledError:
+            self.ready.cancel()
+            self.hub._discard(self)
+            raise
+        except Exception as e:
+            self.last_error = getattr(e, "detail", str(e))
+            self.ready.set_exception(e)
+            self.hub._discard(self)
+            return
+
+        print(f"[stream_hub] cctv_id={self.cctv_id} 스트림 시작: {url}")
+        self.stream = FrameStream(
+            url, target_fps=self.hub.camera_fps(self.cctv_id), cctv_id=self.cctv_id).start()
+        self.ready.set_result(None)
+
+        seq = 0
+        try:
+            while True:
+                got = await self.stream.next_frame(seq, timeout=1.0)
+                if got is None:
+                    continue
+                seq, frame = got
+
+                subscribers = list(self.subscribers)
+                if not subscribers:
+                    # linger 중에는 디코딩만 유지하고 추론은 하지 않음
+                    continue
+                draw = any(s.draw for s in subscribers)
+                raw = any(not s.draw for s in subscribers)
+                try:
+                    # 채널은 시청자 연결보다 오래 살아있으므로 ROI 는 매 프레임 저장소에서 다시 읽음
+                    # (roi_store 캐시 + mtime 확인이라 비용은 작음, PUT /view/roi 수정이 바로 반영됨)
+                    item = await self.hub.process(self.cctv_id, frame, None, draw, raw, self.stream.scale)
+                except PoolSaturated:
+                    # 워커 풀이 포화 상태면 이번 프레임은 버림
+                    self.saturated += 1
+                    continue
+                self.frames += 1
+                for s in list(self.subscribers):
+                    s._offer(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[stream_hub] cctv_id={self.cctv_id} 처리 중 오류로 채널 종료: {e}")
+        finally:
+            self.hub._discard(self)
+            for s in list(self.subscribers):
+                s._close()
+            # 디코더 스레드 종료 대기(join)는 워커 풀 대신 기본 executor 에서
+            await asyncio.to_thread(self.stream.stop)
+            print(f"[stream_hub] cctv_id={self.cctv_id} 스트림 종료")
+
+    def close(self) -> None:
+        self.closing = True
+        self.cancel_linger()
+        self.task.cancel()
+
+    def schedule_close(self, delay: float) -> None:
+        self.cancel_linger()
+        if delay <= 0:
+            self.close()
+            return
+        self._linger = asyncio.get_running_loop().call_later(delay, self.close)
+
+    def cancel_linger(self) -> None:
+        if self._linger is not None:
+            self._linger.cancel()
+            self._linger = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "draw_subscribers": sum(1 for s in self.subscribers if s.draw),
+            "frames": self.frames,
+            "saturated": self.saturated,
+            "subscriber_dropped": sum(s.dropped for s in self.subscribers),
+            "lingering": self._linger is not None,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "last_error": self.last_error,
+            "stream": self.stream.snapshot() if self.stream is not None else None,
+        }
+
+
+class StreamHub:
+    """
+    subscribe(cctv_id, draw) -> Subscription, 다 쓰면 unsubscribe(sub)
+    resolve_url / process 는 라우터 쪽에서 주입 (URL 조회, 추론 + ROI + 백엔드 전송 + JPEG 인코딩)
+    """
+
+    def __init__(
+        self,
+        resolve_url: ResolveUrl,
+        process: ProcessFrame,
+        target_fps: Optional[float] = None,
+        linger: float = STREAM_HUB_LINGER_SECONDS,
+    ) -> None:
+        self.resolve_url = resolve_url
+        self.process = process
+        self.target_fps = target_fps
+        self.linger = linger
+        self._channels: Dict[int, _Channel] = {}
+        self._closed = False
+        _HUBS.add(self)
+
+    def camera_fps(self, cctv_id: int) -> Optional[float]:
+        """STREAM_CAMERA_FPS 에 카메라별 값이 있으면 그 값, 없으면 허브 기본값"""
+        return STREAM_CAMERA_FPS.get(cctv_id, self.target_fps)
+
+    async def subscribe(self, cctv_id: int, draw: bool = True) -> Subscription:
+        """
+        첫 구독자면 채널을 시작. URL 조회에 실패하면 그 예외를 그대로 올림
+        기다리는 사이 채널이 닫히면(앞 구독자가 나가면서 linger 0 으로 정리 등) 새 채널로 다시 시도.
+        허브가 종료 중이면 HubClosed
+        """
+        while True:
+            if self._closed:
+                raise HubClosed("stream hub is shutting down")
+            channel = self._channels.get(cctv_id)
+            if channel is None or channel.closing:
+                channel = self._channels[cctv_id] = _Channel(self, cctv_id)
+            channel.cancel_linger()
+
+            sub = Subscription(cctv_id, draw)
+            channel.subscribers.add(sub)
+            try:
+                await asyncio.shield(channel.ready)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    # 이 구독 요청 자체가 취소됨
+                    self.unsubscribe(sub)
+                    raise
+                # 채널만 취소됨 (이미 닫힌 채널이므로 정리만 하고 새 채널로)
+                channel.subscribers.discard(sub)
+                sub.closed = True
+                continue
+            except BaseException:
+                self.unsubscribe(sub)
+                raise
+            return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        sub.closed = True
+        channel = self._channels.get(sub.cctv_id)
+        if channel is None or sub not in channel.subscribers:
+            return
+        channel.subscribers.discard(sub)
+        if not channel.subscribers:
+            channel.schedule_close(self.linger if channel.ready.done() else 0)
+
+    def _discard(self, channel: _Channel) -> None:
+        if self._channels.get(channel.cctv_id) is channel:
+            del self._channels[channel.cctv_id]
+        channel.cancel_linger()
+
+    async def close(self) -> None:
+        self._closed = True
+        channels = list(self._channels.values())
+        for channel in channels:
+            channel.close()
+        await asyncio.gather(*(c.task for c in channels), return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {str(cctv_id): c.snapshot() for cctv_id, c in list(self._channels.items())}
+
+
+def snapshot() -> Dict[str, Any]:
+    channels: Dict[str, Any] = {}
+    for hub in list(_HUBS):
+        channels.update(hub.snapshot())
+    return {"channels": len(channels), "subscribers": sum(c["subscribers"] for c in channels.values()),
+            "by_cctv": channels}
+
+
+async def close_all() -> None:
+    for hub in list(_HUBS):
+        await hub.close()
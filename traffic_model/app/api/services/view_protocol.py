@@ -0,0 +1,118 @@
+# /view/ws 전송 형식
+#
+# json (기본, 기존 호환): 프레임마다 텍스트 메시지 하나
+#   {"timestamp", "image": "data:image/jpeg;base64,...", "detections": [...], "roiPolygon": [...]}
+#
+# binary (?format=binary 로 요청):
+#   1) 연결 직후 텍스트 메시지 한 번
+#      {"type": "hello", "format": "binary", "version": 1, "classes": [...], "directions": [...]}
+#   2) ROI 가 처음 정해지거나 바뀔 때만 텍스트 메시지
+#      {"type": "roi", "roiPolygon": [[x, y], ...] | null}
+#   3) 프레임마다 바이너리 메시지 하나 (little-endian)
+#      header  : magic "TV"(2s) version(u8) kind(u8=1) timestamp(f64) seq(u32) count(u16)   = 18 bytes
+#      det * N : track_id(i32, 없으면 -1) cls(u8, classes 인덱스 / 255=기타) direction(u8)
+#                conf(u16, conf * 65535) x1 y1 x2 y2(f32 * 4)                              = 24 bytes
+#      나머지  : JPEG 바이트 그대로 (base64 없음)
+#   프론트 예시: DataView 로 header/det 를 읽고 buffer.slice(18 + 24 * count) 를 Blob(image/jpeg) 으로
+
+import base64
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+FORMATS = (FORMAT_JSON, FORMAT_BINARY)
+
+VERSION = 1
+MAGIC = b"TV"
+KIND_FRAME = 1
+
+_HEADER = struct.Struct("<2sBBdIH")
+_DET = struct.Struct("<iBBHffff")
+_OTHER_CLS = 255
+# direction 코드 (0 = 없음)
+DIRECTIONS = (None, "up", "down")  # vision.pipelines.roi 의 direction 값과 같아야 함
+
+
+def hello_message(classes: Sequence[str]) -> Dict[str, Any]:
+    return {
+        "type": "hello",
+        "format": FORMAT_BINARY,
+        "version": VERSION,
+        "classes": list(classes),
+        "directions": list(DIRECTIONS),
+    }
+
+
+def roi_message(roi_polygon: Optional[np.ndarray]) -> Dict[str, Any]:
+    return {"type": "roi", "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None}
+
+
+def json_message(
+    timestamp: float,
+    jpeg: bytes,
+    detections: List[dict],
+    roi_polygon: Optional[np.ndarray],
+) -> Dict[str, Any]:
+    """기존 JSON 형식 (data URL + ROI 매 프레임)"""
+    return {
+        "timestamp": timestamp,
+        "image": "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("ascii"),
+        "detections": [
+            {"trackId": d.get("track_id"), "cls": d["cls"], "conf": d["conf"], "bbox": d["bbox"]}
+            for d in detections
+        ],
+        "roiPolygon": roi_polygon.tolist() if roi_polygon is not None else None,
+    }
+
+
+def pack_frame(
+    timestamp: float,
+    seq: int,
+    jpeg: bytes,
+    detections: List[dict],
+    class_index: Dict[str, int],
+) -> bytes:
+    count = min(len(detections), 0xFFFF)
+    buf = bytearray(_HEADER.size + _DET.size * count + len(jpeg))
+    _HEADER.pack_into(buf, 0, MAGIC, VERSION, KIND_FRAME, timestamp, seq & 0xFFFFFFFF, count)
+    offset = _HEADER.size
+    for d in detections[:count]:
+        track_id = d.get("track_id")
+        direction = d.get("direction")
+        x1, y1, x2, y2 = d["bbox"]
+        _DET.pack_into(
+            buf, offset,
+            -1 if track_id is None else int(track_id),
+            class_index.get(d["cls"], _OTHER_CLS),
+            DIRECTIONS.index(direction) if direction in DIRECTIONS else 0,
+            int(round(min(max(float(d["conf"]), 0.0), 1.0) * 65535)),
+            x1, y1, x2, y2,
+        )
+        offset += _DET.size
+    buf[offset:] = jpeg
+    return bytes(buf)
+
+
+def unpack_frame(data: bytes, classes: Sequence[str]) -> Tuple[float, int, List[dict], bytes]:
+    """pack_frame 의 역변환 (테스트/부하 도구/파이썬 클라이언트용)"""
+    magic, version, kind, timestamp, seq, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or kind != KIND_FRAME:
+        raise ValueError("view 프레임 메시지가 아닙니다")
+    if version != VERSION:
+        raise ValueError(f"지원하지 않는 버전: {version}")
+    detections = []
+    offset = _HEADER.size
+    for _ in range(count):
+        track_id, cls_idx, direction, conf, x1, y1, x2, y2 = _DET.unpack_from(data, offset)
+        offset += _DET.size
+        detections.append({
+            "track_id": None if track_id < 0 else track_id,
+            "cls": classes[cls_idx] if cls_idx < len(classes) else None,
+            "direction": DIRECTIONS[direction] if direction < len(DIRECTIONS) else None,
+            "conf": conf / 65535.0,
+            "bbox": [x1, y1, x2, y2],
+        })
+    return timestamp, seq, detections, data[offset:]
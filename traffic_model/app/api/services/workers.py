@@ -0,0 +1,130 @@
+# 이벤트 루프를 막지 않도록 무거운 작업(디코딩/보정/추론/그리기/인코딩)을 워커 풀로 넘기는 실행 계층
+# - cpu 풀: OpenCV/NumPy 단계 (GIL 을 놓기 때문에 스레드로 충분히 병렬화됨)
+# - inference 풀: 모델 전용 스레드 (ultralytics predictor 는 스레드 안전하지 않음)
+# 각 풀은 동시에 받을 수 있는 작업 수가 정해져 있고, 넘치면 PoolSaturated 를 던진다.
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Set, TypeVar
+
+from infra.configs.settings import CPU_QUEUE_SIZE, CPU_WORKERS, INFER_QUEUE_SIZE, INFER_WORKERS
+from infra.monitoring import metrics
+
+T = TypeVar("T")
+
+
+class PoolSaturated(Exception):
+    """워커 풀이 포화 상태 -> 라우터에서 429/503 으로 변환"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class BoundedPool:
+    def __init__(self, name: str, workers: int, max_pending: int) -> None:
+        self.name = name
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix=name)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(
+                    503, f"{self.name} pool is saturated ({self.max_pending} pending)")
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, ctx: contextvars.Context, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        # 요청이 취소(클라이언트 끊김)되어도 실제 작업이 끝날 때까지 자리를 차지하도록 풀 스레드 안에서 해제
+        try:
+            return ctx.run(fn, *args, **kwargs)
+        finally:
+            self._release()
+
+    def _release_if_never_ran(self, fut: Future) -> None:
+        # 대기열에 있다가 시작 전에 취소된 작업은 _call 이 실행되지 않으므로 여기서 해제
+        if fut.cancelled():
+            self._release()
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self._acquire()
+        # 호출한 요청의 contextvars(cctv_id, Server-Timing 수집 대상)를 풀 스레드에서도 보이도록 복사
+        ctx = contextvars.copy_context()
+        try:
+            fut = self._executor.submit(partial(self._call, ctx, fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        fut.add_done_callback(self._release_if_never_ran)
+        return await asyncio.wrap_future(fut)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"pending": self._pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+cpu_pool = BoundedPool("cpu", CPU_WORKERS, CPU_QUEUE_SIZE)
+inference_pool = BoundedPool("inference", INFER_WORKERS, INFER_QUEUE_SIZE)
+
+metrics.register(metrics.Gauge(
+    "traffic_pool_pending", "Tasks running or queued in a worker pool", ("pool",),
+    lambda: {(p.name,): p.pending for p in (cpu_pool, inference_pool)}))
+metrics.register(metrics.Gauge(
+    "traffic_pool_rejected_total", "Tasks rejected because a worker pool was saturated", ("pool",),
+    lambda: {(p.name,): p.rejected for p in (cpu_pool, inference_pool)}, metric_type="counter"))
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+async def run_inference(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await inference_pool.run(fn, *args, **kwargs)
+
+
+class CameraSlots:
+    """
+    cctv_id 당 동시에 처리 중인 프레임은 하나만 허용.
+    이전 프레임이 아직 처리 중인데 같은 카메라 프레임이 또 오면 429.
+    """
+
+    def __init__(self) -> None:
+        self._busy: Set[Hashable] = set()
+
+    def acquire(self, cctv_id: Hashable) -> None:
+        if cctv_id in self._busy:
+            raise PoolSaturated(
+                429, f"cctv_id={cctv_id} 의 이전 프레임을 아직 처리 중입니다.")
+        self._busy.add(cctv_id)
+
+    def release(self, cctv_id: Hashable) -> None:
+        self._busy.discard(cctv_id)
+
+
+def snapshot() -> Dict[str, Any]:
+    return {"cpu": cpu_pool.snapshot(), "inference": inference_pool.snapshot()}
+
+
+def shutdown() -> None:
+    cpu_pool.shutdown()
+    inference_pool.shutdown()
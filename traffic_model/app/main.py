@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from app.middleware.logging import logging_middleware
 from app.middleware.timing import timing_middleware
-from app.api.routers import analyze, health, stream_view, roi
+from app.api.routers import analyze, health, ingest, metrics, stream_view, roi
+from app.api.services import raw_ingest, stream_hub, workers
+from infra.adapters import backend_client, stream_url
+from infra.configs.settings import RAW_INGEST_UNIX_SOCKET
 
 app = FastAPI(title="Traffic Intelligence API")
 
@@ -10,11 +13,30 @@ app.middleware("http")(timing_middleware)
 
 app.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
 app.include_router(health.router, prefix="/health", tags=["health"])
+app.include_router(ingest.router, prefix="/ingest", tags=["ingest"])
+app.include_router(metrics.router, tags=["metrics"])
 
 app.include_router(stream_view.router)
 app.include_router(roi.router)
 
 
+@app.on_event("startup")
+async def start_raw_ingest():
+    # 같은 호스트 producer 용 raw 프레임 Unix socket (RAW_INGEST_UNIX_SOCKET 이 있을 때만)
+    if RAW_INGEST_UNIX_SOCKET:
+        await raw_ingest.start_unix_server(RAW_INGEST_UNIX_SOCKET)
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    # raw ingest / 스트림 허브 채널을 멈추고, 남은 검출 결과를 백엔드로 보낸 뒤 풀 정리
+    await raw_ingest.stop_unix_server()
+    await stream_hub.close_all()
+    await backend_client.close_all()
+    await stream_url.close_all()
+    workers.shutdown()
+
+
 @app.get("/")
 def root():
     return {"ok": True, "service": "traffic-intelligence"}  # 대시보드로 리다이렉팅
@@ -1,4 +1,33 @@
+import time
+
+from infra.configs.settings import METRICS_ENABLED, METRICS_SERVER_TIMING
+from infra.monitoring import metrics
+
+
+def _route_template(scope) -> str:
+    """/view/roi/12 -> /view/roi/{cctv_id}. 매칭된 라우트가 없으면(404) unmatched"""
+    if scope.get("route") is None:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    for name, value in (scope.get("path_params") or {}).items():
+        segments = [f"{{{name}}}" if seg == str(value) else seg for seg in segments]
+    return "/".join(segments)
+
+
 async def timing_middleware(request, call_next):
+    """
+    요청 전체 시간 -> traffic_request_seconds (라우트 템플릿 기준이라 cctv_id 등 경로 값으로 라벨이 늘지 않음)
+    METRICS_SERVER_TIMING 이면 이 요청에서 잰 단계별 시간(decode/inference/...)을 Server-Timing 헤더로
+    """
+    if not METRICS_ENABLED:
+        return await call_next(request)
+
+    timings = metrics.start_request_timing()
+    t0 = time.perf_counter()
     response = await call_next(request)
-    # 필요 시 헤더 추가
+    elapsed = time.perf_counter() - t0
+
+    metrics.REQUEST_SECONDS.observe(elapsed, request.method, _route_template(request.scope), response.status_code)
+    if METRICS_SERVER_TIMING:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
     return response
@@ -0,0 +1,96 @@
+# 백엔드 /api/detection 계열을 대신하는 로컬 stub 서버 (벤치마크/부하 테스트에서 BACKEND_BASE 로 지정)
+# 사용법: python -m bench.backend_stub [--port 3001] [--latency-ms 5] [--fail-rate 0.01]
+#   POST /api/detection, /api/detection/batch, /api/detection/image 를 받아서 버리고 200 응답
+#   엔드포인트별 요청 수 / 실패 수 / cctvId 별 수신 결과 수를 server.stats 에 모음 (부하 도구가 전송 누락 확인용)
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+_PATHS = {"/api/detection", "/api/detection/batch", "/api/detection/image"}
+
+
+def make_server(port: int = 0, latency_ms: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """port=0 이면 빈 포트 (server.server_address[1])"""
+    lock = threading.Lock()
+    stats: Dict[str, Any] = {"requests": Counter(), "failed": 0, "bytes": 0, "detections_by_cctv": Counter()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (backend_client 연결 풀 재사용)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+            path = self.path.split("?", 1)[0]
+            if path not in _PATHS:
+                self._reply(404, {"ok": False})
+                return
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            with lock:
+                stats["requests"][path] += 1
+                stats["bytes"] += len(body)
+            if fail_rate and random.random() < fail_rate:
+                with lock:
+                    stats["failed"] += 1
+                self._reply(503, {"ok": False, "error": "stub failure"})
+                return
+            if path != "/api/detection/image":
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self._reply(400, {"ok": False})
+                    return
+                items = payload.get("items", []) if path.endswith("/batch") else [payload]
+                with lock:
+                    for item in items:
+                        stats["detections_by_cctv"][str(item.get("cctvId"))] += 1
+            self._reply(200, {"ok": True})
+
+        def _reply(self, status: int, obj: Dict[str, Any]) -> None:
+            data = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+def start_in_thread(port: int = 0, latency_ms: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 실행. 끝나면 server.shutdown()"""
+    server = make_server(port, latency_ms, fail_rate)
+    threading.Thread(target=server.serve_forever, name="backend-stub", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="백엔드 /api/detection stub 서버")
+    ap.add_argument("--port", type=int, default=3001)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    args = ap.parse_args()
+
+    server = make_server(args.port, args.latency_ms, args.fail_rate)
+    print(f"[backend_stub] http://127.0.0.1:{server.server_address[1]}/api/detection")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps({k: v for k, v in server.stats.items()}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 추론 엔진(ultralytics / onnxruntime / openvino) 결과 일치 여부 + 처리량 비교
+# 사용법: python -m bench.engines [--engines ultralytics,onnxruntime] [--frames DIR] [--iters 20] [--batch 4]
+# ultralytics 결과를 기준으로 다른 엔진의 박스가 같은 클래스, IoU >= --min-iou 로 매칭되는 비율을 계산.
+# 매칭률이 --min-match 미만이거나 기준(ultralytics) 검출이 하나도 없으면 종료 코드 1
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+from vision.inference.registry import available_engines, create_engine
+from vision.inference.tracking import Detections
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def _load_frames(frames_dir: str | None, count: int) -> List[np.ndarray]:
+    if frames_dir:
+        paths = sorted(p for p in Path(frames_dir).iterdir() if p.suffix.lower() in IMAGE_EXTS)[:count]
+        frames = [cv2.imread(str(p)) for p in paths]
+        return [f for f in frames if f is not None]
+
+    # 샘플 이미지가 없으면 합성 프레임 (처리량 확인용. 검출이 안 나오므로 일치율 검사는 실패로 끝남)
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        img = np.full((720, 1280, 3), 90, np.uint8)
+        for _ in range(12):
+            x, y = int(rng.integers(0, 1100)), int(rng.integers(0, 600))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(img, (x, y), (x + 160, y + 100), color, -1)
+        frames.append(img)
+    return frames
+
+
+def _iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a (N,4), b (M,4) -> (N,M)"""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(br - tl, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def _match(ref: Detections, other: Detections, min_iou: float) -> int:
+    """같은 클래스끼리 IoU 큰 순서로 1:1 매칭된 ref 박스 수"""
+    if len(ref) == 0 or len(other) == 0:
+        return 0
+    iou = _iou(ref.xyxy, other.xyxy)
+    iou[ref.cls[:, None] != other.cls[None, :]] = 0.0
+    matched = 0
+    while True:
+        i, j = np.unravel_index(int(iou.argmax()), iou.shape)
+        if iou[i, j] < min_iou:
+            return matched
+        matched += 1
+        iou[i, :] = 0.0
+        iou[:, j] = 0.0
+
+
+def _run(engine, frames: List[np.ndarray], batch: int) -> List[Detections]:
+    out: List[Detections] = []
+    for s in range(0, len(frames), batch):
+        out.extend(engine.detect_batch(frames[s:s + batch]))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="inference engine parity / throughput")
+    parser.add_argument("--engines", default=",".join(available_engines()))
+    parser.add_argument("--frames", default=None, help="샘플 이미지 디렉터리")
+    parser.add_argument("--count", type=int, default=16)
+    parser.add_argument("--iters", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--min-match", type=float, default=0.95)
+    args = parser.parse_args()
+
+    frames = _load_frames(args.frames, args.count)
+    if not frames:
+        sys.exit("프레임이 없습니다")
+
+    results = {}
+    print(f"{'engine':>12} {'frames/s':>9} {'ms/frame':>9} {'boxes':>6}")
+    for name in args.engines.split(","):
+        engine = create_engine(name)
+        try:
+            engine._ensure()
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{name:>12} 건너뜀: {e}")
+            continue
+
+        _run(engine, frames[:args.batch], args.batch)  # 워밍업
+        t0 = time.perf_counter()
+        for _ in range(args.iters):
+            dets = _run(engine, frames, args.batch)
+        elapsed = time.perf_counter() - t0
+        n = len(frames) * args.iters
+        results[name] = dets
+        print(f"{name:>12} {n / elapsed:>9.1f} {elapsed * 1000.0 / n:>9.2f} {sum(len(d) for d in dets):>6}")
+
+    ref = results.get("ultralytics")
+    if ref is None:
+        return
+
+    failed = False
+    for name, dets in results.items():
+        if name == "ultralytics":
+            continue
+        total = sum(len(d) for d in ref)
+        if total == 0:
+            # 기준 검출이 없으면 비교할 게 없으므로 통과로 보지 않음 (합성 프레임이면 항상 이 경우)
+            print(f"{name}: ultralytics 검출이 0개라 일치율을 확인할 수 없습니다 (--frames 로 실제 CCTV 프레임 지정)")
+            failed = True
+            continue
+        matched = sum(_match(r, o, args.min_iou) for r, o in zip(ref, dets))
+        extra = sum(len(d) for d in dets) - matched
+        rate = matched / total
+        print(f"{name}: ultralytics 대비 매칭 {matched}/{total} ({rate:.1%}), 추가 박스 {extra}")
+        failed |= rate < args.min_match
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# enhance_frame 프레임당 비용 비교 (기존 구현 vs Enhancer)
+# 사용법: python -m bench.enhance [--iters 50]
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from vision.pipelines.preprocess import Enhancer
+
+RESOLUTIONS = {
+    "360p": (360, 640),
+    "720p": (720, 1280),
+    "1080p": (1080, 1920),
+}
+
+
+def _enhance_frame_legacy(img):
+    # Enhancer 도입 전 enhance_frame (비교 기준)
+    gamma = 1.2
+    look = np.empty((1, 256), np.uint8)
+    for i in range(256):
+        look[0, i] = np.clip(pow(i / 255.0, 1.0/gamma) * 255.0, 0, 255)
+    img = cv2.LUT(img, look)
+
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    l2 = clahe.apply(l)
+    lab2 = cv2.merge((l2, a, b))
+    img = cv2.cvtColor(lab2, cv2.COLOR_LAB2BGR)
+
+    blur = cv2.GaussianBlur(img, (0, 0), 1.0)
+    img = cv2.addWeighted(img, 1.5, blur, -0.5, 0)
+    return img
+
+
+def _sample_frame(h: int, w: int, brightness: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    img = cv2.add(rng.integers(0, 60, (h, w, 3), dtype=np.uint8), np.full((h, w, 3), brightness, np.uint8))
+    # 도로/차량 느낌의 큰 블록 (밝기에 비례한 색)
+    top = max(brightness * 2, 60)
+    for _ in range(60):
+        x, y = int(rng.integers(0, w - w // 8)), int(rng.integers(0, h - h // 8))
+        color = tuple(int(c) for c in rng.integers(0, min(top, 255), 3))
+        cv2.rectangle(img, (x, y), (x + w // 8, y + h // 8), color, -1)
+    return img
+
+
+def _per_frame_ms(fn, img: np.ndarray, iters: int) -> float:
+    fn(img)  # 워밍업 (버퍼/CLAHE 생성)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn(img)
+    return (time.perf_counter() - t0) * 1000.0 / iters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="enhance_frame micro-benchmark")
+    parser.add_argument("--iters", type=int, default=50)
+    args = parser.parse_args()
+
+    enhancer = Enhancer(adaptive=False)
+    adaptive = Enhancer(adaptive=True)
+
+    print(f"{'res':>6} {'scene':>6} {'legacy ms':>10} {'enhancer ms':>12} {'adaptive ms':>12} {'max diff':>9}")
+    for name, (h, w) in RESOLUTIONS.items():
+        for scene, brightness in (("night", 0), ("day", 110)):
+            img = _sample_frame(h, w, brightness)
+            legacy_ms = _per_frame_ms(_enhance_frame_legacy, img, args.iters)
+            new_ms = _per_frame_ms(enhancer, img, args.iters)
+            adaptive_ms = _per_frame_ms(adaptive, img, args.iters)
+            diff = int(np.abs(
+                _enhance_frame_legacy(img).astype(np.int16) - enhancer(img).astype(np.int16)).max())
+            print(f"{name:>6} {scene:>6} {legacy_ms:>10.2f} {new_ms:>12.2f} {adaptive_ms:>12.2f} {diff:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# 녹화한 ITS cctvInfo 응답을 재생하는 로컬 stub 서버 (its_catalog 동기화 테스트용)
+# 사용법: python -m bench.its_stub recorded.json [--port 8099] [--latency-ms 50] [--fail-rate 0.1]
+#   recorded.json: {"response": {"data": [...]}} (python -m infra.adapters.its_catalog --record 로 생성)
+#   요청의 minX/maxX/minY/maxY 안에 있는 항목만 돌려주므로 타일 크기와 상관없이 재생 가능
+#   파일이 바뀌면 다음 요청부터 새 내용으로 응답 (추가/삭제/변경 시나리오는 파일을 교체해서 재현)
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class _Recording:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mtime = None
+        self._items: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def items(self) -> List[Dict[str, Any]]:
+        mtime = os.stat(self.path).st_mtime_ns
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._items = json.load(f).get("response", {}).get("data", [])
+                self._mtime = mtime
+            return self._items
+
+
+def _bbox(q: Dict[str, List[str]]) -> Tuple[float, float, float, float]:
+    return (float(q["minX"][0]), float(q["minY"][0]), float(q["maxX"][0]), float(q["maxY"][0]))
+
+
+def make_server(path: str, port: int, latency_ms: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    recording = _Recording(path)
+    stats = {"requests": 0, "failed": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            stats["requests"] += 1
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            if fail_rate and random.random() < fail_rate:
+                stats["failed"] += 1
+                self.send_error(503, "stub failure")
+                return
+            try:
+                min_x, min_y, max_x, max_y = _bbox(parse_qs(urlparse(self.path).query))
+            except (KeyError, ValueError):
+                self.send_error(400, "bbox 파라미터 필요")
+                return
+            data = [
+                d for d in recording.items()
+                if min_x <= float(d.get("coordx", "nan")) <= max_x and min_y <= float(d.get("coordy", "nan")) <= max_y
+            ]
+            body = json.dumps({"response": {"coordtype": 1, "datacount": len(data), "data": data}},
+                              ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.stats = stats
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="ITS cctvInfo stub 서버")
+    ap.add_argument("recording")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    args = ap.parse_args()
+
+    server = make_server(args.recording, args.port, args.latency_ms, args.fail_rate)
+    print(f"[its_stub] http://127.0.0.1:{args.port}/cctvInfo ({args.recording})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
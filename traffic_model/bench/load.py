@@ -0,0 +1,487 @@
+# 동시 카메라 부하 테스트: N 대 카메라가 /analyze/frame 에 설정 FPS 로 프레임을 보내고, 동시에 M 개 /view/ws(push) 클라이언트를 붙여서
+# 모델 노드 하나가 카메라 몇 대까지 버티는지 확인
+# 사용법:
+#   python -m bench.load [--cameras 1,2,4,8] [--fps 5] [--duration 30] [--view-clients 2] [--view-format binary]
+#       [--frames <JPEG DIR> | --video <영상 파일>] [--tiny | --model <가중치>] [--url http://127.0.0.1:8000] [--json load.json]
+# - --url 이 없으면 app.main:app 을 이 프로세스 안의 uvicorn(127.0.0.1, 빈 포트)으로 띄우고 백엔드는 bench.backend_stub
+#   (부하 생성기와 서버가 GIL 을 나눠 쓰므로 한계치를 정확히 보려면 별도 프로세스 서버에 --url 로 거는 게 맞음)
+# - --url 이면 이미 떠 있는 서버에 요청. 그 서버의 BACKEND_BASE 를 --backend-port 로 띄운 stub 으로 지정하면 전달 수도 집계
+# - --cameras 에 여러 값을 주면 단계별로 차례로 실행하고, 목표 fps 를 유지한(버린 프레임 비율 <= --max-drop, 오류 0) 최대 대수 출력
+# - 카메라는 open-loop: k 번째 프레임을 시작 + k/fps 에 보냄. 카메라당 진행 중 요청이 --max-inflight 개면 그 프레임은 버림(skipped)
+#   (서버 CameraSlots 가 카메라당 1개만 처리하므로 기본 1. 2 이상이면 서버 쪽 429 거절로 나타남)
+# - 카메라별: 달성 fps(성공 응답 기준), 버린 프레임(skipped + 429/503 rejected), 오류율, 응답 지연 p50/p95/p99,
+#   서버 대기(queue = Server-Timing total - 측정된 단계 합, 워커 풀/이벤트 루프 대기), 전송 지연(lag = 실제 전송 - 예정 시각)
+#   (--url 서버는 METRICS_SERVER_TIMING=true 로 띄워야 queue 가 나옴)
+# - view 클라이언트: push 모드로 JPEG 을 --fps 로 보내고 돌려받은 프레임 수/fps 와 서버 수신 ~ 클라이언트 도착 지연
+#   (push 모드 서버는 TARGET_FPS 보다 빨리 들어온 프레임을 일부러 건너뛰므로 received < sent 가 정상)
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from bench.pipeline import load_jpegs, parse_server_timing, tiny_model
+
+_REJECT_STATUS = (429, 503)
+# /view/ws binary 프레임 헤더 앞부분: magic(2s) version(u8) kind(u8) timestamp(f64)
+_VIEW_HEADER = struct.Struct("<2sBBd")
+
+
+@dataclass
+class CameraStats:
+    cctv_id: int
+    sent: int = 0
+    ok: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    errors: int = 0
+    error_kinds: Counter = field(default_factory=Counter)
+    latency_ms: List[float] = field(default_factory=list)
+    queue_ms: List[float] = field(default_factory=list)
+    lag_ms: List[float] = field(default_factory=list)
+
+
+@dataclass
+class ViewStats:
+    cctv_id: int
+    sent: int = 0
+    received: int = 0
+    errors: int = 0
+    error_kinds: Counter = field(default_factory=Counter)
+    latency_ms: List[float] = field(default_factory=list)
+
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(float(np.mean(values)), 2) if values else None
+
+
+# ---------- 카메라 (/analyze/frame) ----------
+
+async def _post_frame(client, cam: CameraStats, jpeg: bytes, frame_id: int, due: float, render: Optional[str]) -> None:
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    sent = loop.time()
+    cam.sent += 1
+    cam.lag_ms.append((sent - due) * 1000.0)
+    data = {"cctv_id": str(cam.cctv_id), "frame_id": str(frame_id)}
+    if render:
+        data["render"] = render
+    try:
+        r = await client.post("/analyze/frame", files={"image": ("frame.jpg", jpeg, "image/jpeg")}, data=data)
+    except httpx.HTTPError as e:
+        cam.errors += 1
+        cam.error_kinds[type(e).__name__] += 1
+        return
+    elapsed = (loop.time() - sent) * 1000.0
+
+    if r.status_code in _REJECT_STATUS:
+        cam.rejected += 1
+        return
+    if r.status_code != 200:
+        cam.errors += 1
+        cam.error_kinds[f"http_{r.status_code}"] += 1
+        return
+    body = r.json()
+    if not body.get("ok"):
+        cam.errors += 1
+        cam.error_kinds[str(body.get("error", "ok=false"))[:80]] += 1
+        return
+
+    cam.ok += 1
+    cam.latency_ms.append(elapsed)
+    timing = parse_server_timing(r.headers.get("server-timing", ""))
+    total = timing.pop("total", None)
+    if total is not None:
+        cam.queue_ms.append(max(0.0, total - sum(timing.values())))
+
+
+async def _camera(client, cam: CameraStats, jpegs: List[bytes], start: float, offset: float, fps: float,
+                  duration: float, max_inflight: int, render: Optional[str]) -> None:
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / fps
+    first = cam.cctv_id * 7  # 카메라마다 다른 프레임부터
+    inflight: set = set()
+    k = 0
+    while True:
+        due = start + offset + k * interval
+        if due - start >= duration:
+            break
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            cam.skipped += 1
+        else:
+            task = asyncio.create_task(
+                _post_frame(client, cam, jpegs[(first + k) % len(jpegs)], k, due, render))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        k += 1
+    if inflight:
+        await asyncio.gather(*inflight)
+
+
+# ---------- view 클라이언트 (/view/ws push) ----------
+
+async def _view_client(ws_base: str, view: ViewStats, jpegs: List[bytes], start: float, fps: float,
+                       duration: float, fmt: str, render: Optional[str], drain: float) -> None:
+    import websockets
+
+    loop = asyncio.get_running_loop()
+    url = f"{ws_base}/view/ws?cctv_id={view.cctv_id}&mode=push&format={fmt}"
+    if render:
+        url += f"&render={render}"
+
+    async def send_loop(ws) -> None:
+        interval = 1.0 / fps
+        k = 0
+        while k * interval < duration:
+            delay = start + k * interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send(jpegs[(view.cctv_id + k) % len(jpegs)])
+            view.sent += 1
+            k += 1
+
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            sender = asyncio.create_task(send_loop(ws))
+            deadline = start + duration + drain
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        msg = await asyncio.wait_for(ws.recv(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    now = time.time()
+                    if isinstance(msg, bytes):
+                        timestamp = _VIEW_HEADER.unpack_from(msg)[3]
+                    else:
+                        obj = json.loads(msg)
+                        if "error" in obj:
+                            view.errors += 1
+                            view.error_kinds[str(obj["error"])[:80]] += 1
+                            continue
+                        if "timestamp" not in obj:
+                            continue  # binary 형식의 hello / roi
+                        timestamp = obj["timestamp"]
+                    view.received += 1
+                    # timestamp 는 서버가 프레임을 받은 시각 (time.time(), 같은 호스트 기준)
+                    view.latency_ms.append((now - timestamp) * 1000.0)
+            finally:
+                sender.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await sender
+    except (OSError, websockets.exceptions.WebSocketException) as e:
+        view.errors += 1
+        view.error_kinds[type(e).__name__] += 1
+
+
+async def _warmup(base_url: str, jpegs: List[bytes], count: int, cctv_id: int) -> None:
+    """모델 로드/첫 추론 비용이 첫 단계 지연에 섞이지 않도록 순차로 몇 장 보냄"""
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+        for i in range(count):
+            await client.post("/analyze/frame", files={"image": ("frame.jpg", jpegs[i % len(jpegs)], "image/jpeg")},
+                              data={"cctv_id": str(cctv_id), "frame_id": str(i)})
+
+
+# ---------- 한 단계 실행 ----------
+
+async def _run_level(base_url: str, cameras: int, args: argparse.Namespace, jpegs: List[bytes]) -> Dict[str, Any]:
+    import httpx
+
+    cams = [CameraStats(cctv_id=args.first_cctv_id + i) for i in range(cameras)]
+    views = [ViewStats(cctv_id=args.first_cctv_id + cameras + i) for i in range(args.view_clients)]
+    limits = httpx.Limits(max_connections=cameras * args.max_inflight + 4, max_keepalive_connections=cameras * args.max_inflight + 4)
+    ws_base = "ws" + base_url[len("http"):]
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time() + 0.2
+        # 카메라 시작 시점을 한 프레임 간격 안에서 고르게 흩뜨림 (모든 카메라가 같은 순간에 몰리지 않도록)
+        tasks = [
+            _camera(client, cam, jpegs, start, i / (cameras * args.fps), args.fps, args.duration,
+                    args.max_inflight, args.render)
+            for i, cam in enumerate(cams)
+        ]
+        tasks += [
+            _view_client(ws_base, view, jpegs, start, args.fps, args.duration, args.view_format, args.render, args.drain)
+            for view in views
+        ]
+        await asyncio.gather(*tasks)
+
+    return _level_report(cameras, cams, views, args)
+
+
+def _level_report(cameras: int, cams: List[CameraStats], views: List[ViewStats],
+                  args: argparse.Namespace) -> Dict[str, Any]:
+    per_camera = []
+    for cam in cams:
+        offered = cam.sent + cam.skipped
+        per_camera.append({
+            "cctv_id": cam.cctv_id,
+            "offered": offered,
+            "sent": cam.sent,
+            "ok": cam.ok,
+            "achieved_fps": round(cam.ok / args.duration, 2),
+            "skipped": cam.skipped,
+            "rejected": cam.rejected,
+            "dropped": cam.skipped + cam.rejected,
+            "errors": cam.errors,
+            "error_rate": round(cam.errors / offered, 4) if offered else 0.0,
+            "error_kinds": dict(cam.error_kinds),
+            "latency_p50_ms": _pct(cam.latency_ms, 50),
+            "latency_p95_ms": _pct(cam.latency_ms, 95),
+            "latency_p99_ms": _pct(cam.latency_ms, 99),
+            "queue_mean_ms": _mean(cam.queue_ms),
+            "queue_p95_ms": _pct(cam.queue_ms, 95),
+            "lag_p95_ms": _pct(cam.lag_ms, 95),
+        })
+
+    per_view = [{
+        "cctv_id": v.cctv_id,
+        "sent": v.sent,
+        "received": v.received,
+        "achieved_fps": round(v.received / args.duration, 2),
+        "errors": v.errors,
+        "error_kinds": dict(v.error_kinds),
+        "latency_p50_ms": _pct(v.latency_ms, 50),
+        "latency_p95_ms": _pct(v.latency_ms, 95),
+    } for v in views]
+
+    offered = sum(c["offered"] for c in per_camera)
+    dropped = sum(c["dropped"] for c in per_camera)
+    errors = sum(c["errors"] for c in per_camera)
+    all_latency = [x for cam in cams for x in cam.latency_ms]
+    all_queue = [x for cam in cams for x in cam.queue_ms]
+    summary = {
+        "cameras": cameras,
+        "target_fps": args.fps * cameras,
+        "achieved_fps": round(sum(c["ok"] for c in per_camera) / args.duration, 2),
+        "offered": offered,
+        "dropped": dropped,
+        "drop_rate": round(dropped / offered, 4) if offered else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / offered, 4) if offered else 0.0,
+        "latency_p50_ms": _pct(all_latency, 50),
+        "latency_p95_ms": _pct(all_latency, 95),
+        "latency_p99_ms": _pct(all_latency, 99),
+        "queue_mean_ms": _mean(all_queue),
+        "queue_p95_ms": _pct(all_queue, 95),
+    }
+    summary["sustained"] = summary["drop_rate"] <= args.max_drop and errors == 0
+    return {"summary": summary, "cameras": per_camera, "views": per_view}
+
+
+def _fmt(v: Any) -> str:
+    return "-" if v is None else str(v)
+
+
+def _print_level(level: Dict[str, Any]) -> None:
+    s = level["summary"]
+    print(f"\n== cameras={s['cameras']}  target {s['target_fps']:.1f} fps -> achieved {s['achieved_fps']:.1f} fps  "
+          f"drop {s['drop_rate']:.1%}  error {s['error_rate']:.1%}  "
+          f"p95 {_fmt(s['latency_p95_ms'])}ms  queue p95 {_fmt(s['queue_p95_ms'])}ms  "
+          f"{'OK' if s['sustained'] else 'NOT SUSTAINED'}")
+    print(f"{'cctv':>6} {'fps':>6} {'ok':>6} {'skip':>5} {'rej':>5} {'err':>5} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'queue':>8} {'lag95':>8}")
+    for c in level["cameras"]:
+        print(f"{c['cctv_id']:>6} {c['achieved_fps']:>6} {c['ok']:>6} {c['skipped']:>5} {c['rejected']:>5} "
+              f"{c['errors']:>5} {_fmt(c['latency_p50_ms']):>8} {_fmt(c['latency_p95_ms']):>8} "
+              f"{_fmt(c['latency_p99_ms']):>8} {_fmt(c['queue_mean_ms']):>8} {_fmt(c['lag_p95_ms']):>8}")
+        if c["error_kinds"]:
+            print(f"{'':>6} errors: {c['error_kinds']}")
+    for v in level["views"]:
+        print(f"{'view':>6} cctv={v['cctv_id']} sent={v['sent']} received={v['received']} "
+              f"({v['achieved_fps']} fps) p50 {_fmt(v['latency_p50_ms'])}ms p95 {_fmt(v['latency_p95_ms'])}ms"
+              + (f" errors={v['error_kinds']}" if v["errors"] else ""))
+
+
+# ---------- 서버 ----------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_app_server():
+    """app.main:app 을 백그라운드 스레드의 uvicorn 으로 (startup/shutdown 훅 포함)"""
+    import uvicorn
+
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, name="load-uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            sys.exit("uvicorn 시작 실패")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def _settings_snapshot() -> Dict[str, Any]:
+    from infra.configs import settings
+
+    keys = ("INFERENCE_ENGINE", "INFERENCE_PRECISION", "MODEL_PATH", "MODEL_IMGSZ", "CPU_WORKERS",
+            "BATCH_ENABLED", "MOTION_GATE_ENABLED", "ANALYZE_JPEG_REDUCE", "BACKEND_BATCH_ENABLED")
+    return {k: getattr(settings, k, None) for k in keys}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="동시 카메라 부하 테스트 (/analyze/frame + /view/ws push)")
+    ap.add_argument("--cameras", default="4", help="카메라 수. 쉼표로 여러 값을 주면 단계별로 실행 (예: 1,2,4,8)")
+    ap.add_argument("--fps", type=float, default=5.0, help="카메라당 전송 fps")
+    ap.add_argument("--duration", type=float, default=30.0, help="단계별 전송 시간(초)")
+    ap.add_argument("--max-inflight", type=int, default=1,
+                    help="카메라당 동시 요청 수, 넘으면 그 프레임은 버림 (서버는 카메라당 1개만 받으므로 2 이상이면 429 로 확인)")
+    ap.add_argument("--warmup", type=int, default=5, help="첫 단계 전에 보내는 워밍업 프레임 수 (집계 제외)")
+    ap.add_argument("--view-clients", type=int, default=0, help="/view/ws push 클라이언트 수")
+    ap.add_argument("--view-format", default="binary", choices=("json", "binary"))
+    ap.add_argument("--render", default=None, help="server | client (기본: 서버 설정)")
+    ap.add_argument("--first-cctv-id", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=30.0, help="요청 타임아웃(초)")
+    ap.add_argument("--drain", type=float, default=2.0, help="전송이 끝난 뒤 view 응답을 기다리는 시간(초)")
+    ap.add_argument("--max-drop", type=float, default=0.01, help="이 비율 이하로 버리고 오류가 없으면 유지한 것으로 봄")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--frames", default=None, help="녹화한 JPEG 프레임 디렉터리")
+    src.add_argument("--video", default=None, help="로컬 영상 파일")
+    ap.add_argument("--stride", type=int, default=1, help="영상에서 N 프레임마다 하나 사용")
+    ap.add_argument("--count", type=int, default=100, help="돌려 쓸 프레임 수")
+    ap.add_argument("--url", default=None, help="이미 떠 있는 서버 주소 (없으면 이 프로세스에서 app.main:app 실행)")
+    ap.add_argument("--backend-port", type=int, default=None,
+                    help="backend stub 포트 (--url 이 없으면 빈 포트로 항상 띄움)")
+    ap.add_argument("--backend-latency-ms", type=float, default=0.0)
+    ap.add_argument("--backend-fail-rate", type=float, default=0.0)
+    model = ap.add_mutually_exclusive_group()
+    model.add_argument("--tiny", action="store_true", help="학습 안 된 yolov8n (오프라인 실행용)")
+    model.add_argument("--model", default=None, help="가중치 경로 (MODEL_PATH 대신)")
+    ap.add_argument("--engine", default=None, help="INFERENCE_ENGINE 대신 사용할 엔진")
+    ap.add_argument("--server-log", action="store_true", help="이 프로세스에서 띄운 서버의 요청 로그 출력")
+    ap.add_argument("--json", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    try:
+        levels = [int(x) for x in args.cameras.split(",") if x.strip()]
+    except ValueError:
+        sys.exit(f"--cameras 형식 오류: {args.cameras}")
+    if not levels or min(levels) < 1 or args.fps <= 0 or args.duration <= 0 or args.max_inflight < 1:
+        sys.exit("--cameras / --fps / --duration / --max-inflight 는 양수여야 합니다")
+
+    in_process = args.url is None
+    if in_process:
+        # 설정은 import 시점에 읽히므로 앱 모듈을 import 하기 전에 환경변수부터
+        if args.tiny:
+            os.environ["MODEL_PATH"] = tiny_model()
+        elif args.model:
+            os.environ["MODEL_PATH"] = args.model
+        if args.engine:
+            os.environ["INFERENCE_ENGINE"] = args.engine
+        os.environ["METRICS_SERVER_TIMING"] = "true"  # 서버 대기 시간(queue) 계산용
+    elif args.tiny or args.model or args.engine:
+        print("[bench.load] --url 사용 시 --tiny/--model/--engine 은 무시됩니다 (서버 쪽 설정을 따름)")
+
+    backend = None
+    if in_process or args.backend_port is not None:
+        from bench.backend_stub import start_in_thread
+
+        backend = start_in_thread(args.backend_port or 0, args.backend_latency_ms, args.backend_fail_rate)
+        if in_process:
+            os.environ["BACKEND_BASE"] = f"http://127.0.0.1:{backend.server_address[1]}"
+        else:
+            print(f"[bench.load] backend stub: http://127.0.0.1:{backend.server_address[1]} "
+                  f"(서버의 BACKEND_BASE 를 여기로 지정해야 전달 수가 집계됨)")
+
+    jpegs = load_jpegs(args.frames, args.video, args.count, max(1, args.stride))
+    if not jpegs:
+        sys.exit("프레임이 없습니다")
+    source = args.frames or args.video or "synthetic"
+
+    server = thread = None
+    if in_process:
+        server, thread, base_url = _start_app_server()
+    else:
+        base_url = args.url.rstrip("/")
+
+    print(f"[bench.load] {base_url} source={source} ({len(jpegs)} frames) fps={args.fps}/camera "
+          f"duration={args.duration}s levels={levels} view_clients={args.view_clients}")
+
+    report: Dict[str, Any] = {
+        "environment": {
+            "url": args.url or "in-process",
+            "source": source,
+            "fps": args.fps,
+            "duration_s": args.duration,
+            "max_inflight": args.max_inflight,
+            "view_clients": args.view_clients,
+            "view_format": args.view_format,
+            "cpu_count": os.cpu_count(),
+            "settings": _settings_snapshot() if in_process else None,
+        },
+        "levels": [],
+    }
+    # 이 프로세스에서 띄운 서버는 요청마다 로그를 찍으므로 단계 실행 중에는 stdout 을 버림
+    quiet = in_process and not args.server_log
+    try:
+        if args.warmup > 0:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                asyncio.run(_warmup(base_url, jpegs, args.warmup, args.first_cctv_id))
+        for cameras in levels:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                level = asyncio.run(_run_level(base_url, cameras, args, jpegs))
+            _print_level(level)
+            report["levels"].append(level)
+    finally:
+        if server is not None:
+            # shutdown 훅에서 backend_client 가 남은 검출 결과를 stub 으로 보냄
+            server.should_exit = True
+            thread.join(timeout=30)
+
+    sustained = [lv["summary"]["cameras"] for lv in report["levels"] if lv["summary"]["sustained"]]
+    report["max_sustained_cameras"] = max(sustained) if sustained else 0
+    print(f"\n[bench.load] {args.fps} fps 를 유지한 최대 카메라 수: {report['max_sustained_cameras']} "
+          f"(drop <= {args.max_drop:.1%}, 오류 0 기준)")
+
+    if backend is not None:
+        stats = backend.stats
+        report["backend"] = {
+            "requests": dict(stats["requests"]),
+            "failed": stats["failed"],
+            "bytes": stats["bytes"],
+            "detections_by_cctv": dict(stats["detections_by_cctv"]),
+        }
+        print(f"[bench.load] backend stub: requests={dict(stats['requests'])} failed={stats['failed']} "
+              f"detections={sum(stats['detections_by_cctv'].values())}")
+        backend.shutdown()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[bench.load] 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# 서빙 경로 벤치마크: 녹화한 CCTV 프레임을 /analyze/frame 전체 경로와 단계별로 재생해서 지연시간/처리량/메모리 측정
+# 사용법:
+#   python -m bench.pipeline [--frames <JPEG DIR> | --video <영상 파일>] [--count 100] [--tiny | --model <가중치>]
+#       [--stages decode,enhance,predict,roi,render,encode,pipeline] [--json run.json]
+#       [--compare base.json --max-regression 0.15]
+# - 프레임을 주지 않으면 고정 seed 합성 프레임 (오프라인/CI 용). --tiny 는 학습 안 된 yolov8n 을 yaml 에서 바로 만들어 씀 (다운로드 없음)
+# - 단계: decode(decode_jpeg) / enhance(enhance_frame) / predict(엔진 predict, 트래킹 포함) / roi(filter_detections)
+#         / render(draw_detections) / encode(cv2.imencode) / pipeline(TestClient 로 /analyze/frame, 백엔드는 로컬 stub)
+# - 단계별 p50/p95/p99(ms), 처리량(fps), 단계 실행 중 최대 RSS(MB). pipeline 은 Server-Timing 으로 내부 단계 평균도 출력
+# - --compare: 이전 JSON 과 p95 비교, --max-regression 보다 느려진 단계가 있으면 종료 코드 1
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+IMAGE_EXTS = {".jpg", ".jpeg"}
+STAGES = ("decode", "enhance", "predict", "roi", "render", "encode", "pipeline")
+CLASSES = ["승용차", "버스", "트럭", "오토바이(자전거)"]
+
+
+# ---------- 입력 프레임 ----------
+
+def _synthetic(count: int, seed: int = 0) -> List[np.ndarray]:
+    # 배경 + 움직이는 사각형 (모션 게이트가 켜져 있어도 매 프레임 검출하도록 조금씩 이동)
+    rng = np.random.default_rng(seed)
+    base = cv2.resize(rng.integers(40, 160, (18, 32, 3), dtype=np.uint8), (1280, 720), interpolation=cv2.INTER_LINEAR)
+    boxes = [(int(rng.integers(0, 1100)), int(rng.integers(0, 600)), tuple(int(c) for c in rng.integers(0, 255, 3)))
+             for _ in range(12)]
+    frames = []
+    for i in range(count):
+        img = base.copy()
+        for x, y, color in boxes:
+            dx = (x + 7 * i) % 1120
+            cv2.rectangle(img, (dx, y), (dx + 160, y + 100), color, -1)
+        frames.append(img)
+    return frames
+
+
+def load_jpegs(frames_dir: Optional[str], video: Optional[str], count: int, stride: int) -> List[bytes]:
+    """/analyze/frame 에 실제로 들어오는 형태(JPEG bytes) 로 준비"""
+    if frames_dir:
+        paths = sorted(p for p in Path(frames_dir).rglob("*") if p.suffix.lower() in IMAGE_EXTS)[:count]
+        return [p.read_bytes() for p in paths]
+
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        idx = 0
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if idx % stride == 0:
+                frames.append(frame)
+            idx += 1
+        cap.release()
+    else:
+        frames = _synthetic(count)
+    # 백엔드 frameCaptureService 와 비슷한 품질로 인코딩
+    return [cv2.imencode(".jpg", f, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes() for f in frames]
+
+
+def _sample_detections(n: int, h: int, w: int, seed: int = 0) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    dets = []
+    for i in range(n):
+        bw, bh = int(rng.integers(w // 40, w // 8)), int(rng.integers(h // 40, h // 8))
+        x, y = int(rng.integers(0, w - bw)), int(rng.integers(0, h - bh))
+        dets.append({
+            "track_id": i + 1,
+            "cls": CLASSES[i % len(CLASSES)],
+            "conf": float(rng.uniform(0.3, 1.0)),
+            "bbox": [float(x), float(y), float(x + bw), float(y + bh)],
+        })
+    return dets
+
+
+def _sample_roi(h: int, w: int):
+    from vision.pipelines.roi import DirectionalRoi
+
+    up = np.array([[w * 0.05, h * 0.95], [w * 0.40, h * 0.35], [w * 0.50, h * 0.35], [w * 0.48, h * 0.95]], np.int32)
+    down = np.array([[w * 0.52, h * 0.95], [w * 0.50, h * 0.35], [w * 0.60, h * 0.35], [w * 0.95, h * 0.95]], np.int32)
+    return DirectionalRoi(up, down)
+
+
+# ---------- 측정 ----------
+
+def _reset_peak_rss() -> bool:
+    # Linux: clear_refs 에 5 를 쓰면 VmHWM(최대 RSS)이 현재 값으로 초기화됨 -> 단계별 최대치
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _summary(samples_ms: List[float], wall_s: float, peak_rss_mb: float) -> Dict[str, Any]:
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "max_ms": round(float(arr.max()), 3),
+        "throughput_fps": round(arr.size / wall_s, 2) if wall_s > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+def _run_stage(fn: Callable[[int], Any], count: int, warmup: int) -> Dict[str, Any]:
+    for i in range(min(warmup, count)):
+        fn(i)
+    _reset_peak_rss()
+    samples = []
+    t_start = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    wall = time.perf_counter() - t_start
+    return _summary(samples, wall, _peak_rss_mb())
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if name and dur:
+            out[name] = float(dur)
+    return out
+
+
+def _run_pipeline(jpegs: List[bytes], warmup: int, cctv_id: int) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    breakdown: Dict[str, List[float]] = {}
+    errors = 0
+    with TestClient(app) as client:
+        def post(i: int, record: bool = True) -> None:
+            nonlocal errors
+            r = client.post(
+                "/analyze/frame",
+                files={"image": ("frame.jpg", jpegs[i % len(jpegs)], "image/jpeg")},
+                data={"cctv_id": str(cctv_id), "frame_id": str(i)},
+            )
+            if not record:
+                return
+            if r.status_code != 200 or not r.json().get("ok"):
+                errors += 1
+            for name, ms in parse_server_timing(r.headers.get("server-timing", "")).items():
+                breakdown.setdefault(name, []).append(ms)
+
+        for i in range(warmup):
+            post(i, record=False)
+        result = _run_stage(post, len(jpegs), 0)
+    result["errors"] = errors
+    result["server_timing_mean_ms"] = {k: round(float(np.mean(v)), 3) for k, v in sorted(breakdown.items())}
+    return result
+
+
+# ---------- 비교 ----------
+
+def _compare(report: Dict[str, Any], baseline_path: str, max_regression: float) -> bool:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    for key in ("source", "frame_shape", "count"):
+        if baseline.get("environment", {}).get(key) != report["environment"][key]:
+            print(f"[bench.pipeline] 주의: 기준 결과와 {key} 가 다릅니다 "
+                  f"({baseline.get('environment', {}).get(key)} -> {report['environment'][key]})")
+    ok = True
+    print(f"\n{'stage':>10} {'base p95':>10} {'now p95':>10} {'ratio':>7}")
+    for stage, now in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or not base.get("p95_ms"):
+            continue
+        ratio = now["p95_ms"] / base["p95_ms"]
+        flag = ""
+        if ratio > 1.0 + max_regression:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"{stage:>10} {base['p95_ms']:>10.2f} {now['p95_ms']:>10.2f} {ratio:>6.2f}x{flag}")
+    return ok
+
+
+def tiny_model() -> str:
+    # 학습 안 된 yolov8n (구조/연산량만 같음). ultralytics 패키지 안의 yaml 로 만들어서 다운로드 없이 동작
+    path = Path(tempfile.gettempdir()) / "bench_tiny_yolov8n.pt"
+    if not path.exists():
+        from ultralytics import YOLO
+
+        YOLO("yolov8n.yaml").save(str(path))
+    return str(path)
+
+
+def _environment(args: argparse.Namespace, source: str, frame_shape) -> Dict[str, Any]:
+    from infra.configs import settings
+
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "opencv": cv2.__version__}
+    for mod in ("torch", "ultralytics", "onnxruntime", "openvino"):
+        try:
+            versions[mod] = __import__(mod).__version__
+        except Exception:
+            pass
+    return {
+        "source": source,
+        "frame_shape": list(frame_shape),
+        "count": args.count,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+        "settings": {
+            "INFERENCE_ENGINE": settings.INFERENCE_ENGINE,
+            "INFERENCE_PRECISION": settings.INFERENCE_PRECISION,
+            "MODEL_PATH": settings.MODEL_PATH,
+            "MODEL_IMGSZ": settings.MODEL_IMGSZ,
+            "PREPROCESS_DOWNSCALE": settings.PREPROCESS_DOWNSCALE,
+            "ANALYZE_JPEG_REDUCE": settings.ANALYZE_JPEG_REDUCE,
+            "ENHANCE_ADAPTIVE": settings.ENHANCE_ADAPTIVE,
+            "BATCH_ENABLED": settings.BATCH_ENABLED,
+            "MOTION_GATE_ENABLED": settings.MOTION_GATE_ENABLED,
+            "CPU_WORKERS": settings.CPU_WORKERS,
+        },
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="/analyze/frame 서빙 경로 벤치마크")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--frames", default=None, help="녹화한 JPEG 프레임 디렉터리")
+    src.add_argument("--video", default=None, help="로컬 영상 파일")
+    ap.add_argument("--stride", type=int, default=1, help="영상에서 N 프레임마다 하나 사용")
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--warmup", type=int, default=5)
+    model = ap.add_mutually_exclusive_group()
+    model.add_argument("--tiny", action="store_true", help="학습 안 된 yolov8n (오프라인 CI 용)")
+    model.add_argument("--model", default=None, help="가중치 경로 (MODEL_PATH 대신)")
+    ap.add_argument("--engine", default=None, help="INFERENCE_ENGINE 대신 사용할 엔진")
+    ap.add_argument("--stages", default=",".join(STAGES))
+    ap.add_argument("--detections", type=int, default=20, help="roi/render 단계에 쓰는 합성 검출 수")
+    ap.add_argument("--cctv-id", type=int, default=1)
+    ap.add_argument("--json", default=None, help="결과 JSON 저장 경로")
+    ap.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    ap.add_argument("--max-regression", type=float, default=0.15, help="p95 허용 증가율 (0.15 = 15%%)")
+    args = ap.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        sys.exit(f"알 수 없는 단계: {', '.join(sorted(unknown))} (사용 가능: {', '.join(STAGES)})")
+
+    # 설정은 import 시점에 읽히므로 앱 모듈을 import 하기 전에 환경변수부터
+    if args.tiny:
+        os.environ["MODEL_PATH"] = tiny_model()
+    elif args.model:
+        os.environ["MODEL_PATH"] = args.model
+    if args.engine:
+        os.environ["INFERENCE_ENGINE"] = args.engine
+    os.environ["METRICS_SERVER_TIMING"] = "true"
+    backend = None
+    if "pipeline" in stages:
+        from bench.backend_stub import start_in_thread
+
+        backend = start_in_thread()
+        os.environ["BACKEND_BASE"] = f"http://127.0.0.1:{backend.server_address[1]}"
+
+    from infra.configs.settings import ANALYZE_JPEG_REDUCE
+    from vision.inference.registry import get_shared_engine
+    from vision.pipelines.decode import decode_jpeg
+    from vision.pipelines.preprocess import enhance_frame, prepare_for_inference
+    from vision.pipelines.render import draw_detections
+
+    jpegs = load_jpegs(args.frames, args.video, args.count, max(1, args.stride))
+    if not jpegs:
+        sys.exit("프레임이 없습니다")
+    source = args.frames or args.video or "synthetic"
+    frames = [decode_jpeg(j)[0] for j in jpegs]
+    n = len(frames)
+    h, w = frames[0].shape[:2]
+
+    report: Dict[str, Any] = {"environment": _environment(args, source, frames[0].shape), "stages": {}}
+    print(f"[bench.pipeline] {source}: {n} frames {w}x{h}, stages={','.join(stages)}")
+
+    dets = _sample_detections(args.detections, h, w)
+    roi = _sample_roi(h, w)
+
+    for stage in stages:
+        if stage == "decode":
+            result = _run_stage(lambda i: decode_jpeg(jpegs[i], ANALYZE_JPEG_REDUCE), n, args.warmup)
+        elif stage == "enhance":
+            result = _run_stage(lambda i: enhance_frame(frames[i]), n, args.warmup)
+        elif stage == "predict":
+            engine = get_shared_engine()
+            inputs = [prepare_for_inference(f)[0] for f in frames]
+            result = _run_stage(lambda i: engine.predict(inputs[i], args.cctv_id), n, args.warmup)
+            engine.trackers.reset(args.cctv_id)
+        elif stage == "roi":
+            # filter_detections 는 dict 를 수정하므로 호출마다 새 사본 (사본 비용은 제외)
+            # warmup 도 _run_stage 에서 같은 i 로 불리므로 인덱스 대신 순서대로 꺼내 씀
+            copies = iter([[dict(d) for d in dets] for _ in range(min(args.warmup, n) + n)])
+            result = _run_stage(lambda i: roi.filter_detections(next(copies)), n, args.warmup)
+        elif stage == "render":
+            result = _run_stage(lambda i: draw_detections(frames[i], dets, roi.polygons), n, args.warmup)
+        elif stage == "encode":
+            params = [cv2.IMWRITE_JPEG_QUALITY, 95]
+            result = _run_stage(lambda i: cv2.imencode(".jpg", frames[i], params), n, args.warmup)
+        else:
+            result = _run_pipeline(jpegs, args.warmup, args.cctv_id)
+        report["stages"][stage] = result
+        print(f"{stage:>10} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+              f"p99 {result['p99_ms']:>8.2f}ms  {result['throughput_fps']:>8.1f} fps  "
+              f"peak RSS {result['peak_rss_mb']:>7.1f}MB")
+        if stage == "pipeline":
+            inner = ", ".join(f"{k} {v:.1f}" for k, v in result["server_timing_mean_ms"].items())
+            print(f"{'':>10} 내부 단계 평균(ms): {inner}  오류 {result['errors']}")
+
+    if backend is not None:
+        backend.shutdown()
+        report["backend_stub"] = {"requests": dict(backend.stats["requests"]), "failed": backend.stats["failed"]}
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[bench.pipeline] 결과 저장: {args.json}")
+
+    if args.compare and not _compare(report, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# fp32 vs int8 모델 정확도(mAP) / 프레임당 지연시간 비교 리포트
+# 사용법:
+#   python -m bench.quant --fp32 models/test.onnx --int8 models/test_int8.onnx \
+#       --frames day=<주간 프레임 DIR> --frames night=<야간 프레임 DIR> \
+#       [--data <train/ 에서 쓰던 data.yaml>] [--json report.json]
+# - 지연시간: 같은 엔진(onnxruntime/openvino) 코드 경로로 측정. batch 1 기준 p50/p95 와 batch N 처리량
+# - 정확도: --data 를 주면 ultralytics val(split=val)로 mAP50 / mAP50-95 를 각각 계산해 차이를 출력
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from infra.configs.settings import MODEL_IMGSZ
+from vision.inference.registry import create_engine
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def _engine_name(path: str) -> str:
+    return "openvino" if Path(path).is_dir() or path.endswith(".xml") else "onnxruntime"
+
+
+def _load_sets(specs: List[str], count: int) -> Dict[str, List[np.ndarray]]:
+    if not specs:
+        # 저장된 프레임이 없으면 밝기만 다른 합성 프레임 (지연시간 확인용)
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 60, (720, 1280, 3), dtype=np.uint8)
+        # cv2.add(base, 110) 처럼 스칼라를 주면 첫 채널만 더해지므로 세 채널 모두 지정
+        return {"day": [cv2.add(base, (110, 110, 110, 0))] * count, "night": [base] * count}
+
+    sets = {}
+    for spec in specs:
+        label, _, path = spec.partition("=")
+        if not path:
+            label, path = Path(spec).name, spec
+        paths = sorted(p for p in Path(path).rglob("*") if p.suffix.lower() in IMAGE_EXTS)[:count]
+        frames = [f for f in (cv2.imread(str(p)) for p in paths) if f is not None]
+        if frames:
+            sets[label] = frames
+    return sets
+
+
+def _latency(engine, frames: List[np.ndarray], batch: int) -> dict:
+    engine.detect_batch(frames[:1])  # 워밍업
+    single = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        engine.detect_batch([frame])
+        single.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    for s in range(0, len(frames), batch):
+        engine.detect_batch(frames[s:s + batch])
+    batched = (time.perf_counter() - t0) * 1000.0 / len(frames)
+
+    return {
+        "p50_ms": round(float(np.percentile(single, 50)), 2),
+        "p95_ms": round(float(np.percentile(single, 95)), 2),
+        f"batch{batch}_ms_per_frame": round(batched, 2),
+    }
+
+
+def _map(model_path: str, data: str, imgsz: Optional[int]) -> dict:
+    from ultralytics import YOLO
+
+    # imgsz 를 주지 않으면 모델(체크포인트/export 메타데이터)의 imgsz 로 평가
+    kwargs = {"imgsz": imgsz} if imgsz else {}
+    metrics = YOLO(model_path, task="detect").val(
+        data=data, split="val", batch=1, device="cpu", plots=False, verbose=False, **kwargs)
+    return {"map50": round(float(metrics.box.map50), 4), "map50_95": round(float(metrics.box.map), 4)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="fp32 vs int8 accuracy / latency report")
+    parser.add_argument("--fp32", required=True)
+    parser.add_argument("--int8", required=True)
+    parser.add_argument("--frames", action="append", default=[], help="라벨=DIR (여러 번 지정 가능)")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--data", default=None, help="mAP 계산용 data.yaml (val split 사용)")
+    parser.add_argument("--imgsz", type=int, default=MODEL_IMGSZ, help="기본: 모델의 학습 imgsz")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로도 저장")
+    args = parser.parse_args()
+
+    sets = _load_sets(args.frames, args.count)
+    if not sets:
+        sys.exit("프레임이 없습니다")
+
+    models = {"fp32": args.fp32, "int8": args.int8}
+    report: dict = {"latency": {}, "accuracy": {}}
+
+    for precision, path in models.items():
+        engine = create_engine(_engine_name(path), model_path=path, precision=precision)
+        engine._ensure()
+        report["latency"][precision] = {label: _latency(engine, frames, args.batch)
+                                        for label, frames in sets.items()}
+
+    print(f"{'set':>8} {'fp32 p50':>9} {'int8 p50':>9} {'speedup':>8} {'fp32 p95':>9} {'int8 p95':>9}")
+    for label in sets:
+        fp, q = report["latency"]["fp32"][label], report["latency"]["int8"][label]
+        speedup = fp["p50_ms"] / q["p50_ms"] if q["p50_ms"] else 0.0
+        print(f"{label:>8} {fp['p50_ms']:>9.2f} {q['p50_ms']:>9.2f} {speedup:>7.2f}x "
+              f"{fp['p95_ms']:>9.2f} {q['p95_ms']:>9.2f}")
+
+    if args.data:
+        for precision, path in models.items():
+            report["accuracy"][precision] = _map(path, args.data, args.imgsz)
+        fp, q = report["accuracy"]["fp32"], report["accuracy"]["int8"]
+        report["accuracy"]["delta"] = {k: round(q[k] - fp[k], 4) for k in fp}
+        print(f"mAP50    fp32 {fp['map50']:.4f}  int8 {q['map50']:.4f}  delta {q['map50'] - fp['map50']:+.4f}")
+        print(f"mAP50-95 fp32 {fp['map50_95']:.4f}  int8 {q['map50_95']:.4f}  "
+              f"delta {q['map50_95'] - fp['map50_95']:+.4f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
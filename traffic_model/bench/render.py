@@ -0,0 +1,173 @@
+# 검출 결과 시각화 프레임당 비용 비교 (기존 PIL RGBA 합성 vs AnnotationRenderer)
+# 사용법: python -m bench.render [--iters 20]
+# 1080p 프레임, 상/하행 ROI, 검출 20/100/300개. 결과 이미지 차이(평균 절대 오차, 차이 > 32 인 픽셀 비율)도 출력
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from vision.pipelines.render import AnnotationRenderer, load_font
+
+DETECTION_COUNTS = (20, 100, 300)
+CLASSES = ["승용차", "버스", "트럭", "오토바이(자전거)"]
+
+
+def _draw_live_style_legacy(img_rgb: np.ndarray, detections, roi_dir=None) -> np.ndarray:
+    # AnnotationRenderer 도입 전 analyze._draw_live_style (비교 기준)
+    vis = img_rgb.copy()
+
+    # 방향별 ROI 오버레이
+    def _overlay_roi(vis, pts, color):
+        cv2.polylines(vis, [pts], True, color, 2)
+        overlay = vis.copy()
+        cv2.fillPoly(overlay, [pts], color)
+        return cv2.addWeighted(overlay, 0.2, vis, 0.8, 0.0)
+
+    if roi_dir:
+        if roi_dir.get("upstream") is not None:
+            vis = _overlay_roi(vis, roi_dir["upstream"], (16, 185, 129))  # 녹색톤
+        if roi_dir.get("downstream") is not None:
+            vis = _overlay_roi(
+                vis, roi_dir["downstream"], (59, 130, 246))  # 파랑톤
+
+    # PIL로 bbox/텍스트/중심점 처리
+    base_img = Image.fromarray(vis).convert("RGBA")
+    overlay_img = Image.new("RGBA", base_img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay_img, "RGBA")
+    font = load_font(10)
+
+    for d in detections:
+        x1, y1, x2, y2 = map(int, d["bbox"])
+        base = d.get("track_id") or 0
+
+        # ID별 색상 (bbox와 동일하게 사용)
+        r = 50 + ((base * 73) % 205)
+        g = 80 + ((base * 41) % 175)
+        b = 120 + ((base * 29) % 135)
+        color_rgba = (r, g, b, 255)
+
+        # 바운딩 박스 (PIL로 그려도 충분)
+        draw.rectangle((x1, y1, x2, y2), outline=color_rgba, width=2)
+
+        # 라벨 텍스트 구성
+        id_text = f"ID:{base} " if base else ""
+        cls_text = f"{d['cls']} {(float(d['conf']) * 100):.1f}%"
+        full_label = id_text + cls_text
+
+        # 바운딩 박스 상단 중앙에 텍스트 박스 위치
+        cx = (x1 + x2) / 2.0
+        # 전체 텍스트 크기 측정
+        full_left, full_top, full_right, full_bottom = draw.textbbox(
+            (0, 0), full_label, font=font)
+        text_w = full_right - full_left
+        text_h = full_bottom - full_top
+
+        padding_x = 4
+        padding_y = 4
+        box_w = text_w + padding_x * 2
+        box_h = text_h + padding_y * 2
+
+        box_left = int(cx - box_w / 2)
+        box_top = max(0, y1 - box_h)
+        box_right = box_left + box_w
+        box_bottom = box_top + box_h
+
+        # 반투명 배경 박스
+        draw.rectangle(
+            (box_left, box_top, box_right, box_bottom),
+            fill=(0, 0, 0, 150),
+        )
+
+        # 텍스트 박스 내부 중앙 정렬
+        text_x = box_left + padding_x
+        text_y = box_top + padding_y
+        text_x = box_left + (box_w - text_w) / 2 - full_left
+        text_y = box_top + (box_h - text_h) / 2 - full_top
+
+        cursor_x = text_x
+        # ID 부분은 bbox 색상과 동일
+        if id_text:
+            id_left, id_top, id_right, id_bottom = draw.textbbox(
+                (0, 0), id_text, font=font)
+            id_w = id_right - id_left
+            draw.text(
+                (cursor_x, text_y),
+                id_text,
+                font=font,
+                fill=color_rgba,  # bbox와 동일 색상
+            )
+            cursor_x += id_w
+
+        # 나머지 텍스트는 흰색
+        draw.text(
+            (cursor_x, text_y),
+            cls_text,
+            font=font,
+            fill=(255, 255, 255, 255),
+        )
+
+        # 중심점 (투명도 있는 red)
+        center_x = (x1 + x2) / 2.0
+        center_y = (y1 + y2) / 2.0
+        radius = 4
+        draw.ellipse(
+            (center_x - radius, center_y - radius,
+             center_x + radius, center_y + radius),
+            fill=(255, 0, 0, 150),
+            outline=None,
+        )
+
+    combined = Image.alpha_composite(base_img, overlay_img).convert("RGB")
+    return np.array(combined)
+
+
+def _sample(n: int, h: int = 1080, w: int = 1920):
+    rng = np.random.default_rng(n)
+    img = cv2.resize(rng.integers(0, 255, (27, 48, 3), dtype=np.uint8), (w, h), interpolation=cv2.INTER_LINEAR)
+    dets = []
+    for i in range(n):
+        x, y = int(rng.integers(0, w - 200)), int(rng.integers(40, h - 150))
+        bw, bh = int(rng.integers(40, 200)), int(rng.integers(30, 150))
+        dets.append({
+            "track_id": int(i + 1),
+            "cls": CLASSES[i % len(CLASSES)],
+            "conf": float(rng.uniform(0.3, 1.0)),
+            "bbox": [x, y, x + bw, y + bh],
+        })
+    roi = {
+        "upstream": np.array([[100, 200], [900, 180], [950, 1000], [60, 1050]], np.int32),
+        "downstream": np.array([[1000, 180], [1850, 200], [1880, 1050], [980, 1000]], np.int32),
+    }
+    return img, dets, roi
+
+
+def _per_frame_ms(fn, iters: int) -> float:
+    fn()  # 워밍업 (폰트/글자/ROI 캐시)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / iters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="annotation renderer micro-benchmark")
+    parser.add_argument("--iters", type=int, default=20)
+    args = parser.parse_args()
+
+    renderer = AnnotationRenderer(channel_order="rgb")  # 기존 구현과 같은 RGB 프레임으로 비교
+    print(f"{'dets':>5} {'legacy ms':>10} {'renderer ms':>12} {'speedup':>8} {'mean diff':>10} {'diff>32 %':>10}")
+    for n in DETECTION_COUNTS:
+        img, dets, roi = _sample(n)
+        legacy_ms = _per_frame_ms(lambda: _draw_live_style_legacy(img, dets, roi), args.iters)
+        new_ms = _per_frame_ms(lambda: renderer.render(img, dets, roi), args.iters)
+        diff = np.abs(_draw_live_style_legacy(img, dets, roi).astype(np.int16)
+                      - renderer.render(img, dets, roi).astype(np.int16))
+        print(f"{n:>5} {legacy_ms:>10.2f} {new_ms:>12.2f} {legacy_ms / new_ms:>7.1f}x "
+              f"{diff.mean():>10.3f} {(diff.max(axis=2) > 32).mean() * 100:>9.3f}%")
+
+
+if __name__ == "__main__":
+    main()
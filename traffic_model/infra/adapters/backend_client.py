@@ -0,0 +1,262 @@
+# 모델 서버 -> 백엔드(/api/detection) 결과 전송용 비동기 클라이언트
+# - 연결 풀 + keep-alive 로 프레임마다 TCP 연결을 새로 맺지 않음
+# - 크기가 제한된 전송 대기열: 가득 차면 가장 오래된 항목을 버리고 새 결과를 넣음
+# - 실패 시 지수 백오프 + jitter 재시도
+# - BACKEND_BATCH_ENABLED 이면 여러 카메라의 검출 결과를 /api/detection/batch 한 번으로 전송
+
+import asyncio
+import contextvars
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from infra.configs.settings import (
+    BACKEND_BATCH_ENABLED,
+    BACKEND_BATCH_MAX,
+    BACKEND_BATCH_WAIT_MS,
+    BACKEND_MAX_CONNECTIONS,
+    BACKEND_MAX_RETRIES,
+    BACKEND_QUEUE_SIZE,
+    BACKEND_SENDERS,
+)
+from infra.monitoring import metrics
+
+# 재시도할 가치가 있는 응답 코드 (그 외 4xx 는 요청 자체가 잘못된 것이므로 재시도 안 함)
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class _Job:
+    payload: Optional[Dict[str, Any]]
+    # (frame_id, jpeg bytes) -> /api/detection/image
+    image: Optional[Tuple[Any, bytes]] = None
+    # 단계 시간 라벨용 (전송 태스크는 요청 컨텍스트 밖에서 돌아 bind_camera 값을 못 씀)
+    cctv_id: Optional[Any] = None
+
+
+class BackendClient:
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = BACKEND_MAX_CONNECTIONS,
+        queue_size: int = BACKEND_QUEUE_SIZE,
+        max_retries: int = BACKEND_MAX_RETRIES,
+        senders: int = BACKEND_SENDERS,
+        batch_enabled: bool = BACKEND_BATCH_ENABLED,
+        batch_max: int = BACKEND_BATCH_MAX,
+        batch_wait_ms: float = BACKEND_BATCH_WAIT_MS,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.senders = max(1, senders)
+        self.batch_enabled = batch_enabled
+        self.batch_max = max(1, batch_max)
+        self.batch_wait_s = batch_wait_ms / 1000.0
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "dropped": 0, "retries": 0, "batches": 0}
+
+    # ------------------------------------------------------------------
+    # 수명 주기
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(5.0, connect=1.0),
+        )
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # 처음 전송을 요청한 요청의 contextvars(지표용 cctv_id 등)를 물려받지 않도록 빈 컨텍스트에서 시작
+        self._tasks = [asyncio.create_task(self._sender(), context=contextvars.Context()) for _ in range(self.senders)]
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """다른 백엔드 호출(스트림 URL 조회 등)에서도 같은 연결 풀을 쓰기 위한 접근자"""
+        self._ensure_started()
+        assert self._client is not None
+        return self._client
+
+    async def aclose(self, timeout: float = 3.0) -> None:
+        if self._client is None:
+            return
+        assert self._queue is not None
+        # 남은 결과는 잠깐 기다려서 보내고 종료
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._client.aclose()
+        self._client = None
+        self._queue = None
+        self._tasks = []
+
+    # ------------------------------------------------------------------
+    # 전송 요청 (이벤트 루프에서 바로 호출, 블로킹 없음)
+    # ------------------------------------------------------------------
+    def submit_detection(
+        self,
+        payload: Dict[str, Any],
+        image: Optional[Tuple[Any, bytes]] = None,
+    ) -> None:
+        self._put(_Job(payload=payload, image=image, cctv_id=payload.get("cctvId")))
+
+    def submit_image(self, frame_id: Any, image_bytes: bytes, cctv_id: Optional[Any] = None) -> None:
+        self._put(_Job(payload=None, image=(frame_id, image_bytes), cctv_id=cctv_id))
+
+    def _put(self, job: _Job) -> None:
+        self._ensure_started()
+        assert self._queue is not None
+        while True:
+            try:
+                self._queue.put_nowait(job)
+                self.stats["queued"] += 1
+                return
+            except asyncio.QueueFull:
+                # 오래된 결과보다 최신 결과가 중요하므로 가장 오래된 것을 버림
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.stats["dropped"] += 1
+                except asyncio.QueueEmpty:
+                    pass
+
+    # ------------------------------------------------------------------
+    # 전송 루프
+    # ------------------------------------------------------------------
+    async def _sender(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            jobs = [job]
+            try:
+                if self.batch_enabled and job.payload is not None:
+                    jobs += await self._collect_batch(queue)
+                    await self._send_batch(jobs)
+                else:
+                    await self._send_one(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed"] += len(jobs)
+                print(f"[backend_client] 객체 검출 결과 전송에 실패하였습니다: {e}")
+            finally:
+                for _ in jobs:
+                    queue.task_done()
+
+    async def _collect_batch(self, queue: asyncio.Queue) -> List[_Job]:
+        more: List[_Job] = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait_s
+        while len(more) + 1 < self.batch_max:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                more.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return more
+
+    async def _send_one(self, job: _Job) -> None:
+        if job.payload is not None:
+            t0 = time.perf_counter()
+            await self._request("POST", "/api/detection", json=job.payload, timeout=1.0)
+            metrics.observe("backend_post", time.perf_counter() - t0, job.cctv_id)
+            self.stats["sent"] += 1
+        if job.image is not None:
+            await self._send_image(job.image, job.cctv_id)
+
+    async def _send_batch(self, jobs: List[_Job]) -> None:
+        sent = [j for j in jobs if j.payload is not None]
+        payloads = [j.payload for j in sent]
+        t0 = time.perf_counter()
+        if len(payloads) == 1:
+            await self._request("POST", "/api/detection", json=payloads[0], timeout=1.0)
+        elif payloads:
+            await self._request("POST", "/api/detection/batch", json={"items": payloads}, timeout=2.0)
+            self.stats["batches"] += 1
+        if payloads:
+            # 묶음 전송이면 포함된 카메라마다 같은 전송 시간
+            elapsed = time.perf_counter() - t0
+            for j in sent:
+                metrics.observe("backend_post", elapsed, j.cctv_id)
+        self.stats["sent"] += len(payloads)
+        # 이미지 업로드는 multipart 라 묶지 않고 개별 전송
+        await asyncio.gather(*(self._send_image(j.image, j.cctv_id) for j in jobs if j.image is not None))
+
+    async def _send_image(self, image: Tuple[Any, bytes], cctv_id: Optional[Any] = None) -> None:
+        frame_id, image_bytes = image
+        t0 = time.perf_counter()
+        await self._request(
+            "POST",
+            "/api/detection/image",
+            data={"frame_id": str(frame_id)},
+            files={"image": ("analyzed_image.jpg", image_bytes, "image/jpeg")},
+            timeout=5.0,
+        )
+        metrics.observe("backend_image", time.perf_counter() - t0, cctv_id)
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        assert self._client is not None
+        attempt = 0
+        while True:
+            try:
+                resp = await self._client.request(method, url, **kwargs)
+                if resp.status_code not in _RETRY_STATUS:
+                    resp.raise_for_status()
+                    return resp
+                error: Exception = httpx.HTTPStatusError(
+                    f"{resp.status_code} from {url}", request=resp.request, response=resp)
+            except httpx.TransportError as e:
+                error = e
+            if attempt >= self.max_retries:
+                raise error
+            # full jitter: 0 ~ base * 2^attempt
+            await asyncio.sleep(random.uniform(0, 0.1 * (2 ** attempt)))
+            attempt += 1
+            self.stats["retries"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batching": self.batch_enabled,
+            **self.stats,
+        }
+
+
+_CLIENTS: Dict[str, BackendClient] = {}
+
+
+def get_backend_client(base_url: str) -> BackendClient:
+    client = _CLIENTS.get(base_url)
+    if client is None:
+        client = BackendClient(base_url)
+        _CLIENTS[base_url] = client
+    return client
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    return [c.snapshot() for c in _CLIENTS.values()]
+
+
+async def close_all() -> None:
+    for c in list(_CLIENTS.values()):
+        await c.aclose()
@@ -1,4 +1,27 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
 import cv2
+import numpy as np
+
+from infra.configs.settings import (
+    STREAM_BUFFER_SIZE,
+    STREAM_DECODE_FPS,
+    STREAM_DECODE_WIDTH,
+    STREAM_DECODER,
+    STREAM_KEYFRAMES_ONLY,
+    STREAM_RECONNECT_MAX_SECONDS,
+    STREAM_RECONNECT_MIN_SECONDS,
+)
+from infra.monitoring import metrics
+
+# 실행 중인 스트림 (상태 조회용)
+_ACTIVE: "weakref.WeakSet[FrameStream]" = weakref.WeakSet()
 
 
 def _is_hls(u):
@@ -9,37 +32,348 @@ def _is_rtsp(u):
     return u.startswith("rtsp://")
 
 
-class FrameStream:
-    def __init__(self, source):
-        self.source = source
-        self.cap = None
+def _scaled_size(width: int, height: int, decode_width: int) -> Tuple[int, int]:
+    """decode_width 로 축소한 (w, h). 축소가 필요 없으면 원본 크기 (짝수로 맞춤: swscale/yuv420 호환)"""
+    if not decode_width or width <= decode_width:
+        return width, height
+    return decode_width & ~1, max(2, int(round(height * decode_width / width)) & ~1)
 
-    def _ensure(self):
-        if self.cap is not None:
-            return
 
-        if _is_rtsp(self.source):
+class _OpenCVReader:
+    """
+    cv2.VideoCapture 기반. grab() 이 디코딩, retrieve() 는 BGR 변환(+축소)만 함
+    키프레임만 디코딩하는 옵션은 없으므로 keyframes_only 는 지원하지 않음
+    """
+
+    name = "opencv"
+
+    def __init__(self, source, decode_width: int = 0) -> None:
+        if _is_rtsp(source):
             print('in rtsp')
-            self.cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG)
+            self.cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
 
-        elif _is_hls(self.source):
+        elif _is_hls(source):
             print('in hls')
-            self.cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG)
+            self.cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
 
         else:
             print('anther...')
-            self.cap = cv2.VideoCapture(self.source)
+            self.cap = cv2.VideoCapture(source)
 
-    def read_one(self):
-        self._ensure()
-        ok, frame = self.cap.read()
-        if not ok:
+        # 내부 버퍼에 프레임이 쌓여 지연되는 것을 줄임 (지원하는 백엔드만 적용됨)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.decode_width = decode_width
+        self.native_size: Optional[Tuple[int, int]] = None
+
+    def grab(self) -> bool:
+        return self.cap.isOpened() and self.cap.grab()
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        ok, frame = self.cap.retrieve()
+        if not ok or frame is None:
             return None
+        h, w = frame.shape[:2]
+        self.native_size = (w, h)
+        size = _scaled_size(w, h, self.decode_width)
+        if size != (w, h):
+            # 이후 단계(게이트/추론/인코딩)가 모두 작은 프레임으로 처리됨
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
         return frame
 
-    def __del__(self):
+    def release(self) -> None:
+        self.cap.release()
+
+
+class _PyAVReader:
+    """
+    PyAV(FFmpeg) 기반
+    - keyframes_only: 디코더에 skip_frame=NONKEY 를 줘서 P/B 프레임은 디코딩 자체를 안 함
+    - 축소: YUV -> BGR 변환과 축소를 swscale 한 번으로 처리 (원본 크기 BGR 버퍼를 만들지 않음)
+    - 디코더 스레드는 FFmpeg 자동 설정 (frame/slice threading)
+    """
+
+    name = "pyav"
+
+    def __init__(self, source, decode_width: int = 0, keyframes_only: bool = False) -> None:
+        import av
+
+        options = {}
+        if _is_rtsp(source):
+            # 실시간 스트림만 입력 버퍼링을 끔 (파일/HLS 에 주면 시작 부분 프레임을 잃음)
+            options = {"rtsp_transport": "tcp", "fflags": "nobuffer"}
+        self.container = av.open(source, options=options, timeout=(10.0, 10.0))
+        try:
+            self.stream = self.container.streams.video[0]
+        except IndexError:
+            self.container.close()
+            raise IOError("영상 스트림이 없습니다")
+        self.stream.thread_type = "AUTO"
+        if keyframes_only:
+            self.stream.codec_context.skip_frame = "NONKEY"
+        self.decode_width = decode_width
+        self.native_size: Optional[Tuple[int, int]] = None
+        self._frames = self.container.decode(self.stream)
+        self._frame = None
+
+    def grab(self) -> bool:
+        try:
+            self._frame = next(self._frames)
+        except StopIteration:
+            return False
+        return True
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        if self._frame is None:
+            return None
+        self.native_size = (self._frame.width, self._frame.height)
+        w, h = _scaled_size(*self.native_size, self.decode_width)
+        return self._frame.reformat(width=w, height=h, format="bgr24").to_ndarray()
+
+    def release(self) -> None:
+        self.container.close()
+
+
+_WARNED: set = set()
+
+
+def _open_reader(source, decoder: str, decode_width: int, keyframes_only: bool):
+    if decoder == "pyav" or keyframes_only:
         try:
-            if self.cap is not None:
-                self.cap.release()
-        except:
+            return _PyAVReader(source, decode_width, keyframes_only)
+        except ImportError:
+            if "pyav" not in _WARNED:
+                _WARNED.add("pyav")
+                print("[cctv_stream] PyAV(av) 가 설치되지 않아 opencv 디코더 사용 (키프레임만 디코딩 불가)")
+    elif decoder != "opencv":
+        raise ValueError(f"지원하지 않는 STREAM_DECODER: {decoder} (opencv, pyav)")
+    return _OpenCVReader(source, decode_width)
+
+
+class FrameStream:
+    """
+    CCTV 스트림(HLS/RTSP/파일) 리더.
+    start() 하면 디코더 스레드가 계속 읽으면서 최근 buffer_size 개 프레임만 유지 (latest-frame-wins)
+    - target_fps 를 넘는 프레임은 grab() 만 하고 retrieve(BGR 변환/축소)는 생략
+      (grab() 에서 이미 디코딩하므로 디코딩 비용 자체는 줄지 않음. 디코딩을 줄이려면 keyframes_only)
+    - decode_width: 이 너비로 축소한 프레임을 내보냄 (좌표도 축소된 프레임 기준, scale 참고)
+    - keyframes_only: I-frame 만 디코딩 (decoder=pyav 필요)
+    - 읽기 실패/끊김 시 지수 백오프(+jitter)로 재연결
+    - 소비 쪽은 latest() / wait_new() / await next_frame() 으로 새 프레임을 기다림
+    - 단계 시간: grab(패킷 대기 + 디코딩), decode(retrieve: BGR 변환/축소) 를 cctv_id 라벨로 기록
+    start() 없이 read_one() 을 부르면 기존처럼 호출 스레드에서 바로 한 프레임을 읽음
+    """
+
+    def __init__(
+        self,
+        source,
+        buffer_size: int = STREAM_BUFFER_SIZE,
+        target_fps: Optional[float] = None,
+        reconnect_min: float = STREAM_RECONNECT_MIN_SECONDS,
+        reconnect_max: float = STREAM_RECONNECT_MAX_SECONDS,
+        decoder: str = STREAM_DECODER,
+        decode_width: int = STREAM_DECODE_WIDTH,
+        keyframes_only: bool = STREAM_KEYFRAMES_ONLY,
+        cctv_id: Optional[int] = None,
+    ):
+        self.source = source
+        self.cctv_id = cctv_id
+        self.decoder = decoder
+        self.decode_width = decode_width
+        self.keyframes_only = keyframes_only
+        self._reader = None
+        self.target_fps = target_fps if target_fps else (STREAM_DECODE_FPS or None)
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+
+        # (seq, 디코딩 시각, frame)
+        self._frames: Deque[Tuple[int, float, np.ndarray]] = deque(maxlen=max(1, buffer_size))
+        self._seq = 0
+        self._consumed_seq = 0
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.stats: Dict[str, Any] = {
+            "grabbed": 0,
+            "decoded": 0,
+            "skipped": 0,  # target_fps 때문에 retrieve 하지 않은 프레임
+            "dropped": 0,  # 디코딩했지만 소비되기 전에 새 프레임으로 덮인 프레임
+            "reconnects": 0,
+            "last_error": None,
+        }
+        self._fps_window: Deque[float] = deque(maxlen=120)
+
+    def _ensure(self):
+        if self._reader is None:
+            self._reader = _open_reader(self.source, self.decoder, self.decode_width, self.keyframes_only)
+
+    def _release(self):
+        try:
+            if self._reader is not None:
+                self._reader.release()
+        except Exception:
             pass
+        self._reader = None
+
+    @property
+    def scale(self) -> float:
+        """내보내는 프레임 너비 / 원본 너비 (축소하지 않으면 1.0)"""
+        reader = self._reader
+        if reader is None or not reader.native_size or not self.decode_width:
+            return 1.0
+        native_w, native_h = reader.native_size
+        return _scaled_size(native_w, native_h, self.decode_width)[0] / float(native_w)
+
+    def read_one(self):
+        self._ensure()
+        if not self._reader.grab():
+            return None
+        return self._reader.retrieve()
+
+    # ---- 디코더 스레드 ----
+    def start(self) -> "FrameStream":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"frame-stream-{id(self):x}", daemon=True)
+            self._thread.start()
+            _ACTIVE.add(self)
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if thread is None or not thread.is_alive():
+            # 스레드가 grab() 에 막혀 아직 살아있으면 release 는 스레드가 끝나면서 직접 함
+            self._release()
+        _ACTIVE.discard(self)
+
+    def _run(self) -> None:
+        backoff = self.reconnect_min
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        last_decode = 0.0
+
+        while not self._stop.is_set():
+            try:
+                self._ensure()
+                # 라이브 스트림이면 다음 프레임이 도착할 때까지 기다리는 시간도 포함
+                with metrics.stage("grab", self.cctv_id):
+                    grabbed = self._reader.grab()
+                if not grabbed:
+                    raise IOError("프레임을 읽지 못했습니다")
+                self.stats["grabbed"] += 1
+
+                now = time.monotonic()
+                if interval and now - last_decode < interval:
+                    # 목표 fps 보다 빠르게 들어온 프레임은 retrieve(BGR 변환/축소) 없이 버림
+                    self.stats["skipped"] += 1
+                    continue
+
+                with metrics.stage("decode", self.cctv_id):
+                    frame = self._reader.retrieve()
+                if frame is None:
+                    raise IOError("프레임 디코딩에 실패했습니다")
+                last_decode = now
+                backoff = self.reconnect_min
+                self._publish(frame, now)
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                self.stats["reconnects"] += 1
+                self._release()
+                # full jitter: 여러 카메라가 동시에 끊겨도 재연결이 몰리지 않도록
+                if self._stop.wait(random.uniform(0, backoff)):
+                    break
+                backoff = min(self.reconnect_max, backoff * 2)
+        self._release()
+
+    def _publish(self, frame: np.ndarray, now: float) -> None:
+        with self._cond:
+            if self._seq > self._consumed_seq:
+                self.stats["dropped"] += 1
+            self._seq += 1
+            self._frames.append((self._seq, now, frame))
+            self.stats["decoded"] += 1
+            self._fps_window.append(now)
+            waiters, self._waiters = self._waiters, []
+            self._cond.notify_all()
+        item = (self._seq, frame)
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut, item)
+
+    # ---- 소비 쪽 ----
+    def latest(self, after_seq: int = 0) -> Optional[Tuple[int, np.ndarray]]:
+        """after_seq 보다 새 프레임이 있으면 (seq, frame), 없으면 None"""
+        with self._cond:
+            if not self._frames or self._frames[-1][0] <= after_seq:
+                return None
+            seq, _, frame = self._frames[-1]
+            self._consumed_seq = max(self._consumed_seq, seq)
+            return seq, frame
+
+    def wait_new(self, after_seq: int = 0, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """동기 버전: 새 프레임이 올 때까지 블로킹 (timeout 이면 None)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._stop.is_set():
+                if self._frames and self._frames[-1][0] > after_seq:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+        return self.latest(after_seq)
+
+    async def next_frame(self, after_seq: int = 0, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """이벤트 루프를 막지 않고 새 프레임을 기다림 (timeout 이면 None)"""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._cond:
+            # 확인과 등록을 같은 락 안에서 해야 그 사이에 들어온 프레임을 놓치지 않음
+            if self._frames and self._frames[-1][0] > after_seq:
+                fut = None
+            else:
+                self._waiters.append((loop, fut))
+        if fut is None:
+            return self.latest(after_seq)
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._cond:
+                self._waiters = [(l, f) for l, f in self._waiters if f is not fut]
+        return self.latest(after_seq)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            window = list(self._fps_window)
+            stats = dict(self.stats)
+        fps = (len(window) - 1) / (window[-1] - window[0]) if len(window) > 1 and window[-1] > window[0] else 0.0
+        reader = self._reader
+        return {
+            "source": self.source,
+            "running": self._thread is not None,
+            "decoder": reader.name if reader is not None else self.decoder,
+            "keyframes_only": self.keyframes_only,
+            "native_size": reader.native_size if reader is not None else None,
+            "scale": round(self.scale, 4),
+            "decode_fps": round(fps, 2),
+            **stats,
+        }
+
+    def __del__(self):
+        self._stop.set()
+        self._release()
+
+
+def _resolve(fut: asyncio.Future, item) -> None:
+    if not fut.done():
+        fut.set_result(item)
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    return [fs.snapshot() for fs in list(_ACTIVE)]
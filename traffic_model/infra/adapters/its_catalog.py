@@ -0,0 +1,351 @@
+# ITS CCTV 카탈로그 동기화
+# - 넓은 영역(ITS_SYNC_BBOX)을 ITS_SYNC_TILE_DEG 크기 타일로 나눠 ITS_SYNC_CONCURRENCY 개씩 동시에 조회
+# - 타일 경계에 걸린 카메라는 key 로 중복 제거
+# - 로컬 스냅샷(ITS_CATALOG_PATH)과 비교해 추가/삭제/변경 카메라를 돌려주고 스냅샷 갱신
+#   (조회에 실패한 타일 안의 카메라는 삭제로 보지 않고 이전 값을 유지)
+# - id / 공간 격자(ITS_GRID_DEG) 인덱스로 조회
+#
+# 사용법:
+#   python -m infra.adapters.its_catalog [--bbox minX,minY,maxX,maxY] [--base-url URL] [--record out.json]
+#   로컬 stub 으로 테스트: python -m bench.its_stub recorded.json --port 8099 후 --base-url http://127.0.0.1:8099/cctvInfo
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+from infra.configs.settings import (
+    ITS_API_BASE,
+    ITS_API_KEY,
+    ITS_CATALOG_PATH,
+    ITS_GRID_DEG,
+    ITS_SYNC_BBOX,
+    ITS_SYNC_CONCURRENCY,
+    ITS_SYNC_RETRIES,
+    ITS_SYNC_TILE_DEG,
+    ITS_SYNC_TIMEOUT_SECONDS,
+)
+
+# (minX, minY, maxX, maxY) 경도/위도
+BBox = Tuple[float, float, float, float]
+
+# 변경 여부를 비교할 필드 (이름/좌표는 key 에 들어가므로 바뀌면 삭제 + 추가로 나옴)
+_COMPARE_FIELDS = ("url", "format", "resolution", "road_section_id")
+
+
+@dataclass(frozen=True)
+class Camera:
+    key: str  # 이름 + 좌표 (ITS 응답에는 고정 id 가 없음)
+    name: str
+    url: str
+    x: float  # 경도
+    y: float  # 위도
+    format: str = ""
+    resolution: str = ""
+    road_section_id: str = ""
+
+    @classmethod
+    def from_its(cls, d: Dict[str, Any]) -> Optional["Camera"]:
+        url = d.get("cctvurl")
+        try:
+            x, y = float(d.get("coordx")), float(d.get("coordy"))
+        except (TypeError, ValueError):
+            return None
+        if not url:
+            return None
+        name = (d.get("cctvname") or "").strip()
+        return cls(
+            key=f"{name}@{x:.6f},{y:.6f}",
+            name=name,
+            url=url,
+            x=x,
+            y=y,
+            format=str(d.get("cctvformat") or ""),
+            resolution=str(d.get("cctvresolution") or ""),
+            road_section_id=str(d.get("roadsectionid") or ""),
+        )
+
+
+@dataclass
+class CatalogDiff:
+    added: List[Camera] = field(default_factory=list)
+    removed: List[Camera] = field(default_factory=list)
+    changed: List[Tuple[Camera, Camera]] = field(default_factory=list)  # (이전, 현재)
+    failed_tiles: List[BBox] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "failed_tiles": len(self.failed_tiles),
+        }
+
+
+def parse_bbox(value: str) -> BBox:
+    min_x, min_y, max_x, max_y = (float(v) for v in value.split(","))
+    if min_x >= max_x or min_y >= max_y:
+        raise ValueError(f"잘못된 bbox: {value}")
+    return min_x, min_y, max_x, max_y
+
+
+def tile_bbox(bbox: BBox, tile_deg: float) -> List[BBox]:
+    """bbox 를 tile_deg 크기 타일로 나눔 (마지막 줄/열은 bbox 경계에서 잘림)"""
+    min_x, min_y, max_x, max_y = bbox
+    nx = max(1, math.ceil((max_x - min_x) / tile_deg - 1e-9))
+    ny = max(1, math.ceil((max_y - min_y) / tile_deg - 1e-9))
+    tiles = []
+    for j in range(ny):
+        for i in range(nx):
+            x0, y0 = min_x + i * tile_deg, min_y + j * tile_deg
+            tiles.append((round(x0, 6), round(y0, 6),
+                          round(min(max_x, x0 + tile_deg), 6), round(min(max_y, y0 + tile_deg), 6)))
+    return tiles
+
+
+def _in_bbox(cam: Camera, bbox: BBox) -> bool:
+    return bbox[0] <= cam.x <= bbox[2] and bbox[1] <= cam.y <= bbox[3]
+
+
+class CatalogIndex:
+    """key 조회 + 공간 격자 인덱스 (격자 한 칸 = grid_deg 도)"""
+
+    def __init__(self, cameras: Iterable[Camera] = (), grid_deg: float = ITS_GRID_DEG) -> None:
+        self.grid_deg = grid_deg
+        self.by_key: Dict[str, Camera] = {}
+        self._grid: Dict[Tuple[int, int], List[Camera]] = {}
+        for cam in cameras:
+            self.by_key[cam.key] = cam
+            self._grid.setdefault(self._cell(cam.x, cam.y), []).append(cam)
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.grid_deg)), int(math.floor(y / self.grid_deg))
+
+    def get(self, key: str) -> Optional[Camera]:
+        return self.by_key.get(key)
+
+    def in_bbox(self, bbox: BBox) -> List[Camera]:
+        cx0, cy0 = self._cell(bbox[0], bbox[1])
+        cx1, cy1 = self._cell(bbox[2], bbox[3])
+        out = []
+        for gx in range(cx0, cx1 + 1):
+            for gy in range(cy0, cy1 + 1):
+                out.extend(c for c in self._grid.get((gx, gy), ()) if _in_bbox(c, bbox))
+        return out
+
+    def nearest(self, x: float, y: float, limit: int = 5, max_deg: float = 0.5) -> List[Camera]:
+        """(x, y) 에서 가까운 카메라 (격자를 한 칸씩 넓혀가며 탐색, 거리는 위도 보정한 평면 근사)"""
+        cos_y = math.cos(math.radians(y))
+
+        def dist(c: Camera) -> float:
+            return math.hypot((c.x - x) * cos_y, c.y - y)
+
+        cx, cy = self._cell(x, y)
+        found: List[Camera] = []
+        max_ring = int(math.ceil(max_deg / self.grid_deg))
+        for ring in range(max_ring + 1):
+            for gx in range(cx - ring, cx + ring + 1):
+                for gy in range(cy - ring, cy + ring + 1):
+                    if max(abs(gx - cx), abs(gy - cy)) == ring:
+                        found.extend(self._grid.get((gx, gy), ()))
+            # ring 칸까지 봤으면 ring * grid_deg 안쪽 후보는 모두 찾은 것
+            if len(found) >= limit and sorted(dist(c) for c in found)[limit - 1] <= ring * self.grid_deg * cos_y:
+                break
+        return sorted(found, key=dist)[:limit]
+
+
+def diff_catalog(
+    old: Dict[str, Camera],
+    new: Dict[str, Camera],
+    failed_tiles: Sequence[BBox] = (),
+) -> CatalogDiff:
+    diff = CatalogDiff(failed_tiles=list(failed_tiles))
+    for key, cam in new.items():
+        prev = old.get(key)
+        if prev is None:
+            diff.added.append(cam)
+        elif any(getattr(prev, f) != getattr(cam, f) for f in _COMPARE_FIELDS):
+            diff.changed.append((prev, cam))
+    for key, cam in old.items():
+        if key not in new and not any(_in_bbox(cam, t) for t in failed_tiles):
+            diff.removed.append(cam)
+    return diff
+
+
+def load_snapshot(path: str = ITS_CATALOG_PATH) -> Dict[str, Camera]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print("[its_catalog] 스냅샷 로드 실패, 빈 카탈로그로 시작:", e)
+        return {}
+    return {c["key"]: Camera(**c) for c in data.get("cameras", [])}
+
+
+def save_snapshot(cameras: Dict[str, Camera], path: str = ITS_CATALOG_PATH) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".its_catalog.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"synced_at": time.time(), "cameras": [asdict(c) for c in cameras.values()]},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ItsCatalog:
+    """
+    sync() 로 최신화하고 index 로 조회
+    스냅샷 파일이 있으면 시작할 때 읽어서 첫 sync 부터 변경분만 나옴
+    """
+
+    def __init__(
+        self,
+        base_url: str = ITS_API_BASE,
+        api_key: str = ITS_API_KEY,
+        bbox: Optional[BBox] = None,
+        tile_deg: float = ITS_SYNC_TILE_DEG,
+        concurrency: int = ITS_SYNC_CONCURRENCY,
+        retries: int = ITS_SYNC_RETRIES,
+        timeout: float = ITS_SYNC_TIMEOUT_SECONDS,
+        snapshot_path: Optional[str] = ITS_CATALOG_PATH,
+        params: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.base_url = base_url
+        self.api_key = api_key
+        self.bbox = bbox or parse_bbox(ITS_SYNC_BBOX)
+        self.tile_deg = tile_deg
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.timeout = timeout
+        self.snapshot_path = snapshot_path
+        self.params = {
+            "type": "its",
+            # cctvType(1: 실시간 스트리밍(HLS) / 2: 동영상(mp4) / 3: 정지 영상/ 4: 실시간 스트리밍(HLS)(HTTPS) / 5: 동영상(mp4)(HTTPS))
+            "cctvType": "1",
+            **(params or {}),
+        }
+        self.cameras: Dict[str, Camera] = load_snapshot(snapshot_path) if snapshot_path else {}
+        self.index = CatalogIndex(self.cameras.values())
+        self.last_sync: Dict[str, Any] = {}
+        # 마지막 sync 의 원본 응답 항목 (stub 녹화용)
+        self.raw_items: List[Dict[str, Any]] = []
+
+    async def _fetch_tile(
+        self, client: httpx.AsyncClient, sem: asyncio.Semaphore, tile: BBox,
+    ) -> Optional[List[Dict[str, Any]]]:
+        q = {
+            "apiKey": self.api_key,
+            **self.params,
+            "minX": f"{tile[0]:.6f}", "maxX": f"{tile[2]:.6f}",
+            "minY": f"{tile[1]:.6f}", "maxY": f"{tile[3]:.6f}",
+            "getType": "json",
+        }
+        async with sem:
+            for attempt in range(self.retries + 1):
+                try:
+                    r = await client.get(self.base_url, params=q, headers={"Accept": "application/json"})
+                    r.raise_for_status()
+                    return r.json().get("response", {}).get("data", []) or []
+                except (httpx.HTTPError, ValueError) as e:
+                    if attempt == self.retries:
+                        print(f"[its_catalog] 타일 조회 실패 {tile}: {e!r}")
+                        return None
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+        return None
+
+    async def sync(self) -> CatalogDiff:
+        started = time.perf_counter()
+        tiles = tile_bbox(self.bbox, self.tile_deg)
+        sem = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            results = await asyncio.gather(*(self._fetch_tile(client, sem, t) for t in tiles))
+
+        fresh: Dict[str, Camera] = {}
+        failed: List[BBox] = []
+        raw: Dict[str, Dict[str, Any]] = {}
+        for tile, items in zip(tiles, results):
+            if items is None:
+                failed.append(tile)
+                continue
+            for d in items:
+                cam = Camera.from_its(d)
+                if cam is not None:
+                    fresh[cam.key] = cam
+                    raw[cam.key] = d
+
+        # 실패한 타일 안의 카메라는 이전 값 유지 (삭제로 처리하지 않음)
+        for key, cam in self.cameras.items():
+            if key not in fresh and any(_in_bbox(cam, t) for t in failed):
+                fresh[key] = cam
+
+        diff = diff_catalog(self.cameras, fresh, failed)
+        self.cameras = fresh
+        self.index = CatalogIndex(fresh.values())
+        self.raw_items = list(raw.values())
+        if self.snapshot_path and not diff.empty:
+            save_snapshot(fresh, self.snapshot_path)
+        self.last_sync = {
+            "at": time.time(),
+            "seconds": round(time.perf_counter() - started, 3),
+            "tiles": len(tiles),
+            "cameras": len(fresh),
+            **diff.summary(),
+        }
+        return diff
+
+    def stream_urls(self) -> List[Dict[str, Any]]:
+        """fetch_stream_urls 와 같은 형식"""
+        return [{"name": c.name, "url": c.url, "x": c.x, "y": c.y} for c in self.cameras.values()]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="ITS CCTV 카탈로그 동기화")
+    ap.add_argument("--bbox", default=ITS_SYNC_BBOX, help="minX,minY,maxX,maxY")
+    ap.add_argument("--tile-deg", type=float, default=ITS_SYNC_TILE_DEG)
+    ap.add_argument("--concurrency", type=int, default=ITS_SYNC_CONCURRENCY)
+    ap.add_argument("--base-url", default=ITS_API_BASE)
+    ap.add_argument("--snapshot", default=ITS_CATALOG_PATH)
+    ap.add_argument("--record", default=None, help="원본 응답 항목을 stub 재생용 JSON 으로 저장")
+    args = ap.parse_args()
+
+    catalog = ItsCatalog(base_url=args.base_url, bbox=parse_bbox(args.bbox), tile_deg=args.tile_deg,
+                         concurrency=args.concurrency, snapshot_path=args.snapshot)
+    diff = asyncio.run(catalog.sync())
+    print(json.dumps(catalog.last_sync, ensure_ascii=False))
+    for cam in diff.added[:10]:
+        print("  +", cam.name, cam.x, cam.y)
+    for cam in diff.removed[:10]:
+        print("  -", cam.name, cam.x, cam.y)
+    for old, new in diff.changed[:10]:
+        print("  ~", new.name, [f for f in _COMPARE_FIELDS if getattr(old, f) != getattr(new, f)])
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump({"response": {"data": catalog.raw_items}}, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
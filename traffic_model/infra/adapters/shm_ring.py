@@ -0,0 +1,130 @@
+# 같은 호스트 producer -> 모델 서버 프레임 전달용 POSIX 공유 메모리 링 버퍼
+# 프레임 바이트는 공유 메모리에 한 번 쓰고, 소켓으로는 (slot, seq) 만 보냄 -> 인코딩/복사/전송 없음
+#
+# 레이아웃 (little-endian)
+#   [0, 64)       : magic "RFSR"(4s) version(u32) slots(u32) slot_size(u64)
+#   슬롯 i        : 64 + i * (16 + slot_size) 위치에 seq(u64) nbytes(u32) pad(4) + 데이터(slot_size)
+#
+# 슬롯마다 seqlock: writer 는 seq 를 홀수로 올리고 데이터를 쓴 다음 짝수로 올림 (write 가 돌려주는 seq)
+# reader 는 읽기 전/후 seq 가 메시지의 seq 와 같을 때만 유효한 프레임으로 봄
+#   -> 처리 중에 producer 가 링을 한 바퀴 돌아 같은 슬롯을 덮어쓰면 ShmFrameStale (프레임 버림, 깨진 프레임은 쓰지 않음)
+# reader 는 슬롯 view 에서 바로 변환(cvtColor)/복사하므로 read 가 끝나면 슬롯을 다시 참조하지 않음
+#
+# 링 생성/삭제(unlink)는 producer 책임. 서버는 attach 만 하고 연결이 끝나면 close
+
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+MAGIC = b"RFSR"
+VERSION = 1
+
+_RING_HEADER = struct.Struct("<4sIIQ")
+_RING_HEADER_SIZE = 64
+_SLOT_HEADER = struct.Struct("<QI4x")
+_SEQ = struct.Struct("<Q")
+
+
+class ShmFrameStale(Exception):
+    """슬롯이 이미 다음 프레임으로 덮어써졌거나 쓰는 중"""
+
+
+class ShmRing:
+    def __init__(self, shm: SharedMemory, slots: int, slot_size: int, owner: bool) -> None:
+        self.shm = shm
+        self.name = shm.name
+        self.slots = slots
+        self.slot_size = slot_size
+        self.owner = owner
+        self._next = 0
+        self.stale = 0
+
+    # ---------- producer ----------
+
+    @classmethod
+    def create(cls, name: str, slots: int, slot_size: int) -> "ShmRing":
+        if slots <= 0 or slot_size <= 0:
+            raise ValueError("slots / slot_size 는 1 이상이어야 합니다")
+        size = _RING_HEADER_SIZE + slots * (_SLOT_HEADER.size + slot_size)
+        shm = SharedMemory(name=name, create=True, size=size)
+        _RING_HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, slot_size)
+        for i in range(slots):
+            _SLOT_HEADER.pack_into(shm.buf, cls._slot_offset(i, slot_size), 0, 0)
+        return cls(shm, slots, slot_size, owner=True)
+
+    def write(self, data) -> Tuple[int, int]:
+        """data(bytes / 연속 배열)를 다음 슬롯에 쓰고 (slot, seq) 반환"""
+        view = memoryview(data).cast("B")
+        if view.nbytes > self.slot_size:
+            raise ValueError(f"프레임이 슬롯보다 큽니다: {view.nbytes} > {self.slot_size}")
+        slot = self._next
+        self._next = (self._next + 1) % self.slots
+        offset = self._slot_offset(slot, self.slot_size)
+        seq = _SEQ.unpack_from(self.shm.buf, offset)[0]
+        _SEQ.pack_into(self.shm.buf, offset, seq + 1)  # 홀수 = 쓰는 중
+        data_offset = offset + _SLOT_HEADER.size
+        self.shm.buf[data_offset:data_offset + view.nbytes] = view
+        _SLOT_HEADER.pack_into(self.shm.buf, offset, seq + 2, view.nbytes)
+        return slot, seq + 2
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+    # ---------- consumer ----------
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmRing":
+        try:
+            shm = SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            shm = SharedMemory(name=name)
+            # 3.12 이하는 attach 만 해도 resource_tracker 가 등록해서 서버 종료 시 producer 의 링을 unlink 해버림
+            resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            magic, version, slots, slot_size = _RING_HEADER.unpack_from(shm.buf, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"공유 메모리 링이 아닙니다: {name}")
+            if shm.size < _RING_HEADER_SIZE + slots * (_SLOT_HEADER.size + slot_size):
+                raise ValueError(f"공유 메모리 크기가 링 헤더와 맞지 않습니다: {name}")
+        except Exception:
+            shm.close()
+            raise
+        return cls(shm, slots, slot_size, owner=False)
+
+    def read(self, slot: int, seq: int, convert: Callable[[memoryview], T]) -> T:
+        """
+        convert(슬롯 데이터 view) 결과 반환. convert 는 view 를 복사/변환해서 돌려줘야 함 (view 를 붙잡으면 안 됨)
+        슬롯이 seq 가 아니거나 읽는 중에 바뀌면 ShmFrameStale
+        """
+        if not 0 <= slot < self.slots:
+            raise ValueError(f"잘못된 슬롯 번호: {slot} (slots={self.slots})")
+        offset = self._slot_offset(slot, self.slot_size)
+        current, nbytes = _SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        if current != seq:
+            self.stale += 1
+            raise ShmFrameStale(f"slot={slot} seq={seq} 이 이미 덮어써졌습니다 (현재 {current})")
+        data_offset = offset + _SLOT_HEADER.size
+        view = self.shm.buf[data_offset:data_offset + min(nbytes, self.slot_size)]
+        try:
+            result = convert(view)
+        finally:
+            view.release()
+        if _SEQ.unpack_from(self.shm.buf, offset)[0] != seq:
+            self.stale += 1
+            raise ShmFrameStale(f"slot={slot} seq={seq} 을 읽는 중에 덮어써졌습니다")
+        return result
+
+    # ---------- 공통 ----------
+
+    @staticmethod
+    def _slot_offset(slot: int, slot_size: int) -> int:
+        return _RING_HEADER_SIZE + slot * (_SLOT_HEADER.size + slot_size)
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "slots": self.slots, "slot_size": self.slot_size, "stale": self.stale}
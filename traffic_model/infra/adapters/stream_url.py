@@ -0,0 +1,416 @@
+# 백엔드 CCTV 스트림 API(/api/cctv/:id/stream) 로 실제 스트림 URL(HLS 등) 조회
+# - 비동기(httpx) 조회, 같은 cctv_id 동시 조회는 한 번만 (single-flight)
+# - cachedUntil(없으면 STREAM_URL_TTL_SECONDS) 까지 캐시, 만료 STREAM_URL_REFRESH_BEFORE_SECONDS 전부터 백그라운드 갱신
+# - 실패도 캐시 (negative caching): 429 는 Retry-After(없으면 STREAM_URL_BACKOFF_ON_429_SECONDS), 그 외는 STREAM_URL_NEGATIVE_TTL_SECONDS
+# - STREAM_URL_STORE=file|sqlite 이면 uvicorn 워커끼리 결과를 공유하고, 조회 lease 로 한 워커만 백엔드를 호출
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from infra.configs.settings import (
+    STREAM_URL_BACKOFF_ON_429_SECONDS,
+    STREAM_URL_NEGATIVE_TTL_SECONDS,
+    STREAM_URL_REFRESH_BEFORE_SECONDS,
+    STREAM_URL_STORE,
+    STREAM_URL_STORE_PATH,
+    STREAM_URL_TIMEOUT_SECONDS,
+    STREAM_URL_TTL_SECONDS,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+# 다른 워커가 조회 중일 때 결과를 기다리는 최대 시간 (lease 유효 시간)
+_LEASE_SECONDS = 5.0
+_LEASE_POLL_SECONDS = 0.1
+
+# 캐시 레코드 (저장소에도 JSON 으로 그대로 저장)
+# {"url": str | None, "expires_at": float, "fetched_at": float, "status": int | None, "error": str | None}
+Record = Dict[str, Any]
+
+
+class StreamUrlError(Exception):
+    """스트림 URL 을 얻지 못함 (status_code 는 클라이언트에 돌려줄 HTTP 코드)"""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _parse_cached_until(value: Any, default: float) -> float:
+    """cachedUntil: UNIX timestamp 숫자 또는 ISO 문자열(예: "2025-11-23T21:50:20.474Z")"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return default
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return default
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        dt = datetime.strptime(value, "%a, %d %b %Y %H:%M:%S GMT").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return max(0.0, dt.timestamp() - time.time())
+
+
+def _valid(rec: Optional[Record], now: float) -> bool:
+    return rec is not None and rec["expires_at"] > now
+
+
+# ---- 워커 간 공유 저장소 ----
+class _FileStore:
+    """JSON 파일 하나 + flock (roi_store 와 같은 방식: 잠금 후 최신 파일에 병합, 원자적 교체)"""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path if path.endswith(".json") else path + ".json")
+        self.lock_path = self.path.with_suffix(".lock")
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".stream_urls.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _update(self, fn) -> Any:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                data = self._read()
+                result = fn(data)
+                self._write(data)
+                return result
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, cctv_id: int) -> Optional[Record]:
+        return self._read().get("urls", {}).get(str(cctv_id))
+
+    def put(self, cctv_id: int, rec: Record) -> None:
+        def _put(data):
+            now = time.time()
+            urls = {k: v for k, v in data.get("urls", {}).items() if v["expires_at"] > now}
+            urls[str(cctv_id)] = rec
+            data["urls"] = urls
+
+        self._update(_put)
+
+    def acquire(self, cctv_id: int, owner: str, ttl: float) -> bool:
+        def _acquire(data):
+            now = time.time()
+            leases = {k: v for k, v in data.get("leases", {}).items() if v["until"] > now}
+            lease = leases.get(str(cctv_id))
+            if lease is not None and lease["owner"] != owner:
+                data["leases"] = leases
+                return False
+            leases[str(cctv_id)] = {"owner": owner, "until": now + ttl}
+            data["leases"] = leases
+            return True
+
+        return self._update(_acquire)
+
+    def release(self, cctv_id: int, owner: str) -> None:
+        def _release(data):
+            leases = data.get("leases", {})
+            if leases.get(str(cctv_id), {}).get("owner") == owner:
+                del leases[str(cctv_id)]
+
+        self._update(_release)
+
+
+class _SqliteStore:
+    """로컬 sqlite (WAL). 같은 호스트의 워커끼리만 공유 가능"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path if path.endswith((".sqlite", ".db")) else path + ".sqlite"
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stream_urls "
+                "(cctv_id INTEGER PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stream_url_leases "
+                "(cctv_id INTEGER PRIMARY KEY, owner TEXT NOT NULL, until REAL NOT NULL)")
+
+    def get(self, cctv_id: int) -> Optional[Record]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM stream_urls WHERE cctv_id = ?", (cctv_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, cctv_id: int, rec: Record) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stream_urls (cctv_id, record, expires_at) VALUES (?, ?, ?)",
+                (cctv_id, json.dumps(rec), rec["expires_at"]))
+            self._conn.execute("DELETE FROM stream_urls WHERE expires_at < ?", (time.time() - 3600,))
+
+    def acquire(self, cctv_id: int, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT owner, until FROM stream_url_leases WHERE cctv_id = ?", (cctv_id,)).fetchone()
+                if row is not None and row[1] > now and row[0] != owner:
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO stream_url_leases (cctv_id, owner, until) VALUES (?, ?, ?)",
+                    (cctv_id, owner, now + ttl))
+                return True
+            finally:
+                self._conn.execute("COMMIT")
+
+    def release(self, cctv_id: int, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM stream_url_leases WHERE cctv_id = ? AND owner = ?", (cctv_id, owner))
+
+
+def _open_store(kind: str, path: str):
+    if kind == "memory":
+        return None
+    if kind == "file":
+        return _FileStore(path)
+    if kind == "sqlite":
+        return _SqliteStore(path)
+    raise ValueError(f"지원하지 않는 STREAM_URL_STORE: {kind} (memory, file, sqlite)")
+
+
+class StreamUrlResolver:
+    def __init__(
+        self,
+        base_url: str,
+        store: str = STREAM_URL_STORE,
+        store_path: str = STREAM_URL_STORE_PATH,
+        ttl: float = STREAM_URL_TTL_SECONDS,
+        refresh_before: float = STREAM_URL_REFRESH_BEFORE_SECONDS,
+        negative_ttl: float = STREAM_URL_NEGATIVE_TTL_SECONDS,
+        backoff_429: float = STREAM_URL_BACKOFF_ON_429_SECONDS,
+        timeout: float = STREAM_URL_TIMEOUT_SECONDS,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.refresh_before = refresh_before
+        self.negative_ttl = negative_ttl
+        self.backoff_429 = backoff_429
+        self.store = _open_store(store, store_path)
+        self.store_kind = store
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._local: Dict[int, Record] = {}
+        # cctv_id -> 진행 중인 조회 태스크 (single-flight)
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # 백그라운드 갱신이 실패했을 때 바로 다시 시도하지 않도록
+        self._next_refresh: Dict[int, float] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "store_hits": 0,
+            "negative_hits": 0,
+            "coalesced": 0,
+            "fetches": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "lease_waits": 0,
+        }
+
+    async def resolve(self, cctv_id: int) -> str:
+        """스트림 URL. 얻지 못하면 StreamUrlError"""
+        now = time.time()
+        rec = self._local.get(cctv_id)
+        if _valid(rec, now):
+            self.stats["hits"] += 1
+        elif self.store is not None:
+            rec = await asyncio.to_thread(self.store.get, cctv_id)
+            if _valid(rec, now):
+                self.stats["store_hits"] += 1
+                self._local[cctv_id] = rec
+            else:
+                rec = None
+        else:
+            rec = None
+
+        if rec is None:
+            rec = await self._single_flight(cctv_id)
+        elif rec["url"] is None:
+            self.stats["negative_hits"] += 1
+        elif rec["expires_at"] - now < self.refresh_before and now >= self._next_refresh.get(cctv_id, 0.0):
+            # 곧 만료: 지금은 캐시 값을 돌려주고 갱신은 백그라운드에서
+            self.stats["refreshes"] += 1
+            self._next_refresh[cctv_id] = now + self.negative_ttl
+            self._start_fetch(cctv_id)
+
+        if rec["url"] is None:
+            raise StreamUrlError(rec["status"] or 502, rec["error"] or "스트림 URL 조회 실패")
+        return rec["url"]
+
+    # ---- 조회 ----
+    def _start_fetch(self, cctv_id: int) -> asyncio.Task:
+        task = self._inflight.get(cctv_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_shared(cctv_id), name=f"stream-url-{cctv_id}")
+            self._inflight[cctv_id] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(cctv_id, None))
+        return task
+
+    async def _single_flight(self, cctv_id: int) -> Record:
+        if cctv_id in self._inflight:
+            self.stats["coalesced"] += 1
+        # shield: 기다리던 연결이 끊겨도 조회 자체는 끝까지 진행해서 다른 대기자에게 결과를 줌
+        return await asyncio.shield(self._start_fetch(cctv_id))
+
+    async def _fetch_shared(self, cctv_id: int) -> Record:
+        started = time.time()
+        acquired = True
+        if self.store is not None:
+            acquired = await asyncio.to_thread(self.store.acquire, cctv_id, self._owner, _LEASE_SECONDS)
+            if not acquired:
+                # 다른 워커가 조회 중이면 그 결과가 저장될 때까지 기다림 (lease 가 끝나면 직접 조회)
+                self.stats["lease_waits"] += 1
+                deadline = started + _LEASE_SECONDS
+                while time.time() < deadline:
+                    await asyncio.sleep(_LEASE_POLL_SECONDS)
+                    rec = await asyncio.to_thread(self.store.get, cctv_id)
+                    if rec is not None and rec["fetched_at"] >= started and _valid(rec, time.time()):
+                        self._local[cctv_id] = rec
+                        return rec
+        try:
+            rec = await self._fetch(cctv_id)
+            old = self._local.get(cctv_id)
+            if rec["url"] is None and old is not None and old["url"] and _valid(old, time.time()):
+                # 미리 갱신하다 실패한 경우: 아직 유효한 기존 URL 을 계속 사용
+                return old
+            self._local[cctv_id] = rec
+            if self.store is not None:
+                await asyncio.to_thread(self.store.put, cctv_id, rec)
+            return rec
+        finally:
+            if self.store is not None and acquired:
+                await asyncio.to_thread(self.store.release, cctv_id, self._owner)
+
+    async def _fetch(self, cctv_id: int) -> Record:
+        """백엔드 조회 결과를 레코드로 (실패도 레코드로 돌려줌)"""
+        self.stats["fetches"] += 1
+        now = time.time()
+        try:
+            resp = await self._client.get(f"/api/cctv/{cctv_id}/stream")
+        except httpx.HTTPError as e:
+            return self._negative(now, 502, f"backend CCTV 스트림 API 호출 실패: {e!r}", self.negative_ttl)
+
+        if resp.status_code == 429:
+            self.stats["rate_limited"] += 1
+            wait = _retry_after(resp)
+            return self._negative(
+                now, 503, f"cctv_id={cctv_id} 스트림 조회가 잠시 제한되었습니다. 잠시 후 다시 시도해주세요.",
+                self.backoff_429 if wait is None else wait)
+        if resp.status_code >= 400:
+            return self._negative(
+                now, 502, f"backend CCTV 스트림 API 호출 실패: HTTP {resp.status_code}", self.negative_ttl)
+
+        try:
+            payload = resp.json()
+        except ValueError:
+            return self._negative(now, 502, "backend CCTV 스트림 API 응답이 JSON 이 아닙니다", self.negative_ttl)
+
+        # { success: true, data: { cctv, streamUrl, cachedUntil } }
+        if not payload.get("success"):
+            return self._negative(
+                now, 502, f"backend CCTV 스트림 API 응답 오류: {payload.get('message', 'unknown error')}",
+                self.negative_ttl)
+        data = payload.get("data") or {}
+        url = data.get("streamUrl")
+        if not url:
+            return self._negative(now, 502, f"cctv_id={cctv_id}에 대한 streamUrl이 없습니다.", self.negative_ttl)
+
+        expires_at = _parse_cached_until(data.get("cachedUntil"), now + self.ttl)
+        # 시계가 어긋나 이미 지난 cachedUntil 이 와도 매 요청마다 조회하지는 않도록
+        expires_at = max(expires_at, now + 1.0)
+        # fetched_at 은 응답을 받은 시각 (lease 를 기다리던 다른 워커가 새 결과인지 판단하는 기준)
+        return {"url": url, "expires_at": expires_at, "fetched_at": time.time(), "status": None, "error": None}
+
+    def _negative(self, now: float, status: int, error: str, ttl: float) -> Record:
+        self.stats["errors"] += 1
+        return {"url": None, "expires_at": now + ttl, "fetched_at": time.time(), "status": status, "error": error}
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "store": self.store_kind,
+            "cached": sum(1 for r in self._local.values() if r["url"] and r["expires_at"] > now),
+            "negative": sum(1 for r in self._local.values() if r["url"] is None and r["expires_at"] > now),
+            "inflight": len(self._inflight),
+            **self.stats,
+        }
+
+    async def aclose(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await self._client.aclose()
+
+
+_RESOLVERS: Dict[str, StreamUrlResolver] = {}
+
+
+def get_stream_url_resolver(base_url: str) -> StreamUrlResolver:
+    resolver = _RESOLVERS.get(base_url)
+    if resolver is None:
+        resolver = StreamUrlResolver(base_url)
+        _RESOLVERS[base_url] = resolver
+    return resolver
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    return [r.snapshot() for r in _RESOLVERS.values()]
+
+
+async def close_all() -> None:
+    for r in list(_RESOLVERS.values()):
+        await r.aclose()
@@ -1,84 +1,207 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import numpy as np
 
+from infra.configs.settings import ROI_RELOAD_INTERVAL_SECONDS
+from vision.pipelines.roi import DirectionalRoi
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
 ROI_CONFIG_PATH = Path(__file__).resolve().parent / "roi_config.json"
+
+# 원본 JSON (cctv_id 문자열 -> entry)
 _ROI_CACHE: Dict[str, Any] | None = None
+# 마지막으로 읽은 파일의 mtime (다른 uvicorn 워커가 저장했는지 확인용)
+_ROI_MTIME: float | None = None
+_LAST_CHECK: float = 0.0
+# cctv_id 별로 컴파일된 ROI (프레임마다 dict 조회만 하도록)
+_COMPILED: Dict[str, DirectionalRoi] = {}
+_LEGACY: Dict[str, Optional[np.ndarray]] = {}
+_LOCK = threading.RLock()
 
 
-def load_roi_config() -> Dict[str, Any]:
-    global _ROI_CACHE
-    if _ROI_CACHE is not None:
-        return _ROI_CACHE
+def _file_mtime() -> float | None:
+    try:
+        return ROI_CONFIG_PATH.stat().st_mtime_ns / 1e9
+    except FileNotFoundError:
+        return None
 
-    if not ROI_CONFIG_PATH.exists():
-        _ROI_CACHE = {}
-        return _ROI_CACHE
 
+def _read_file() -> Dict[str, Any]:
+    if not ROI_CONFIG_PATH.exists():
+        return {}
     try:
         with ROI_CONFIG_PATH.open("r", encoding="utf-8") as f:
-            _ROI_CACHE = json.load(f)
+            return json.load(f)
     except Exception as e:
         print("[roi_store] ROI config load error:", e)
-        _ROI_CACHE = {}
+        return {}
+
+
+def _invalidate(keys) -> None:
+    for key in keys:
+        _COMPILED.pop(key, None)
+        _LEGACY.pop(key, None)
+
+
+def _reload_if_changed(force: bool = False) -> None:
+    """
+    파일 mtime 이 바뀌었으면 다시 읽고, 내용이 달라진 카메라만 무효화.
+    mtime 확인은 ROI_RELOAD_INTERVAL_SECONDS 에 한 번만 수행.
+    """
+    global _ROI_CACHE, _ROI_MTIME, _LAST_CHECK
+    now = time.monotonic()
+    if not force and _ROI_CACHE is not None and now - _LAST_CHECK < ROI_RELOAD_INTERVAL_SECONDS:
+        return
+
+    with _LOCK:
+        _LAST_CHECK = now
+        mtime = _file_mtime()
+        if _ROI_CACHE is not None and mtime == _ROI_MTIME:
+            return
+
+        new_cfg = _read_file()
+        old_cfg = _ROI_CACHE or {}
+        changed = {k for k in set(old_cfg) | set(new_cfg) if old_cfg.get(k) != new_cfg.get(k)}
+        _ROI_CACHE = new_cfg
+        _ROI_MTIME = mtime
+        _invalidate(changed)
+        if changed and old_cfg:
+            print(f"[roi_store] ROI config reloaded: changed cctv_ids={sorted(changed)}")
+
+
+def load_roi_config() -> Dict[str, Any]:
+    _reload_if_changed()
+    assert _ROI_CACHE is not None
     return _ROI_CACHE
 
 
-def get_directional_roi(cctv_id: int):
-    cfg = load_roi_config().get(str(cctv_id)) or {}
+def _to_polygon(pts) -> Optional[np.ndarray]:
+    if not pts:
+        return None
+    polygon = np.array(pts, dtype=np.int32)
+    if polygon.ndim != 2 or polygon.shape[1] != 2:
+        raise ValueError("invalid polygon shape")
+    # 읽기 전용으로 만들어 캐시된 배열을 호출 쪽에서 실수로 바꾸지 않도록 함
+    polygon.setflags(write=False)
+    return polygon
+
+
+def get_compiled_roi(cctv_id: int) -> DirectionalRoi:
+    """벡터화된 ROI 판정 객체 (상행/하행 폴리곤 + 외곽 사각형)"""
+    key = str(cctv_id)
+    cfg = load_roi_config()
+    roi = _COMPILED.get(key)
+    if roi is not None:
+        return roi
+
+    entry = cfg.get(key) or {}
     # 하위 호환: roiPolygon 키가 있으면 상행으로 사용
-    upstream = cfg.get("upstream") or cfg.get("roiPolygon")
-    downstream = cfg.get("downstream")
-    return {
-        "upstream": np.array(upstream, dtype=np.int32) if upstream else None,
-        "downstream": np.array(downstream, dtype=np.int32) if downstream else None,
-    }
+    try:
+        roi = DirectionalRoi(
+            _to_polygon(entry.get("upstream") or entry.get("roiPolygon")),
+            _to_polygon(entry.get("downstream")),
+        )
+    except Exception as e:
+        print(f"[roi_store] invalid ROI for cctv_id={cctv_id}:", e)
+        roi = DirectionalRoi(None, None)
+    _COMPILED[key] = roi
+    return roi
+
+
+def get_directional_roi(cctv_id: int):
+    # {"upstream": np.ndarray|None, "downstream": np.ndarray|None} (읽기 전용 배열)
+    return get_compiled_roi(cctv_id).polygons
+
+
+def _write_atomic(cfg: Dict[str, Any]) -> None:
+    ROI_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(
+        dir=ROI_CONFIG_PATH.parent, prefix=".roi_config.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cfg, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, ROI_CONFIG_PATH)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _update_entry(cctv_id: int, entry: Dict[str, Any]) -> None:
+    """
+    한 카메라의 ROI 만 갱신.
+    다른 워커가 그 사이에 저장한 내용을 덮어쓰지 않도록 파일 잠금 후 최신 파일에 병합해서 저장
+    """
+    global _ROI_CACHE, _ROI_MTIME
+    key = str(cctv_id)
+    ROI_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = ROI_CONFIG_PATH.with_suffix(".lock")
+    with _LOCK, open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            _reload_if_changed(force=True)
+            cfg = dict(_ROI_CACHE or {})
+            cfg[key] = entry
+            _write_atomic(cfg)
+            _ROI_CACHE = cfg
+            _ROI_MTIME = _file_mtime()
+            _invalidate([key])
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 def set_directional_roi(cctv_id: int, upstream: List[List[float]] | None, downstream: List[List[float]] | None) -> None:
-    cfg = load_roi_config()
-    cfg[str(cctv_id)] = {"upstream": upstream, "downstream": downstream}
-    save_roi_config(cfg)
+    _update_entry(cctv_id, {"upstream": upstream, "downstream": downstream})
     print(
         f"[roi_store] ROI updated for cctv_id={cctv_id}: up={len(upstream or [])}, down={len(downstream or [])}")
 
 
 def save_roi_config(cfg: Dict[str, Any]) -> None:
-    global _ROI_CACHE
-    ROI_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with ROI_CONFIG_PATH.open("w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
-    _ROI_CACHE = cfg
+    global _ROI_CACHE, _ROI_MTIME
+    with _LOCK:
+        _write_atomic(cfg)
+        _invalidate(set(_ROI_CACHE or {}) | set(cfg))
+        _ROI_CACHE = cfg
+        _ROI_MTIME = _file_mtime()
 
 
 def get_roi_polygon(cctv_id: int) -> Optional[np.ndarray]:
+    key = str(cctv_id)
     cfg = load_roi_config()
-    entry = cfg.get(str(cctv_id))
-    if not entry:
-        return None
+    if key in _LEGACY:
+        return _LEGACY[key]
 
-    pts = entry.get("roiPolygon")
-    if not pts:
-        return None
-
-    try:
-        polygon = np.array(pts, dtype=np.int32)
-        if polygon.ndim != 2 or polygon.shape[1] != 2:
-            raise ValueError("invalid roiPolygon shape")
-        return polygon
-    except Exception as e:
-        print(f"[roi_store] invalid ROI polygon for cctv_id={cctv_id}:", e)
-        return None
+    polygon = None
+    entry = cfg.get(key)
+    if entry and entry.get("roiPolygon"):
+        try:
+            polygon = _to_polygon(entry["roiPolygon"])
+        except Exception as e:
+            print(f"[roi_store] invalid ROI polygon for cctv_id={cctv_id}:", e)
+    _LEGACY[key] = polygon
+    return polygon
 
 
 def set_roi_polygon(cctv_id: int, roi_polygon: List[List[float]]) -> None:
-    cfg = load_roi_config()
-    cfg[str(cctv_id)] = {"roiPolygon": roi_polygon}
-    save_roi_config(cfg)
+    _update_entry(cctv_id, {"roiPolygon": roi_polygon})
     print(
         f"[roi_store] ROI updated for cctv_id={cctv_id}: {len(roi_polygon)} points"
     )
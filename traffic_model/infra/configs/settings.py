@@ -3,6 +3,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() not in {"false", "0", "no", ""}
+
+
 # 모델 경로와 클래스명 설정 (가중치 경로 또는 모델명)
 MODEL_PATH = os.getenv("MODEL_PATH", "./traffic_model/models")
 MODEL_NAME = os.getenv("MODEL_NAME", "test.pt")
@@ -13,10 +18,132 @@ YOLO_CLASSES = os.getenv(
 CONF_THRES = float(os.getenv("CONF_THRES", "0.25"))
 # iou_thres 값은 0.45 이상인 경우 삭제. 그 이하는 유지 -> 중복제거
 IOU_THRES = float(os.getenv("IOU_THRES", "0.45"))
+# 추론 엔진 선택: ultralytics(.pt) | onnxruntime(.onnx) | openvino(_openvino_model 디렉터리)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "ultralytics")
+# export 된 모델 경로 (비워두면 MODEL_PATH 기준으로 ultralytics export 기본 이름 사용)
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")
+OPENVINO_MODEL_PATH = os.getenv("OPENVINO_MODEL_PATH", "")
+# CPU 추론 스레드 수 (0 이면 라이브러리 기본값). onnxruntime intra-op / openvino INFERENCE_NUM_THREADS
+INFER_THREADS = int(os.getenv("INFER_THREADS", "0"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+# 추론 정밀도: fp32 | int8 (int8 은 onnxruntime/openvino 엔진만. python -m vision.inference.quantize 로 생성)
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "fp32")
+# static int8 보정(calibration)에 쓸 저장된 CCTV 프레임 디렉터리 (주간/야간 섞어서)
+QUANT_CALIB_DIR = os.getenv("QUANT_CALIB_DIR", "./traffic_model/calib_frames")
+
+# 모델 입력 크기. 비워두면 체크포인트/export 메타데이터의 imgsz (학습 시 값, 608) 를 그대로 사용
+MODEL_IMGSZ = int(os.environ["MODEL_IMGSZ"]) if os.getenv("MODEL_IMGSZ") else None
+# 보정/추론 전에 긴 변을 모델 입력 크기로 먼저 줄일지 여부 (bbox 는 원본 좌표로 되돌림)
+PREPROCESS_DOWNSCALE = _env_flag("PREPROCESS_DOWNSCALE")
+# /analyze/frame JPEG 축소 디코딩 배율: 1(원본) | 2 | 4 | 8 | auto (긴 변이 모델 입력 크기 이상인 선에서 최대)
+# 검출 좌표는 항상 원본 기준으로 돌려주고, annotated 이미지만 축소된 크기로 나감
+ANALYZE_JPEG_REDUCE = os.getenv("ANALYZE_JPEG_REDUCE", "1")
+
+# 배치 추론 스케줄러: 여러 CCTV에서 동시에 들어온 프레임을 모아 한 번에 추론
+BATCH_ENABLED = _env_flag("BATCH_ENABLED")
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))  # 한 배치 최대 프레임 수
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "15"))  # 첫 프레임 이후 최대 대기
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "256"))  # 대기열 최대 길이
+
+# cctv_id 별 ByteTrack 세션 관리
+TRACKER_MAX_SESSIONS = int(os.getenv("TRACKER_MAX_SESSIONS", "512"))  # 동시에 유지할 카메라 수 상한
+TRACKER_IDLE_TTL_SECONDS = float(os.getenv("TRACKER_IDLE_TTL_SECONDS", "300"))  # 이 시간 동안 프레임 없으면 제거
+
+# 워커 풀: 이벤트 루프 밖에서 디코딩/보정/그리기(cpu) 와 모델 추론(inference) 수행
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_QUEUE_SIZE = int(os.getenv("CPU_QUEUE_SIZE", "64"))  # 처리 중+대기 작업 상한, 넘으면 503
+INFER_WORKERS = int(os.getenv("INFER_WORKERS", "1"))  # 모델은 스레드 안전하지 않으므로 기본 1
+INFER_QUEUE_SIZE = int(os.getenv("INFER_QUEUE_SIZE", "32"))
+
+# 백엔드(/api/detection) 결과 전송 클라이언트
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "20"))  # keep-alive 연결 풀 크기
+BACKEND_QUEUE_SIZE = int(os.getenv("BACKEND_QUEUE_SIZE", "1000"))  # 전송 대기열, 넘치면 오래된 것부터 버림
+BACKEND_SENDERS = int(os.getenv("BACKEND_SENDERS", "4"))  # 동시에 전송하는 작업 수
+BACKEND_MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "2"))
+# 백엔드에 /api/detection/batch 가 있을 때만 켤 것
+BACKEND_BATCH_ENABLED = _env_flag("BACKEND_BATCH_ENABLED")
+BACKEND_BATCH_MAX = int(os.getenv("BACKEND_BATCH_MAX", "32"))
+BACKEND_BATCH_WAIT_MS = float(os.getenv("BACKEND_BATCH_WAIT_MS", "50"))
+
+# ROI 설정 파일 변경 확인 주기 (다른 uvicorn 워커에서 저장한 ROI 반영)
+ROI_RELOAD_INTERVAL_SECONDS = float(os.getenv("ROI_RELOAD_INTERVAL_SECONDS", "1.0"))
+
+# 영상 보정: adaptive 이면 어둡거나(야간) 대비가 낮은(안개) 프레임에만 enhance 적용
+ENHANCE_ADAPTIVE = _env_flag("ENHANCE_ADAPTIVE")
+ENHANCE_DARK_THRESHOLD = float(os.getenv("ENHANCE_DARK_THRESHOLD", "90"))  # 평균 밝기(0~255) 미만이면 보정
+ENHANCE_LOW_CONTRAST_THRESHOLD = float(os.getenv("ENHANCE_LOW_CONTRAST_THRESHOLD", "25"))  # 밝기 표준편차 미만이면 보정
+
+# 모션 게이트: 마지막으로 검출한 프레임과 축소 흑백 프레임 차이로 검출/재사용/트래커만 진행 결정 (cctv_id 별)
+MOTION_GATE_ENABLED = _env_flag("MOTION_GATE_ENABLED")
+MOTION_GATE_WIDTH = int(os.getenv("MOTION_GATE_WIDTH", "160"))  # 비교용 축소 프레임 가로 크기
+MOTION_PIXEL_THRESHOLD = int(os.getenv("MOTION_PIXEL_THRESHOLD", "25"))  # 밝기 차이가 이 이상이면 변한 픽셀
+MOTION_STILL_RATIO = float(os.getenv("MOTION_STILL_RATIO", "0.002"))  # 변한 픽셀 비율 미만이면 결과 재사용
+MOTION_DETECT_RATIO = float(os.getenv("MOTION_DETECT_RATIO", "0.01"))  # 이상이면 검출, 그 사이는 트래커만 진행
+MOTION_SCENE_CHANGE_RATIO = float(os.getenv("MOTION_SCENE_CHANGE_RATIO", "0.6"))  # 이상이면 화면 전환으로 보고 트래커 초기화
+MOTION_REFRESH_SECONDS = float(os.getenv("MOTION_REFRESH_SECONDS", "5"))  # 변화가 없어도 이 간격마다 검출
+
+# 시각화 위치: server(서버에서 bbox 를 그려 전송, 기존) | client(검출 결과 + ROI 좌표만 보내고 프론트 canvas 에서 그림)
+# 요청/연결마다 render 파라미터로 바꿀 수 있고, 이 값은 지정하지 않았을 때의 기본값
+RENDER_MODE = os.getenv("RENDER_MODE", "server")
+# client 모드에서도 백엔드에 보관할 annotated 이미지는 주기/이벤트로만 업로드
+ANNOTATED_UPLOAD_INTERVAL_SECONDS = float(os.getenv("ANNOTATED_UPLOAD_INTERVAL_SECONDS", "10"))  # 0 이면 주기 업로드 안 함
+ANNOTATED_UPLOAD_ON_EVENT = _env_flag("ANNOTATED_UPLOAD_ON_EVENT", "true")  # 새 track 이 ROI 에 들어오면 업로드
+ANNOTATED_UPLOAD_MIN_INTERVAL_SECONDS = float(os.getenv("ANNOTATED_UPLOAD_MIN_INTERVAL_SECONDS", "1"))  # 이벤트 업로드 최소 간격
+
+# CCTV 스트림 디코더 스레드: 최신 프레임만 유지 (ring buffer), 끊기면 지수 백오프로 재연결
+STREAM_BUFFER_SIZE = int(os.getenv("STREAM_BUFFER_SIZE", "2"))  # 보관할 최근 디코딩 프레임 수
+STREAM_DECODE_FPS = float(os.getenv("STREAM_DECODE_FPS", "0"))  # 0 이면 호출 쪽 기본값, 초과 프레임은 grab 만 하고 디코딩 생략
+STREAM_RECONNECT_MIN_SECONDS = float(os.getenv("STREAM_RECONNECT_MIN_SECONDS", "0.5"))
+STREAM_RECONNECT_MAX_SECONDS = float(os.getenv("STREAM_RECONNECT_MAX_SECONDS", "30"))
+# 디코더: opencv(cv2.VideoCapture) | pyav (pip install av 필요, 키프레임만 디코딩은 pyav 에서만 가능)
+STREAM_DECODER = os.getenv("STREAM_DECODER", "opencv")
+STREAM_DECODE_WIDTH = int(os.getenv("STREAM_DECODE_WIDTH", "0"))  # 0 이면 원본 해상도, 아니면 이 너비로 축소 (비율 유지)
+STREAM_KEYFRAMES_ONLY = _env_flag("STREAM_KEYFRAMES_ONLY")  # I-frame 만 디코딩 (GOP 가 1~2초면 0.5~1fps 분석)
+# 카메라별 분석 fps: "cctv_id:fps,..." (예: "12:5,34:1"), 없는 카메라는 기본값
+STREAM_CAMERA_FPS = {
+    int(k): float(v)
+    for k, v in (item.split(":", 1) for item in os.getenv("STREAM_CAMERA_FPS", "").split(",") if ":" in item)
+}
+
+# CCTV 스트림 URL 조회 (백엔드 /api/cctv/:id/stream) 캐시
+STREAM_URL_TTL_SECONDS = float(os.getenv("STREAM_URL_TTL_SECONDS", "60"))  # 백엔드가 cachedUntil 을 안 줄 때
+STREAM_URL_REFRESH_BEFORE_SECONDS = float(os.getenv("STREAM_URL_REFRESH_BEFORE_SECONDS", "10"))  # 만료 전 미리 갱신
+STREAM_URL_NEGATIVE_TTL_SECONDS = float(os.getenv("STREAM_URL_NEGATIVE_TTL_SECONDS", "5"))  # 실패 결과 캐시
+STREAM_URL_BACKOFF_ON_429_SECONDS = float(os.getenv("STREAM_URL_BACKOFF_ON_429_SECONDS", "30"))  # Retry-After 없을 때
+STREAM_URL_TIMEOUT_SECONDS = float(os.getenv("STREAM_URL_TIMEOUT_SECONDS", "2"))
+# 워커 간 공유 저장소: memory(프로세스 내) | file(JSON + flock) | sqlite
+STREAM_URL_STORE = os.getenv("STREAM_URL_STORE", "memory")
+STREAM_URL_STORE_PATH = os.getenv("STREAM_URL_STORE_PATH", "/tmp/traffic_stream_urls")  # 확장자는 저장소 종류에 따라 붙음
+
+# /view/ws pull 모드 스트림 허브: cctv_id 당 디코딩/추론 한 번, 결과를 구독자 전원에게 전송
+STREAM_HUB_LINGER_SECONDS = float(os.getenv("STREAM_HUB_LINGER_SECONDS", "5"))  # 마지막 구독자가 나간 뒤 정리까지 대기
+
+# raw 프레임 ingest (/ingest/ws, Unix socket, 공유 메모리 링): JPEG 인코딩/디코딩 없이 디코딩된 프레임을 받음
+RAW_INGEST_UNIX_SOCKET = os.getenv("RAW_INGEST_UNIX_SOCKET", "")  # 비어 있으면 Unix socket 서버를 띄우지 않음
+# 메시지 최대 크기 (uvicorn websocket 기본 한도 16MB 와 맞춤. 4K bgr24 는 --ws-max-size 도 같이 올릴 것)
+RAW_INGEST_MAX_BYTES = int(os.getenv("RAW_INGEST_MAX_BYTES", str(16 * 1024 * 1024)))
+RAW_INGEST_MAX_INFLIGHT = int(os.getenv("RAW_INGEST_MAX_INFLIGHT", "32"))  # 연결당 동시에 처리 중인 프레임 수
+# 공유 메모리 attach 는 같은 호스트 producer 전용이라 기본은 끔
+# (켜면 /ingest/ws 에 접속할 수 있는 누구나 접두사가 맞는 세그먼트를 임의의 cctv_id 로 분석시킬 수 있음)
+RAW_INGEST_SHM_ENABLED = _env_flag("RAW_INGEST_SHM_ENABLED")
+RAW_INGEST_SHM_PREFIX = os.getenv("RAW_INGEST_SHM_PREFIX", "traffic_")  # attach 를 허용할 공유 메모리 이름 접두사
+
+# 단계별 처리 시간 지표 (infra/monitoring/metrics.py, GET /metrics)
+METRICS_ENABLED = _env_flag("METRICS_ENABLED", "true")
+METRICS_CAMERA_LABELS = _env_flag("METRICS_CAMERA_LABELS", "true")  # false 면 cctv_id 라벨을 "all" 로 합침 (카메라가 아주 많을 때)
+METRICS_SERVER_TIMING = _env_flag("METRICS_SERVER_TIMING")  # 응답에 Server-Timing 헤더 추가
 
 # its cctv api
-ITS_API_BASE = "https://openapi.its.go.kr:9443/cctvInfo"
+ITS_API_BASE = os.getenv("ITS_API_BASE", "https://openapi.its.go.kr:9443/cctvInfo")
 ITS_API_KEY = os.getenv("ITS_API_KEY", "not api key")
+# 카탈로그 동기화 (infra/adapters/its_catalog.py): 넓은 영역을 타일로 나눠 동시 조회 후 이전 스냅샷과 비교
+ITS_SYNC_BBOX = os.getenv("ITS_SYNC_BBOX", "124.5,33.0,131.0,38.7")  # minX,minY,maxX,maxY (기본: 남한 전체)
+ITS_SYNC_TILE_DEG = float(os.getenv("ITS_SYNC_TILE_DEG", "0.5"))  # 타일 한 변 (도)
+ITS_SYNC_CONCURRENCY = int(os.getenv("ITS_SYNC_CONCURRENCY", "4"))  # 동시에 조회하는 타일 수
+ITS_SYNC_RETRIES = int(os.getenv("ITS_SYNC_RETRIES", "2"))
+ITS_SYNC_TIMEOUT_SECONDS = float(os.getenv("ITS_SYNC_TIMEOUT_SECONDS", "10"))
+ITS_CATALOG_PATH = os.getenv("ITS_CATALOG_PATH", "/tmp/its_catalog.json")  # 마지막 스냅샷
+ITS_GRID_DEG = float(os.getenv("ITS_GRID_DEG", "0.05"))  # 공간 인덱스 격자 크기 (도, 약 5km)
 
 # backend db의 env
 """ 
@@ -0,0 +1,214 @@
+# 파이프라인 단계별 처리 시간 지표 (Prometheus text format, prometheus_client 없이)
+#
+# - traffic_stage_seconds{stage, cctv_id, engine}: decode / enhance / inference / tracking / roi_filter /
+#   render / encode / backend_post / backend_image ... 단계별 히스토그램
+# - traffic_request_seconds{method, route, status}: HTTP 요청 전체 시간 (timing 미들웨어)
+# - GET /metrics 로 노출. 값은 프로세스(uvicorn 워커)별이므로 워커가 여러 개면 워커마다 따로 수집됨
+#
+# 측정 위치: 워커 풀(run_cpu/run_inference) 안에서 실제로 실행된 시간만 잼 (풀 대기 시간 제외)
+#   cctv_id 는 요청 처리 시작 시 bind_camera 로 contextvar 에 넣어두면 풀 스레드에서도 그대로 보임
+#   (workers.BoundedPool 이 contextvars 를 복사해서 넘김). 배치 추론 스레드처럼 컨텍스트가 없으면 명시적으로 전달
+# Server-Timing: METRICS_SERVER_TIMING=true 면 요청마다 단계별 합계를 응답 헤더로 붙임 (브라우저 devtools 에서 확인)
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from infra.configs.settings import (
+    INFERENCE_ENGINE,
+    INFERENCE_PRECISION,
+    METRICS_CAMERA_LABELS,
+    METRICS_ENABLED,
+)
+
+T = TypeVar("T")
+
+# 1ms ~ 5s (프레임 단계는 대부분 수 ms ~ 수백 ms)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_camera: ContextVar[Optional[Hashable]] = ContextVar("metrics_camera", default=None)
+# 요청별 Server-Timing 수집 대상 [(stage, 초), ...]. None 이면 수집 안 함
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("metrics_timings", default=None)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket 별 개수..., +Inf 개수], 합계
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in self._series.items()]
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    """
+    수집 시점에 fn() 을 불러 값을 읽는 지표 (워커 풀 대기 수처럼 이미 다른 곳에서 세고 있는 값)
+    fn: {라벨값 tuple: 값}. 누적 카운트(거절 수 등)는 metric_type="counter"
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str],
+                 fn: Callable[[], Dict[Tuple[Any, ...], float]], metric_type: str = "gauge") -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.metric_type = metric_type
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.metric_type}"]
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"[metrics] {self.name} 수집 실패: {e}")
+            return lines
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "traffic_stage_seconds", "Per-frame pipeline stage duration in seconds", ("stage", "cctv_id", "engine"))
+REQUEST_SECONDS = Histogram(
+    "traffic_request_seconds", "HTTP request duration in seconds", ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS + (10.0,))
+
+_REGISTRY: List[Any] = [
+    STAGE_SECONDS,
+    REQUEST_SECONDS,
+    Gauge("traffic_engine_info", "Inference engine in use", ("engine", "precision"),
+          lambda: {(INFERENCE_ENGINE, INFERENCE_PRECISION): 1}),
+]
+
+
+def register(metric: Any) -> None:
+    """collect() -> List[str] 을 가진 지표 추가 (이름이 같으면 교체)"""
+    for i, m in enumerate(_REGISTRY):
+        if m.name == metric.name:
+            _REGISTRY[i] = metric
+            return
+    _REGISTRY.append(metric)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in list(_REGISTRY):
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- 단계 측정 ----------
+
+def bind_camera(cctv_id: Optional[Hashable]) -> None:
+    """현재 요청/태스크의 cctv_id (이후 stage() / timed() 기본 라벨)"""
+    _camera.set(cctv_id)
+
+
+def _camera_label(cctv_id: Optional[Hashable]) -> str:
+    if not METRICS_CAMERA_LABELS:
+        return "all"
+    return "none" if cctv_id is None else str(cctv_id)
+
+
+def observe(stage: str, seconds: float, cctv_id: Optional[Hashable] = None) -> None:
+    if not METRICS_ENABLED:
+        return
+    if cctv_id is None:
+        cctv_id = _camera.get()
+    STAGE_SECONDS.observe(seconds, stage, _camera_label(cctv_id), INFERENCE_ENGINE)
+    timings = _timings.get()
+    if timings is not None:
+        # 풀 스레드에서도 append 만 하므로 잠금 불필요
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def stage(name: str, cctv_id: Optional[Hashable] = None) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, cctv_id)
+
+
+def timed(name: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """fn 실행 시간을 name 단계로 기록하는 래퍼 (run_cpu(timed("decode", decode_jpeg), ...) 처럼 풀 안에서 잼)"""
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        with stage(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+# ---------- Server-Timing ----------
+
+def start_request_timing() -> List[Tuple[str, float]]:
+    """요청 시작 시 호출. 이 요청에서 파생된 태스크/풀 작업의 단계 시간이 반환 리스트에 쌓임"""
+    timings: List[Tuple[str, float]] = []
+    _timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """같은 단계가 여러 번이면 합산"""
+    summed: Dict[str, float] = {}
+    for name, seconds in list(timings):
+        summed[name] = summed.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in summed.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000.0:.1f}")
+    return ", ".join(parts)
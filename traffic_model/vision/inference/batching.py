@@ -0,0 +1,196 @@
+# 여러 CCTV에서 동시에 들어오는 프레임을 모아 한 번에 추론하는 배치 스케줄러
+
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from infra.configs.settings import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_QUEUE_SIZE
+from vision.inference.registry import get_shared_engine
+
+# 요청별 대기시간 히스토그램 구간 (ms)
+WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class BatchQueueFull(RuntimeError):
+    """배치 대기열이 가득 차서 프레임을 받을 수 없음"""
+
+
+@dataclass
+class _Item:
+    frame: np.ndarray
+    cctv_id: Optional[Hashable]
+    future: Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchStats:
+    """큐 길이, 배치 크기 분포, 요청별 대기시간 집계"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batch_sizes: Counter = Counter()
+        self.wait_buckets: Counter = Counter()
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.infer_sum_ms = 0.0
+        self.rejected = 0
+
+    def record_batch(self, size: int, waits_ms: List[float], infer_ms: float) -> None:
+        with self._lock:
+            self.batch_sizes[size] += 1
+            self.infer_sum_ms += infer_ms
+            for w in waits_ms:
+                self.wait_count += 1
+                self.wait_sum_ms += w
+                self.wait_max_ms = max(self.wait_max_ms, w)
+                for le in WAIT_BUCKETS_MS:
+                    if w <= le:
+                        self.wait_buckets[le] += 1
+                        break
+                else:
+                    self.wait_buckets["+Inf"] += 1
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                "batches": batches,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+                "avg_batch_size": (
+                    sum(k * v for k, v in self.batch_sizes.items()) / batches if batches else 0.0
+                ),
+                "avg_infer_ms": self.infer_sum_ms / batches if batches else 0.0,
+                "requests": self.wait_count,
+                "rejected": self.rejected,
+                "wait_ms": {
+                    "avg": self.wait_sum_ms / self.wait_count if self.wait_count else 0.0,
+                    "max": self.wait_max_ms,
+                    "histogram": {str(k): self.wait_buckets.get(k, 0) for k in (*WAIT_BUCKETS_MS, "+Inf")},
+                },
+            }
+
+
+class BatchScheduler:
+    """
+    프레임을 대기열에 모았다가 (max_batch_size 개가 모이거나 max_wait_ms 가 지나면)
+    엔진의 predict_batch 로 한 번에 추론하고, 각 요청자에게 자기 결과를 돌려준다.
+    추론과 카메라별 트래커 갱신은 전용 워커 스레드 하나에서만 수행된다.
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        max_queue: int = BATCH_QUEUE_SIZE,
+    ) -> None:
+        self.engine = engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = BatchStats()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="batch-inference", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, frame: np.ndarray, cctv_id: Optional[Hashable] = None) -> Future:
+        self.start()
+        item = _Item(frame=frame, cctv_id=cctv_id, future=Future())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats.record_rejected()
+            raise BatchQueueFull(
+                f"inference queue is full ({self._queue.maxsize})") from None
+        return item.future
+
+    async def predict(self, frame: np.ndarray, cctv_id: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        return await asyncio.wrap_future(self.submit(frame, cctv_id))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "queue_depth": self.queue_depth,
+            **self.stats.snapshot(),
+        }
+
+    def _collect(self, first: _Item) -> tuple[List[_Item], bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+
+            t0 = time.perf_counter()
+            waits_ms = [(t0 - it.enqueued_at) * 1000.0 for it in batch]
+            try:
+                results = self.engine.predict_batch(
+                    [it.frame for it in batch], [it.cctv_id for it in batch])
+            except Exception as e:
+                for it in batch:
+                    if not it.future.done():
+                        it.future.set_exception(e)
+                continue
+            infer_ms = (time.perf_counter() - t0) * 1000.0
+
+            for it, preds in zip(batch, results):
+                # 요청 쪽에서 이미 취소된 경우(클라이언트 끊김 등)는 건너뜀
+                if not it.future.done():
+                    it.future.set_result(preds)
+            self.stats.record_batch(len(batch), waits_ms, infer_ms)
+
+
+_SCHEDULER: Optional[BatchScheduler] = None
+
+
+def get_batch_scheduler() -> BatchScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = BatchScheduler(get_shared_engine())
+    return _SCHEDULER
@@ -1,3 +1,127 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from infra.configs.settings import YOLO_CLASSES
+from infra.monitoring import metrics
+from vision.inference.tracking import Detections, TrackerSessionManager
+
+
 class InferenceEngine:
-    def predict(self, frame):
+    """
+    모든 추론 엔진(ultralytics / onnxruntime / openvino ...)의 공통 부분.
+    하위 클래스는 _ensure(모델 로드)와 detect_batch(검출만)만 구현하면 되고,
+    cctv_id 별 트래킹과 출력 형식({"track_id", "cls", "conf", "bbox"})은 여기서 동일하게 처리한다.
+    """
+
+    name: str = "base"
+
+    def __init__(self) -> None:
+        self.names: Dict[int, str] | None = None
+        self.want: List[str] = [c.strip()
+                                for c in YOLO_CLASSES.split(",") if c.strip()]
+        # 바이트트랙 (cctv_id 별로 독립된 상태 유지)
+        self.tracker_config: str = "bytetrack.yaml"
+        self.trackers = TrackerSessionManager(self.tracker_config)
+        # 모델 호출 직렬화 (배치 스레드/추론 풀 등 여러 스레드에서 호출될 수 있음)
+        self.lock = threading.Lock()
+
+    def _ensure(self) -> None:
         raise NotImplementedError
+
+    def input_size(self) -> int:
+        """모델 입력의 긴 변 (모델을 로드한 뒤 체크포인트/export 메타데이터 기준)"""
+        self._ensure()
+        return max(self.input_hw)
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[Detections]:
+        """프레임별 검출 결과 (원본 좌표 xyxy, conf, cls index). 트래킹 없음"""
+        raise NotImplementedError
+
+    def predict(self, frame: np.ndarray, cctv_id: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        """
+        단일 프레임에 대해 검출 + 해당 cctv_id 의 ByteTrack 갱신을 수행하고,
+        각 객체에 track_id 를 포함한 결과 리스트를 반환하는 원리
+        """
+        return self.predict_batch([frame], [cctv_id])[0]
+
+    def predict_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        cctv_ids: Optional[Sequence[Optional[Hashable]]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 프레임(서로 다른 CCTV 가능)을 한 번의 forward pass로 검출한 뒤,
+        프레임마다 자기 cctv_id 의 트래커로 track_id 를 부여.
+        cctv_ids 를 주지 않으면 트래킹 없이 검출 결과만 반환 (track_id 는 None)
+        """
+        self._ensure()
+
+        if not frames:
+            return []
+
+        with self.lock:
+            t0 = time.perf_counter()
+            batch = self.detect_batch(list(frames))
+            infer_s = time.perf_counter() - t0
+        # 배치면 프레임마다 배치 전체 시간 (그 프레임이 실제로 기다린 시간)
+        for cctv_id in (cctv_ids if cctv_ids is not None else [None] * len(frames)):
+            metrics.observe("inference", infer_s, cctv_id)
+
+        out: List[List[Dict[str, Any]]] = []
+        for i, dets in enumerate(batch):
+            if cctv_ids is None:
+                out.append(self._to_detections(dets))
+                continue
+
+            # 같은 카메라의 프레임은 도착 순서대로 트래커에 들어가야 함
+            with metrics.stage("tracking", cctv_ids[i]):
+                tracks = self.trackers.update(cctv_ids[i], dets, frames[i])
+            if len(tracks) == 0:
+                # 트래커가 아직 확정한 객체가 없으면 검출 결과를 그대로 사용 (ultralytics track 과 동일)
+                out.append(self._to_detections(dets))
+                continue
+            out.append(self._to_detections(
+                Detections(tracks[:, 0:4], tracks[:, 5], tracks[:, 6]),
+                track_ids=tracks[:, 4],
+            ))
+        return out
+
+    def advance(self, cctv_id: Hashable) -> None:
+        """검출 없이 해당 cctv_id 트래커만 직전 검출 결과로 한 프레임 진행 (모션 게이트)"""
+        self.trackers.advance(cctv_id)
+
+    def _to_detections(
+        self,
+        dets: Detections,
+        track_ids: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+
+        # names가 None인 경우를 방어
+        names: Dict[int, str] = self.names if self.names is not None else {}
+
+        for i in range(len(dets)):
+            cls_id: int = int(dets.cls[i])
+            name: str = names.get(cls_id, str(cls_id))
+            if name not in self.want:
+                continue
+
+            # tracking id (ByteTrack가 부여)
+            track_id: int | None = int(track_ids[i]) if track_ids is not None else None
+
+            x1, y1, x2, y2 = dets.xyxy[i].tolist()
+            conf: float = float(dets.conf[i])
+
+            out.append(
+                {
+                    "track_id": track_id,
+                    "cls": name,
+                    "conf": conf,
+                    "bbox": [x1, y1, x2, y2],
+                }
+            )
+
+        return out
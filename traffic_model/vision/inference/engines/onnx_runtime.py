@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from infra.configs.settings import (
+    CONF_THRES,
+    INFER_THREADS,
+    INFERENCE_PRECISION,
+    IOU_THRES,
+    MODEL_IMGSZ,
+    MODEL_PATH,
+    ONNX_MODEL_PATH,
+    ORT_INTER_OP_THREADS,
+)
+from vision.inference.engines.base import InferenceEngine
+from vision.inference.engines.yolo_decode import parse_imgsz, parse_names, postprocess, preprocess_batch
+from vision.inference.tracking import Detections
+
+
+def default_onnx_path(precision: str = INFERENCE_PRECISION) -> Path:
+    # ultralytics export 기본 이름: test.pt -> test.onnx, int8 은 quantize 출력 이름 test_int8.onnx
+    if ONNX_MODEL_PATH:
+        return Path(ONNX_MODEL_PATH)
+    path = Path(MODEL_PATH).with_suffix(".onnx")
+    if precision == "int8":
+        path = path.with_name(f"{path.stem}_int8.onnx")
+    return path
+
+
+class ONNXEngine(InferenceEngine):
+    """
+    ultralytics 로 export 한 .onnx 모델을 onnxruntime(CPU)으로 추론.
+    출력 형식/트래킹은 YOLOEngine 과 동일 (InferenceEngine 공통 처리)
+    """
+
+    name = "onnxruntime"
+
+    def __init__(self, model_path: Optional[str] = None, precision: str = INFERENCE_PRECISION) -> None:
+        super().__init__()
+        self.precision = precision
+        self.model_path: Path = Path(model_path) if model_path else default_onnx_path(precision)
+        self.session = None
+        self.input_name: str = "images"
+        self.input_hw = (MODEL_IMGSZ or 640, MODEL_IMGSZ or 640)
+        # export 시 batch 가 고정(예: 1)이면 그 크기로 나눠서 실행
+        self.fixed_batch: Optional[int] = None
+
+    def _session_options(self):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if INFER_THREADS > 0:
+            opts.intra_op_num_threads = INFER_THREADS
+        opts.inter_op_num_threads = ORT_INTER_OP_THREADS
+        return opts
+
+    def _ensure(self) -> None:
+        if self.session is not None:
+            return
+        import onnxruntime as ort
+
+        if not self.model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX 모델을 찾지 못하였습니다: {self.model_path} "
+                "(python -m vision.inference.export --format onnx 로 생성, int8 은 "
+                "python -m vision.inference.quantize)")
+
+        session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=self._session_options(),
+            providers=["CPUExecutionProvider"],
+        )
+        inp = session.get_inputs()[0]
+        self.input_name = inp.name
+        b, _, h, w = inp.shape
+        meta = session.get_modelmeta().custom_metadata_map
+        # 입력 크기: 고정 shape 모델은 그 크기, dynamic 이면 MODEL_IMGSZ -> export 메타데이터 imgsz 순
+        fallback = (MODEL_IMGSZ, MODEL_IMGSZ) if MODEL_IMGSZ else parse_imgsz(meta.get("imgsz")) or self.input_hw
+        self.input_hw = (h if isinstance(h, int) else fallback[0],
+                         w if isinstance(w, int) else fallback[1])
+        self.fixed_batch = b if isinstance(b, int) else None
+        self.names = parse_names(meta.get("names"))
+        self.session = session
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[Detections]:
+        assert self.session is not None
+        x, metas = preprocess_batch(frames, self.input_hw)
+
+        if self.fixed_batch is None or self.fixed_batch == len(frames):
+            output = self._run(x)
+        else:
+            # 고정 batch 모델: 나눠서 실행하고 마지막 조각은 0 으로 채움
+            n = self.fixed_batch
+            chunks = []
+            for s in range(0, len(frames), n):
+                part = x[s:s + n]
+                if len(part) < n:
+                    part = np.concatenate([part, np.zeros((n - len(part),) + part.shape[1:], part.dtype)])
+                chunks.append(self._run(part))
+            output = np.concatenate(chunks)[:len(frames)]
+
+        return postprocess(output, metas, [f.shape[:2] for f in frames], CONF_THRES, IOU_THRES)
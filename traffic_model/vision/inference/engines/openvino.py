@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import yaml
+
+from infra.configs.settings import (
+    CONF_THRES,
+    INFERENCE_PRECISION,
+    INFER_THREADS,
+    IOU_THRES,
+    MODEL_IMGSZ,
+    MODEL_PATH,
+    OPENVINO_MODEL_PATH,
+)
+from vision.inference.engines.base import InferenceEngine
+from vision.inference.engines.yolo_decode import parse_imgsz, parse_names, postprocess, preprocess_batch
+from vision.inference.tracking import Detections
+
+
+def default_openvino_path(precision: str = INFERENCE_PRECISION) -> Path:
+    # ultralytics export 기본 이름: test.pt -> test_openvino_model/, int8=True 면 test_int8_openvino_model/
+    if OPENVINO_MODEL_PATH:
+        return Path(OPENVINO_MODEL_PATH)
+    p = Path(MODEL_PATH)
+    suffix = "_int8_openvino_model" if precision == "int8" else "_openvino_model"
+    return p.with_name(f"{p.stem}{suffix}")
+
+
+class OpenVINOEngine(InferenceEngine):
+    """
+    ultralytics 로 export 한 OpenVINO IR(.xml/.bin)을 CPU 에서 추론.
+    출력 형식/트래킹은 YOLOEngine 과 동일 (InferenceEngine 공통 처리)
+    """
+
+    name = "openvino"
+
+    def __init__(self, model_path: Optional[str] = None, precision: str = INFERENCE_PRECISION) -> None:
+        super().__init__()
+        self.precision = precision
+        self.model_path: Path = Path(model_path) if model_path else default_openvino_path(precision)
+        self.compiled = None
+        self.input_hw = (MODEL_IMGSZ or 640, MODEL_IMGSZ or 640)
+
+    def _xml_path(self) -> Path:
+        if self.model_path.is_dir():
+            xmls = sorted(self.model_path.glob("*.xml"))
+            if not xmls:
+                raise FileNotFoundError(f"OpenVINO 모델(.xml)이 없습니다: {self.model_path}")
+            return xmls[0]
+        return self.model_path
+
+    def _ensure(self) -> None:
+        if self.compiled is not None:
+            return
+        import openvino as ov
+
+        if not self.model_path.exists():
+            raise FileNotFoundError(
+                f"OpenVINO 모델을 찾지 못하였습니다: {self.model_path} "
+                "(python -m vision.inference.export --format openvino [--int8] 로 생성)")
+
+        xml = self._xml_path()
+        core = ov.Core()
+        model = core.read_model(str(xml))
+
+        # ultralytics export 는 같은 디렉터리에 metadata.yaml 로 클래스명/imgsz 를 저장
+        meta_path = xml.parent / "metadata.yaml"
+        meta = {}
+        if meta_path.exists():
+            with meta_path.open(encoding="utf-8") as f:
+                meta = yaml.safe_load(f) or {}
+
+        # 입력 크기: 고정 shape 모델은 그 크기, dynamic 이면 MODEL_IMGSZ -> export 메타데이터 imgsz 순
+        shape = model.input(0).get_partial_shape()
+        if shape[2].is_static and shape[3].is_static:
+            self.input_hw = (shape[2].get_length(), shape[3].get_length())
+        elif not MODEL_IMGSZ:
+            self.input_hw = parse_imgsz(meta.get("imgsz")) or self.input_hw
+
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if INFER_THREADS > 0:
+            config["INFERENCE_NUM_THREADS"] = INFER_THREADS
+        self.compiled = core.compile_model(model, "CPU", config)
+
+        self.names = parse_names(meta.get("names"))
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[Detections]:
+        assert self.compiled is not None
+        x, metas = preprocess_batch(frames, self.input_hw)
+        output = self.compiled(x)[self.compiled.output(0)]
+        return postprocess(np.asarray(output), metas, [f.shape[:2] for f in frames], CONF_THRES, IOU_THRES)
@@ -0,0 +1,136 @@
+# ultralytics 로 export 한 YOLO 모델(onnx/openvino)을 직접 돌릴 때 필요한 전처리/후처리
+# ultralytics predict 와 같은 letterbox(114 패딩, 중앙 정렬)와 클래스별 NMS 를 numpy/OpenCV 로 구현
+
+import ast
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from vision.inference.tracking import Detections
+
+# 클래스별 NMS 를 한 번에 하기 위해 클래스마다 좌표를 이만큼 떨어뜨림 (ultralytics 와 동일)
+_MAX_WH = 7680
+MAX_DET = 300
+
+# (ratio, (pad_w, pad_h))
+LetterboxMeta = Tuple[float, Tuple[float, float]]
+
+
+def letterbox(img: np.ndarray, new_shape: Tuple[int, int]) -> Tuple[np.ndarray, LetterboxMeta]:
+    h, w = img.shape[:2]
+    new_h, new_w = new_shape
+    r = min(new_h / h, new_w / w)
+    unpad_w, unpad_h = round(w * r), round(h * r)
+    pad_w, pad_h = (new_w - unpad_w) / 2.0, (new_h - unpad_h) / 2.0
+
+    if (w, h) != (unpad_w, unpad_h):
+        img = cv2.resize(img, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(pad_h - 0.1), round(pad_h + 0.1)
+    left, right = round(pad_w - 0.1), round(pad_w + 0.1)
+    img = cv2.copyMakeBorder(img, top, bottom, left, right,
+                             cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return img, (r, (pad_w, pad_h))
+
+
+def preprocess_batch(
+    frames: Sequence[np.ndarray],
+    input_hw: Tuple[int, int],
+) -> Tuple[np.ndarray, List[LetterboxMeta]]:
+    """BGR uint8 프레임들 -> (B, 3, H, W) float32 RGB 0~1 텐서"""
+    batch = np.empty((len(frames), 3, input_hw[0], input_hw[1]), dtype=np.float32)
+    metas: List[LetterboxMeta] = []
+    for i, frame in enumerate(frames):
+        img, meta = letterbox(frame, input_hw)
+        # BGR -> RGB, HWC -> CHW, 0~255 -> 0~1
+        batch[i] = img[:, :, ::-1].transpose(2, 0, 1)
+        metas.append(meta)
+    batch *= 1.0 / 255.0
+    return batch, metas
+
+
+def _nms(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, iou: float) -> np.ndarray:
+    """
+    greedy NMS (점수 내림차순 인덱스, 최대 MAX_DET 개)
+    cv2.dnn.NMSBoxes 는 좌표를 정수 Rect 로 바꿔 ultralytics(torchvision) 결과와 조금씩 어긋나서 numpy 로 구현
+    """
+    boxes = xyxy + cls.reshape(-1, 1) * _MAX_WH
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = conf.argsort()[::-1]
+    keep = []
+    while order.size and len(keep) < MAX_DET:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        order = rest[inter / (areas[i] + areas[rest] - inter) <= iou]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess(
+    output: np.ndarray,
+    metas: Sequence[LetterboxMeta],
+    orig_shapes: Sequence[Tuple[int, int]],
+    conf_thres: float,
+    iou_thres: float,
+) -> List[Detections]:
+    """
+    output:
+    - (B, 4 + nc, N): YOLOv8/11 기본 export (cx, cy, w, h, 클래스별 점수)
+    - (B, N, 6): end2end export (x1, y1, x2, y2, conf, cls) -> NMS 생략
+    """
+    out: List[Detections] = []
+    end2end = output.ndim == 3 and output.shape[2] == 6 and output.shape[1] > output.shape[2]
+    for i in range(output.shape[0]):
+        if end2end:
+            pred = output[i]
+            pred = pred[pred[:, 4] >= conf_thres]
+            xyxy, conf, cls = pred[:, :4].copy(), pred[:, 4], pred[:, 5]
+        else:
+            pred = output[i].T  # (N, 4 + nc)
+            scores = pred[:, 4:]
+            cls = scores.argmax(axis=1)
+            conf = scores[np.arange(len(scores)), cls]
+            mask = conf >= conf_thres
+            pred, cls, conf = pred[mask], cls[mask], conf[mask]
+            xyxy = np.empty((len(pred), 4), dtype=np.float32)
+            xyxy[:, :2] = pred[:, :2] - pred[:, 2:4] / 2.0
+            xyxy[:, 2:] = pred[:, :2] + pred[:, 2:4] / 2.0
+            if len(xyxy):
+                keep = _nms(xyxy, conf, cls, iou_thres)
+                xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+        # letterbox 좌표 -> 원본 좌표
+        r, (pad_w, pad_h) = metas[i]
+        xyxy[:, [0, 2]] -= pad_w
+        xyxy[:, [1, 3]] -= pad_h
+        xyxy /= r
+        h, w = orig_shapes[i]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+        out.append(Detections(xyxy, conf, cls))
+    return out
+
+
+def parse_imgsz(raw) -> Optional[Tuple[int, int]]:
+    """export 메타데이터의 imgsz ("[608, 608]" 문자열, 리스트 또는 int) -> (h, w). 없으면 None"""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = ast.literal_eval(raw)
+    if isinstance(raw, int):
+        return raw, raw
+    h, w = (list(raw) * 2)[:2]
+    return int(h), int(w)
+
+
+def parse_names(raw) -> Dict[int, str]:
+    """export 메타데이터의 names ("{0: 'car', ...}" 문자열 또는 dict) -> {int: str}"""
+    if raw is None:
+        return {}
+    if isinstance(raw, str):
+        raw = ast.literal_eval(raw)
+    return {int(k): str(v) for k, v in dict(raw).items()}
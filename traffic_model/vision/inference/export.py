@@ -0,0 +1,55 @@
+# .pt 모델을 onnxruntime / openvino 엔진용으로 export
+# 사용법 (traffic_model 디렉터리): python -m vision.inference.export --format onnx|openvino [--batch-fixed]
+# openvino int8: --format openvino --int8 --data <data.yaml> (NNCF 보정, ultralytics 가 처리)
+# onnx int8 은 export 후 python -m vision.inference.quantize 로 만든다
+
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from ultralytics import YOLO
+
+from infra.configs.settings import MODEL_IMGSZ, MODEL_PATH
+
+
+def export(
+    fmt: str,
+    model_path: str = MODEL_PATH,
+    imgsz: Optional[int] = MODEL_IMGSZ,
+    dynamic: bool = True,
+    int8: bool = False,
+    data: str | None = None,
+) -> Path:
+    model = YOLO(model_path)
+    kwargs = {}
+    if imgsz:
+        # 주지 않으면 체크포인트의 학습 imgsz 로 export
+        kwargs["imgsz"] = imgsz
+    if int8:
+        kwargs.update(int8=True, data=data)
+    # dynamic=True: batch 크기를 고정하지 않아 BatchScheduler 의 묶음을 한 번에 실행
+    out = model.export(format=fmt, dynamic=dynamic, half=False,
+                       simplify=(fmt == "onnx"), **kwargs)
+    return Path(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="YOLO 모델 export")
+    parser.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--imgsz", type=int, default=MODEL_IMGSZ, help="기본: 체크포인트의 학습 imgsz")
+    parser.add_argument("--batch-fixed", action="store_true", help="batch=1 고정으로 export")
+    parser.add_argument("--int8", action="store_true", help="openvino int8 (NNCF) export")
+    parser.add_argument("--data", default=None, help="int8 보정용 data.yaml (train/ 에서 쓰던 것)")
+    args = parser.parse_args()
+
+    if args.int8 and args.format != "openvino":
+        parser.error("--int8 은 openvino 에서만 지원. onnx 는 vision.inference.quantize 사용")
+
+    out = export(args.format, args.model, args.imgsz, dynamic=not args.batch_fixed,
+                 int8=args.int8, data=args.data)
+    print(f"export 완료: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# fp32 .onnx 모델 -> int8 .onnx (onnxruntime.quantization)
+# 사용법 (traffic_model 디렉터리):
+#   python -m vision.inference.quantize --mode static [--calib-dir DIR] [--calib-count 200]
+#   python -m vision.inference.quantize --mode dynamic
+# - dynamic: 가중치만 int8, 활성값은 실행 중 양자화. 보정 데이터가 필요 없지만 Conv 위주 모델은 이득이 작음
+# - static: 저장된 CCTV 프레임으로 활성값 범위를 보정 (QDQ, per-channel). CPU 처리량 이득이 큼
+# Detect head 의 박스 디코딩(DFL/concat/sigmoid 등)은 int8 오차에 민감해서 fp32 로 남겨둔다
+
+import argparse
+import contextlib
+import re
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from infra.configs.settings import MODEL_IMGSZ, QUANT_CALIB_DIR
+from vision.inference.engines.onnx_runtime import default_onnx_path
+from vision.inference.engines.yolo_decode import parse_imgsz, preprocess_batch
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp"}
+_MODULE_RE = re.compile(r"^/model\.(\d+)/")
+
+
+def _calib_paths(calib_dir: str, count: int) -> List[Path]:
+    paths = sorted(p for p in Path(calib_dir).rglob("*") if p.suffix.lower() in IMAGE_EXTS)
+    if not paths:
+        raise FileNotFoundError(f"보정용 프레임이 없습니다: {calib_dir}")
+    if len(paths) > count:
+        # 주간/야간 폴더가 섞여 있어도 고르게 뽑히도록 간격을 두고 선택
+        idx = np.linspace(0, len(paths) - 1, count).astype(int)
+        paths = [paths[i] for i in idx]
+    return paths
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader: 프레임을 추론과 같은 letterbox 로 1장씩 넘김"""
+
+    def __init__(self, paths: List[Path], input_name: str, input_hw) -> None:
+        self.paths = paths
+        self.input_name = input_name
+        self.input_hw = input_hw
+        self._it = iter(paths)
+
+    def get_next(self) -> Optional[dict]:
+        for path in self._it:
+            frame = cv2.imread(str(path))
+            if frame is None:
+                continue
+            x, _ = preprocess_batch([frame], self.input_hw)
+            return {self.input_name: x}
+        return None
+
+    def rewind(self) -> None:
+        self._it = iter(self.paths)
+
+
+def _head_nodes_to_exclude(model_path: Path) -> List[str]:
+    """
+    Detect head(마지막 모듈)의 디코딩 노드 이름.
+    head 안의 cv2/cv3 Conv 브랜치(박스/클래스 특징)는 양자화하고, 그 뒤 DFL/anchor/concat/sigmoid 만 fp32 로 둔다
+    """
+    import onnx
+
+    model = onnx.load(str(model_path), load_external_data=False)
+    indices = [int(m.group(1)) for n in model.graph.node if (m := _MODULE_RE.match(n.name))]
+    if not indices:
+        return []
+    last = max(indices)
+    decode_re = re.compile(rf"^/model\.{last}/(?!(one2one_)?cv\d)")
+    head_started = False
+    names = []
+    for node in model.graph.node:
+        if node.name.startswith(f"/model.{last}/"):
+            head_started = True
+        # head 뒤에 붙는 후처리 노드(/model.N/ 접두어가 없는 것)도 포함
+        if decode_re.match(node.name) or (head_started and not _MODULE_RE.match(node.name)):
+            names.append(node.name)
+    return names
+
+
+def _calibration_reader(src: Path, calib_dir: str, calib_count: int) -> FrameCalibrationReader:
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(str(src), providers=["CPUExecutionProvider"])
+    inp = session.get_inputs()[0]
+    _, _, h, w = inp.shape
+    # dynamic 입력이면 MODEL_IMGSZ -> export 메타데이터 imgsz 순 (엔진과 같은 크기로 보정)
+    fallback = ((MODEL_IMGSZ, MODEL_IMGSZ) if MODEL_IMGSZ
+                else parse_imgsz(session.get_modelmeta().custom_metadata_map.get("imgsz")) or (640, 640))
+    input_hw = (h if isinstance(h, int) else fallback[0], w if isinstance(w, int) else fallback[1])
+    return FrameCalibrationReader(_calib_paths(calib_dir, calib_count), inp.name, input_hw)
+
+
+@contextlib.contextmanager
+def _scratch_in(tmp: str) -> Iterator[None]:
+    """
+    onnxruntime 양자화 도구는 중간 파일을 작업 디렉터리(sym_shape_infer_temp.onnx + uuid 이름의 external data)와
+    시스템 임시 디렉터리(augmented_model.onnx 등)에 씀 -> 둘 다 tmp 안으로 (끝나면 TemporaryDirectory 와 함께 삭제)
+    """
+    prev_tempdir = tempfile.tempdir
+    tempfile.tempdir = tmp
+    try:
+        with contextlib.chdir(tmp):
+            yield
+    finally:
+        tempfile.tempdir = prev_tempdir
+
+
+def quantize(
+    src: Path,
+    dst: Path,
+    mode: str = "static",
+    calib_dir: str = QUANT_CALIB_DIR,
+    calib_count: int = 200,
+) -> Path:
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if not src.exists():
+        raise FileNotFoundError(f"fp32 ONNX 모델이 없습니다: {src} (python -m vision.inference.export)")
+    # 작업 디렉터리를 임시 디렉터리로 옮기므로 경로는 먼저 절대 경로로
+    src, dst = src.resolve(), dst.resolve()
+    calib_dir = str(Path(calib_dir).resolve())
+
+    with tempfile.TemporaryDirectory() as tmp, _scratch_in(tmp):
+        # 양자화 전 shape inference/상수 폴딩 (onnxruntime 권장 전처리). 노드 이름은 전처리 후 기준
+        prepped = Path(tmp) / "prepped.onnx"
+        # dynamic export 는 심볼릭 shape 추론이 끝까지 안 되므로 onnx shape 추론만 사용
+        quant_pre_process(str(src), str(prepped), skip_symbolic_shape=True)
+        exclude = _head_nodes_to_exclude(prepped)
+
+        if mode == "dynamic":
+            quantize_dynamic(str(prepped), str(dst), weight_type=QuantType.QInt8,
+                             per_channel=True, nodes_to_exclude=exclude)
+            return dst
+
+        quantize_static(
+            str(prepped),
+            str(dst),
+            _calibration_reader(src, calib_dir, calib_count),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax,
+            nodes_to_exclude=exclude,
+        )
+    return dst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ONNX int8 양자화")
+    parser.add_argument("--mode", choices=["static", "dynamic"], default="static")
+    parser.add_argument("--src", default=None, help="fp32 .onnx (기본: MODEL_PATH 기준 export 이름)")
+    parser.add_argument("--dst", default=None, help="출력 경로 (기본: <src>_int8.onnx, 엔진 기본 경로와 같음)")
+    parser.add_argument("--calib-dir", default=QUANT_CALIB_DIR)
+    parser.add_argument("--calib-count", type=int, default=200)
+    args = parser.parse_args()
+
+    src = Path(args.src) if args.src else default_onnx_path("fp32")
+    dst = Path(args.dst) if args.dst else src.with_name(f"{src.stem}_int8.onnx")
+    out = quantize(src, dst, args.mode, args.calib_dir, args.calib_count)
+    print(f"양자화 완료 ({args.mode}): {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,55 @@
-# 추후 여러 엔진을 등록하려면 여기로.
-from vision.inference.engines.yolo_ultralytics import YOLOEngine
+# 추론 엔진 등록/선택. INFERENCE_ENGINE 설정값으로 엔진을 고른다.
+# 선택적 의존성(onnxruntime, openvino)은 해당 엔진을 쓸 때만 import 되도록 경로로 등록
+import importlib
+from typing import Dict
 
+from infra.configs.settings import INFERENCE_ENGINE, INFERENCE_PRECISION, MODEL_IMGSZ
+from vision.inference.engines.base import InferenceEngine
 
-def get_default_engine():
-    return YOLOEngine()
+_ENGINES: Dict[str, str] = {
+    "ultralytics": "vision.inference.engines.yolo_ultralytics:YOLOEngine",
+    "onnxruntime": "vision.inference.engines.onnx_runtime:ONNXEngine",
+    "openvino": "vision.inference.engines.openvino:OpenVINOEngine",
+}
+
+# 프로세스 내에서 가중치를 한 번만 로드하기 위한 공유 엔진
+_SHARED_ENGINE: InferenceEngine | None = None
+
+
+def register_engine(name: str, target: str) -> None:
+    """target: "모듈경로:클래스명" """
+    _ENGINES[name] = target
+
+
+def available_engines():
+    return sorted(_ENGINES)
+
+
+def create_engine(name: str, **kwargs) -> InferenceEngine:
+    try:
+        target = _ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"알 수 없는 추론 엔진: {name} (사용 가능: {', '.join(available_engines())})") from None
+    module_name, cls_name = target.split(":")
+    cls = getattr(importlib.import_module(module_name), cls_name)
+    return cls(**kwargs)
+
+
+def get_default_engine() -> InferenceEngine:
+    if INFERENCE_PRECISION == "int8" and INFERENCE_ENGINE == "ultralytics":
+        # .pt 는 CPU 에서 int8 추론 경로가 없으므로 export 된 모델 엔진을 써야 함
+        raise ValueError("INFERENCE_PRECISION=int8 은 onnxruntime / openvino 엔진에서만 지원합니다")
+    return create_engine(INFERENCE_ENGINE)
+
+
+def get_shared_engine() -> InferenceEngine:
+    global _SHARED_ENGINE
+    if _SHARED_ENGINE is None:
+        _SHARED_ENGINE = get_default_engine()
+    return _SHARED_ENGINE
+
+
+def model_imgsz() -> int:
+    """모델 입력 긴 변: MODEL_IMGSZ 가 있으면 그 값, 없으면 공유 엔진이 로드한 모델의 imgsz"""
+    return MODEL_IMGSZ or get_shared_engine().input_size()
@@ -0,0 +1,175 @@
+# CCTV(cctv_id)별로 독립된 ByteTrack 상태를 관리
+# 검출 모델(가중치)은 공유하고, 트래커 상태만 카메라마다 따로 둔다.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+import numpy as np
+import yaml
+
+from infra.configs.settings import TRACKER_IDLE_TTL_SECONDS, TRACKER_MAX_SESSIONS
+
+S = TypeVar("S")
+
+
+class CameraStates(Generic[S]):
+    """
+    cctv_id -> 카메라별 상태 (최근 사용 순서를 유지하는 OrderedDict)
+    - idle_ttl 동안 쓰지 않은 상태 제거
+    - max_items 를 넘으면 가장 오래 사용하지 않은 상태부터 제거 (LRU)
+    트래커 세션 / 모션 게이트 / 업로드 샘플러가 같은 기준으로 정리하도록 공유. 잠금은 호출 쪽 책임
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], S],
+        max_items: int = TRACKER_MAX_SESSIONS,
+        idle_ttl: float = TRACKER_IDLE_TTL_SECONDS,
+    ) -> None:
+        self.factory = factory
+        self.max_items = max(1, max_items)
+        self.idle_ttl = idle_ttl
+        # key -> [마지막 사용 시각, 상태]
+        self._items: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self.evicted = 0
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> S:
+        """없으면 만들고, 사용 시각을 갱신한 뒤 오래된 상태를 정리"""
+        now = time.monotonic() if now is None else now
+        entry = self._items.get(key)
+        if entry is None:
+            entry = self._items[key] = [now, self.factory()]
+        else:
+            self._items.move_to_end(key)
+            entry[0] = now
+        # 앞쪽이 가장 오래 사용하지 않은 상태
+        while self._items:
+            last_used = next(iter(self._items.values()))[0]
+            if len(self._items) <= self.max_items and now - last_used < self.idle_ttl:
+                break
+            self._items.popitem(last=False)
+            self.evicted += 1
+        return entry[1]
+
+    def pop(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Detections:
+    """
+    BYTETracker.update 가 요구하는 최소 인터페이스(conf/cls/xywh, boolean indexing)를
+    numpy 배열로 제공하는 컨테이너
+    """
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray) -> None:
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.float32).reshape(-1)
+
+    @property
+    def xywh(self) -> np.ndarray:
+        out = np.empty_like(self.xyxy)
+        out[:, 0] = (self.xyxy[:, 0] + self.xyxy[:, 2]) / 2.0
+        out[:, 1] = (self.xyxy[:, 1] + self.xyxy[:, 3]) / 2.0
+        out[:, 2] = self.xyxy[:, 2] - self.xyxy[:, 0]
+        out[:, 3] = self.xyxy[:, 3] - self.xyxy[:, 1]
+        return out
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, idx) -> "Detections":
+        return Detections(self.xyxy[idx], self.conf[idx], self.cls[idx])
+
+
+class TrackerSession:
+    def __init__(self, tracker: Any) -> None:
+        self.tracker = tracker
+        self.lock = threading.Lock()
+        self.frames = 0
+        # 마지막으로 트래커에 넣은 검출 결과 (모션 게이트에서 검출 없이 트래커만 진행할 때 재사용)
+        self.last_dets: Optional[Detections] = None
+
+
+class TrackerSessionManager:
+    """
+    cctv_id -> TrackerSession
+    - idle_ttl 동안 프레임이 없으면 세션 제거
+    - max_sessions 를 넘으면 가장 오래 사용하지 않은 세션부터 제거 (LRU)
+    """
+
+    def __init__(
+        self,
+        tracker_config: str = "bytetrack.yaml",
+        max_sessions: int = TRACKER_MAX_SESSIONS,
+        idle_ttl: float = TRACKER_IDLE_TTL_SECONDS,
+    ) -> None:
+        self.tracker_config = tracker_config
+        self._sessions: CameraStates[TrackerSession] = CameraStates(self._new_session, max_sessions, idle_ttl)
+        self._lock = threading.Lock()
+        self._cfg: Any = None
+
+    def _tracker_args(self) -> Any:
+        if self._cfg is None:
+            from ultralytics.utils import IterableSimpleNamespace
+            from ultralytics.utils.checks import check_yaml
+
+            with open(check_yaml(self.tracker_config), encoding="utf-8") as f:
+                self._cfg = IterableSimpleNamespace(**yaml.safe_load(f))
+        return self._cfg
+
+    def _new_session(self) -> TrackerSession:
+        from ultralytics.trackers.byte_tracker import BYTETracker
+
+        return TrackerSession(BYTETracker(self._tracker_args()))
+
+    def get(self, cctv_id: Hashable) -> TrackerSession:
+        with self._lock:
+            return self._sessions.get(cctv_id)
+
+    def update(
+        self,
+        cctv_id: Hashable,
+        dets: Detections,
+        frame: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        해당 카메라의 트래커를 한 프레임 진행시키고
+        [x1, y1, x2, y2, track_id, score, cls, idx] 행렬을 반환
+        """
+        sess = self.get(cctv_id)
+        with sess.lock:
+            sess.frames += 1
+            sess.last_dets = dets
+            tracks = sess.tracker.update(dets, frame)
+        return np.asarray(tracks).reshape(-1, 8) if len(tracks) else np.empty((0, 8), np.float32)
+
+    def advance(self, cctv_id: Hashable) -> None:
+        """
+        새 검출 없이 직전 검출 결과로 트래커를 한 프레임 진행.
+        정지 화면에서 검출을 건너뛰는 동안에도 트랙 나이/유실 판정이 실제 프레임 수를 따라가도록 함
+        """
+        sess = self.get(cctv_id)
+        with sess.lock:
+            if sess.last_dets is None:
+                return
+            sess.frames += 1
+            sess.tracker.update(sess.last_dets, None)
+
+    def reset(self, cctv_id: Hashable) -> None:
+        with self._lock:
+            self._sessions.pop(cctv_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self._sessions.max_items,
+                "idle_ttl_seconds": self._sessions.idle_ttl,
+                "evicted": self._sessions.evicted,
+            }
@@ -0,0 +1,88 @@
+# JPEG 한 번 디코딩 (검증 + 디코딩을 cv2.imdecode 한 번으로)
+#
+# 채널 순서: 파이프라인 전체가 BGR (OpenCV / ultralytics numpy 입력 규약)
+#   decode_jpeg -> prepare_for_inference(enhance) -> engine.predict -> draw_detections -> cv2.imencode
+#   중간에 RGB 로 바꾸지 않음. PIL 로 넘길 때만 변환할 것
+#
+# reduce: libjpeg 의 DCT 단계 축소 디코딩 (IMREAD_REDUCED_COLOR_2/4/8). 1/2 이면 디코딩 비용도 대략 1/3~1/4
+#   어차피 모델 입력 크기로 줄일 프레임이면 auto 로 긴 변이 모델 입력 크기 이상인 선에서 최대한 축소
+
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# SOF 마커 (baseline/progressive/lossless 등, DHT/JPG/DAC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """디코딩 없이 JPEG 헤더(SOF)에서 (width, height). JPEG 가 아니거나 헤더가 깨졌으면 None"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i, n = 2, len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        length = (data[i + 2] << 8) | data[i + 3]
+        if marker in _SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            h = (data[i + 5] << 8) | data[i + 6]
+            w = (data[i + 7] << 8) | data[i + 8]
+            return (w, h) if w and h else None
+        if marker == 0xDA:  # SOS 전까지 SOF 가 없으면 잘못된 파일
+            return None
+        i += 2 + length
+    return None
+
+
+def auto_reduce(width: int, height: int, imgsz: Optional[int] = None) -> int:
+    """긴 변이 imgsz(기본: 모델 입력 크기) 아래로 내려가지 않는 가장 큰 축소 배율 (1/2/4/8)"""
+    if imgsz is None:
+        from vision.inference.registry import model_imgsz
+
+        imgsz = model_imgsz()
+    factor = 1
+    for f in (2, 4, 8):
+        if max(width, height) / f >= imgsz:
+            factor = f
+    return factor
+
+
+def decode_jpeg(data: bytes, reduce: Union[int, str] = 1) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    JPEG bytes -> (BGR uint8 HxWx3, (sx, sy) = 디코딩 크기 / 원본 크기)
+    reduce: 1/2/4/8 또는 "auto". 업로드 bytes 를 복사 없이 그대로 디코더에 넘김. 깨진 데이터면 ValueError
+    반환 scale 로 rescale_detections 를 호출하면 원본 좌표가 됨
+    """
+    factor = 1
+    size = None
+    if str(reduce) != "1":
+        size = jpeg_size(data)
+        if size is None:
+            raise ValueError("Cannot identify image file: JPEG 헤더를 읽지 못했습니다")
+        factor = auto_reduce(*size) if reduce == "auto" else int(reduce)
+        if factor not in _REDUCED_FLAGS:
+            raise ValueError(f"지원하지 않는 축소 배율: {reduce} (1, 2, 4, 8, auto)")
+
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), _REDUCED_FLAGS[factor])
+    if img is None or img.ndim != 3 or img.shape[2] != 3:
+        raise ValueError("Cannot identify image file: JPEG 디코딩 실패")
+    if factor == 1:
+        return img, (1.0, 1.0)
+    return img, (img.shape[1] / float(size[0]), img.shape[0] / float(size[1]))
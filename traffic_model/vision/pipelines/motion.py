@@ -0,0 +1,153 @@
+# 모션 게이트: 카메라(cctv_id)별로 마지막 검출 프레임과 현재 프레임을 축소 흑백으로 비교해서
+# 검출기를 돌릴지(detect), 트래커만 진행할지(advance), 직전 결과를 그대로 쓸지(reuse) 결정.
+# 새벽 시간대처럼 움직임이 없는 화면에서 추론을 건너뛰기 위한 용도
+
+import copy
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+import cv2
+import numpy as np
+
+from infra.configs.settings import (
+    MOTION_DETECT_RATIO,
+    MOTION_GATE_WIDTH,
+    MOTION_PIXEL_THRESHOLD,
+    MOTION_REFRESH_SECONDS,
+    MOTION_SCENE_CHANGE_RATIO,
+    MOTION_STILL_RATIO,
+    TRACKER_IDLE_TTL_SECONDS,
+    TRACKER_MAX_SESSIONS,
+)
+from vision.inference.tracking import CameraStates
+
+DETECT = "detect"
+ADVANCE = "advance"
+REUSE = "reuse"
+# 화면 전환(프리셋 이동, 다른 영상으로 교체 등): 트래커를 초기화하고 검출
+SCENE_CHANGE = "scene_change"
+
+
+class _CameraState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reference: Optional[np.ndarray] = None  # 마지막으로 검출한 프레임 (축소 흑백)
+        self.pending: Optional[np.ndarray] = None  # 검출 결정이 난 프레임, commit 때 reference 로
+        self.preds: Optional[List[dict]] = None
+        self.last_detect = 0.0
+
+
+class MotionGate:
+    """
+    check(cctv_id, frame) -> DETECT / SCENE_CHANGE / ADVANCE / REUSE
+    DETECT, SCENE_CHANGE 이면 검출 후 commit(cctv_id, preds) 로 결과와 기준 프레임을 저장.
+    기준 프레임은 검출한 프레임으로만 바뀌므로 천천히 움직이는 변화도 누적되어 결국 검출로 이어짐
+    """
+
+    def __init__(
+        self,
+        width: int = MOTION_GATE_WIDTH,
+        pixel_threshold: int = MOTION_PIXEL_THRESHOLD,
+        still_ratio: float = MOTION_STILL_RATIO,
+        detect_ratio: float = MOTION_DETECT_RATIO,
+        scene_change_ratio: float = MOTION_SCENE_CHANGE_RATIO,
+        refresh_seconds: float = MOTION_REFRESH_SECONDS,
+        max_cameras: int = TRACKER_MAX_SESSIONS,
+        idle_ttl: float = TRACKER_IDLE_TTL_SECONDS,
+    ) -> None:
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.still_ratio = still_ratio
+        self.detect_ratio = detect_ratio
+        self.scene_change_ratio = scene_change_ratio
+        self.refresh_seconds = refresh_seconds
+        # 트래커 세션과 같은 기준으로 오래된 카메라 정리
+        self._states: CameraStates[_CameraState] = CameraStates(_CameraState, max_cameras, idle_ttl)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {DETECT: 0, SCENE_CHANGE: 0, ADVANCE: 0, REUSE: 0}
+
+    def _state(self, cctv_id: Hashable) -> _CameraState:
+        with self._lock:
+            return self._states.get(cctv_id)
+
+    def _thumb(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        small_h = max(1, round(h * self.width / w))
+        small = cv2.resize(frame, (self.width, small_h), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            # 비교용이라 RGB/BGR 어느 쪽이 들어와도 상관없음
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # 센서 노이즈/압축 블록 영향 줄이기
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def changed_ratio(self, a: np.ndarray, b: np.ndarray) -> float:
+        diff = cv2.absdiff(a, b)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mask) / float(mask.size)
+
+    def check(self, cctv_id: Hashable, frame: np.ndarray) -> str:
+        thumb = self._thumb(frame)
+        state = self._state(cctv_id)
+        now = time.monotonic()
+        with state.lock:
+            state.pending = thumb
+            if state.reference is None or state.preds is None or state.reference.shape != thumb.shape:
+                action = DETECT
+            else:
+                ratio = self.changed_ratio(thumb, state.reference)
+                if ratio >= self.scene_change_ratio:
+                    action = SCENE_CHANGE
+                elif ratio >= self.detect_ratio or now - state.last_detect >= self.refresh_seconds:
+                    action = DETECT
+                elif ratio >= self.still_ratio:
+                    action = ADVANCE
+                else:
+                    action = REUSE
+        # 여러 cpu 풀 스레드에서 동시에 호출되므로 잠금 안에서 증가
+        with self._lock:
+            self.counts[action] += 1
+        return action
+
+    def commit(self, cctv_id: Hashable, preds: List[dict]) -> None:
+        """검출 결과(원본 좌표, ROI 필터 전)를 저장하고 기준 프레임을 갱신"""
+        state = self._state(cctv_id)
+        with state.lock:
+            if state.pending is not None:
+                state.reference = state.pending
+            state.preds = copy.deepcopy(preds)
+            state.last_detect = time.monotonic()
+
+    def cached(self, cctv_id: Hashable) -> List[dict]:
+        """직전 검출 결과 사본 (호출 쪽에서 ROI 필터 등으로 수정해도 안전)"""
+        state = self._state(cctv_id)
+        with state.lock:
+            return copy.deepcopy(state.preds) if state.preds is not None else []
+
+    def reset(self, cctv_id: Hashable) -> None:
+        with self._lock:
+            self._states.pop(cctv_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cameras = len(self._states)
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        skipped = counts[ADVANCE] + counts[REUSE]
+        return {
+            "cameras": cameras,
+            "decisions": counts,
+            "skip_ratio": round(skipped / total, 4) if total else 0.0,
+        }
+
+
+_GATE: Optional[MotionGate] = None
+_GATE_LOCK = threading.Lock()
+
+
+def get_motion_gate() -> MotionGate:
+    global _GATE
+    with _GATE_LOCK:
+        if _GATE is None:
+            _GATE = MotionGate()
+    return _GATE
@@ -1,30 +1,156 @@
 # 영상 보정 작업(날씨에 따라 cctv 영상 보정)
 
+import threading
+from typing import Dict, List, Optional, Tuple
+
 import cv2
 import numpy as np
 
+from infra.configs.settings import (
+    ENHANCE_ADAPTIVE,
+    ENHANCE_DARK_THRESHOLD,
+    ENHANCE_LOW_CONTRAST_THRESHOLD,
+    PREPROCESS_DOWNSCALE,
+)
+from infra.monitoring import metrics
+
+
+class Enhancer:
+    """
+    야간/악천후 대비 간단 강화: 밝기 보정 + 히스토그램 균등화(컬러보존 CLAHE) + 샤픈
+    - 감마 LUT 는 생성 시 한 번만 계산
+    - CLAHE 객체와 중간 버퍼는 스레드별/해상도별로 재사용 (cpu 워커 풀에서 동시에 호출됨)
+    - adaptive=True 이면 어둡거나(야간) 대비가 낮은(안개) 프레임에만 보정 적용
+    """
+
+    def __init__(
+        self,
+        gamma: float = 1.2,
+        clip_limit: float = 2.0,
+        tile_grid: Tuple[int, int] = (8, 8),
+        sharpen_sigma: float = 1.0,
+        sharpen_amount: float = 0.5,
+        adaptive: bool = ENHANCE_ADAPTIVE,
+        dark_threshold: float = ENHANCE_DARK_THRESHOLD,
+        low_contrast_threshold: float = ENHANCE_LOW_CONTRAST_THRESHOLD,
+    ) -> None:
+        # 감마 보정(어두운 영상 밝히기)
+        x = np.arange(256, dtype=np.float64) / 255.0
+        self.lut = np.clip(np.power(x, 1.0 / gamma) * 255.0, 0, 255).astype(np.uint8).reshape(1, 256)
+        self.clip_limit = clip_limit
+        self.tile_grid = tile_grid
+        self.sharpen_sigma = sharpen_sigma
+        self.sharpen_amount = sharpen_amount
+        self.adaptive = adaptive
+        self.dark_threshold = dark_threshold
+        self.low_contrast_threshold = low_contrast_threshold
+        self._local = threading.local()
+
+    def _clahe(self):
+        clahe = getattr(self._local, "clahe", None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=self.tile_grid)
+            self._local.clahe = clahe
+        return clahe
+
+    def _buffers(self, shape: Tuple[int, ...]) -> Dict[str, np.ndarray]:
+        cache = getattr(self._local, "buffers", None)
+        if cache is None:
+            cache = self._local.buffers = {}
+        buf = cache.get(shape)
+        if buf is None:
+            h, w = shape[:2]
+            buf = {
+                "bgr": np.empty(shape, np.uint8),
+                "lab": np.empty(shape, np.uint8),
+                "l": np.empty((h, w), np.uint8),
+                "blur": np.empty(shape, np.uint8),
+            }
+            # 해상도가 계속 바뀌는 경우 메모리가 늘어나지 않도록 최근 몇 개만 유지
+            if len(cache) >= 4:
+                cache.pop(next(iter(cache)))
+            cache[shape] = buf
+        return buf
+
+    def needs_enhancement(self, img: np.ndarray) -> bool:
+        """축소한 흑백 프레임의 평균 밝기/표준편차로 보정 필요 여부 판단"""
+        small = cv2.resize(img, (64, 36), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        mean, std = cv2.meanStdDev(gray)
+        return float(mean[0, 0]) < self.dark_threshold or float(std[0, 0]) < self.low_contrast_threshold
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        if img is None:
+            return img
+        if self.adaptive and not self.needs_enhancement(img):
+            return img
+
+        img = np.ascontiguousarray(img)
+        buf = self._buffers(img.shape)
+
+        cv2.LUT(img, self.lut, dst=buf["bgr"])
+
+        # CLAHE in LAB (L 채널만 꺼내서 처리 후 다시 넣음)
+        cv2.cvtColor(buf["bgr"], cv2.COLOR_BGR2LAB, dst=buf["lab"])
+        cv2.extractChannel(buf["lab"], 0, dst=buf["l"])
+        self._clahe().apply(buf["l"], dst=buf["l"])
+        cv2.insertChannel(buf["l"], buf["lab"], 0)
+        cv2.cvtColor(buf["lab"], cv2.COLOR_LAB2BGR, dst=buf["bgr"])
+
+        # 약한 샤프닝 (결과는 호출 쪽에서 계속 쓰므로 새 배열에 저장)
+        cv2.GaussianBlur(buf["bgr"], (0, 0), self.sharpen_sigma, dst=buf["blur"])
+        return cv2.addWeighted(
+            buf["bgr"], 1.0 + self.sharpen_amount, buf["blur"], -self.sharpen_amount, 0)
+
+
+_DEFAULT_ENHANCER = Enhancer()
+
 
 def enhance_frame(img):
     # 야간/악천후 대비 간단 강화: 밝기 보정 + 샤픈 + 히스토그램 균등화(컬러보존 CLAHE)
-    if img is None:
-        return img
-
-    # 감마 보정(어두운 영상 밝히기)
-    gamma = 1.2
-    look = np.empty((1, 256), np.uint8)
-    for i in range(256):
-        look[0, i] = np.clip(pow(i / 255.0, 1.0/gamma) * 255.0, 0, 255)
-    img = cv2.LUT(img, look)
-
-    # CLAHE in LAB
-    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    l2 = clahe.apply(l)
-    lab2 = cv2.merge((l2, a, b))
-    img = cv2.cvtColor(lab2, cv2.COLOR_LAB2BGR)
-
-    # 약한 샤프닝
-    blur = cv2.GaussianBlur(img, (0, 0), 1.0)
-    img = cv2.addWeighted(img, 1.5, blur, -0.5, 0)
-    return img
+    return _DEFAULT_ENHANCER(img)
+
+
+def resize_for_model(img: np.ndarray, imgsz: Optional[int] = None) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    긴 변이 imgsz(기본: 모델 입력 크기) 가 되도록 비율 유지 축소 (확대는 하지 않음).
+    패딩은 넣지 않음 -> 모델 내부 letterbox 가 stride 배수로 최소한만 채움.
+    반환: (축소 이미지, (sx, sy) = 축소/원본 비율)
+    """
+    if imgsz is None:
+        from vision.inference.registry import model_imgsz
+
+        imgsz = model_imgsz()
+    h, w = img.shape[:2]
+    scale = imgsz / float(max(h, w))
+    if scale >= 1.0:
+        return img, (1.0, 1.0)
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    small = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return small, (new_w / w, new_h / h)
+
+
+def rescale_detections(preds: List[dict], scale: Tuple[float, float]) -> List[dict]:
+    """축소 이미지 기준 bbox 를 원본 좌표로 되돌림 (dict 를 그대로 수정)"""
+    sx, sy = scale
+    if sx == 1.0 and sy == 1.0:
+        return preds
+    for d in preds:
+        x1, y1, x2, y2 = d["bbox"]
+        d["bbox"] = [float(x1) / sx, float(y1) / sy, float(x2) / sx, float(y2) / sy]
+    return preds
+
+
+def prepare_for_inference(
+    img: np.ndarray,
+    downscale: bool = PREPROCESS_DOWNSCALE,
+) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    (선택) 모델 입력 크기로 먼저 축소 -> 작은 이미지에 enhance 적용.
+    반환 scale 로 rescale_detections 를 호출해야 원본 좌표가 됨
+    """
+    scale = (1.0, 1.0)
+    if downscale:
+        img, scale = resize_for_model(img)
+    with metrics.stage("enhance"):
+        return enhance_frame(img), scale
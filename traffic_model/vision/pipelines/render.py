@@ -0,0 +1,258 @@
+# 검출 결과 시각화 (LiveModelViewer 스타일: 방향별 ROI 틴트, ID 색 bbox, 반투명 라벨, 중심점)
+# 기존 PIL RGBA 합성(프레임 전체 overlay 여러 장 + alpha_composite)을 프레임 버퍼 하나에 직접 그리는 방식으로 변경
+# - ROI 틴트: 카메라 ROI/해상도별 마스크와 색 패치를 캐시하고 polygon 영역(bbox)만 블렌딩
+# - 라벨 글자: (텍스트, 폰트 크기)별로 PIL 로 한 번만 래스터화한 coverage 마스크를 캐시
+# - bbox/중심점: OpenCV 로 직접 그림 (RGBA 변환 없음)
+# 색 상수는 읽기 쉽게 RGB 로 적고, 그릴 때 프레임 채널 순서(기본 BGR, vision/pipelines/decode.py 참고)에 맞춰 바꿈
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_CANDIDATES: List[str] = [
+    "/Library/Fonts/AppleGothic.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansKR-Regular.otf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/custom/NanumGothic.ttf",
+    "/usr/local/share/fonts/NanumGothic.ttf",
+]
+
+# 방향별 ROI 색 (RGB)
+ROI_COLORS: Dict[str, Tuple[int, int, int]] = {
+    "upstream": (16, 185, 129),  # 녹색톤
+    "downstream": (59, 130, 246),  # 파랑톤
+}
+ROI_ALPHA = 0.2
+LABEL_BG_ALPHA = 150 / 255.0
+LABEL_PADDING = 4
+CENTER_RADIUS = 4
+CENTER_COLOR = (255, 0, 0)
+CENTER_ALPHA = 150 / 255.0
+
+_FONTS: Dict[int, ImageFont.ImageFont] = {}
+_FONTS_LOCK = threading.Lock()
+
+
+def load_font(size: int) -> ImageFont.ImageFont:
+    """한글 폰트 로드 (크기별 캐시, 없으면 기본 폰트로 fallback)"""
+    with _FONTS_LOCK:
+        font = _FONTS.get(size)
+        if font is not None:
+            return font
+        for p in FONT_CANDIDATES:
+            try:
+                font = ImageFont.truetype(p, size)
+                break
+            except Exception:
+                continue
+        else:
+            print("[render] 한글 폰트를 찾지 못해 기본 폰트 사용")
+            font = ImageFont.load_default()
+        _FONTS[size] = font
+        return font
+
+
+def track_color(track_id: int) -> Tuple[int, int, int]:
+    """ID별 색상 (bbox 와 라벨의 ID 글자에 같이 사용, RGB)"""
+    return (50 + ((track_id * 73) % 205), 80 + ((track_id * 41) % 175), 120 + ((track_id * 29) % 135))
+
+
+class _Glyph:
+    """텍스트 한 조각의 coverage 마스크 (0~1) 와 textbbox 기준 위치"""
+
+    __slots__ = ("alpha", "left", "top", "right", "bottom")
+
+    def __init__(self, text: str, font: ImageFont.ImageFont) -> None:
+        left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), text, font=font)
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+        mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        self.alpha = np.asarray(mask, dtype=np.float32)[:, :, None] * (1.0 / 255.0)
+
+
+class _RoiLayer:
+    """polygon bbox 영역의 마스크와 같은 크기의 단색 패치"""
+
+    __slots__ = ("x0", "y0", "x1", "y1", "mask", "patch", "pts", "color")
+
+    def __init__(self, pts: np.ndarray, color: Tuple[int, int, int], height: int, width: int) -> None:
+        x, y, w, h = cv2.boundingRect(pts)
+        self.x0, self.y0 = max(0, x), max(0, y)
+        self.x1, self.y1 = min(width, x + w), min(height, y + h)
+        mask = np.zeros((max(0, self.y1 - self.y0), max(0, self.x1 - self.x0)), np.uint8)
+        if mask.size:
+            cv2.fillPoly(mask, [pts - np.array([self.x0, self.y0], dtype=pts.dtype)], 255)
+        self.mask = mask
+        self.patch = np.empty(mask.shape + (3,), np.uint8)
+        self.patch[:] = color
+        self.pts = pts
+        self.color = color
+
+
+class AnnotationRenderer:
+    """
+    render(img, detections, roi_dir) -> 시각화된 새 프레임
+    channel_order: 입력 프레임 채널 순서 ("bgr" 기본, "rgb"). 스레드 여러 개에서 같이 써도 됨
+    """
+
+    def __init__(
+        self,
+        font_size: int = 10,
+        max_glyphs: int = 8192,
+        max_roi_layers: int = 256,
+        channel_order: str = "bgr",
+    ) -> None:
+        if channel_order not in ("bgr", "rgb"):
+            raise ValueError(f"지원하지 않는 channel_order: {channel_order} (bgr, rgb)")
+        self._bgr = channel_order == "bgr"
+        self.font_size = font_size
+        self.max_glyphs = max_glyphs
+        self.max_roi_layers = max_roi_layers
+        self._glyphs: "OrderedDict[Tuple[str, int], _Glyph]" = OrderedDict()
+        self._roi_layers: "OrderedDict[tuple, _RoiLayer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = self._center_disk()
+
+    @staticmethod
+    def _center_disk() -> np.ndarray:
+        size = CENTER_RADIUS * 2 + 1
+        disk = np.zeros((size, size), np.uint8)
+        cv2.circle(disk, (CENTER_RADIUS, CENTER_RADIUS), CENTER_RADIUS, 1, -1)
+        return disk.astype(np.float32)[:, :, None] * CENTER_ALPHA
+
+    def _color(self, rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        return (rgb[2], rgb[1], rgb[0]) if self._bgr else rgb
+
+    # ---- 캐시 ----
+    def glyph(self, text: str, size: Optional[int] = None) -> _Glyph:
+        key = (text, size or self.font_size)
+        with self._lock:
+            g = self._glyphs.get(key)
+            if g is not None:
+                self._glyphs.move_to_end(key)
+                return g
+        g = _Glyph(text, load_font(key[1]))
+        with self._lock:
+            self._glyphs[key] = g
+            while len(self._glyphs) > self.max_glyphs:
+                self._glyphs.popitem(last=False)
+        return g
+
+    def roi_layer(self, pts: np.ndarray, color: Tuple[int, int, int], height: int, width: int) -> _RoiLayer:
+        # ROI 좌표 자체를 키에 넣어서 ROI 가 바뀌면 자동으로 새 레이어
+        key = (pts.tobytes(), color, height, width)
+        with self._lock:
+            layer = self._roi_layers.get(key)
+            if layer is not None:
+                self._roi_layers.move_to_end(key)
+                return layer
+        layer = _RoiLayer(np.asarray(pts, dtype=np.int32).reshape(-1, 1, 2), color, height, width)
+        with self._lock:
+            self._roi_layers[key] = layer
+            while len(self._roi_layers) > self.max_roi_layers:
+                self._roi_layers.popitem(last=False)
+        return layer
+
+    # ---- 그리기 ----
+    @staticmethod
+    def _tint_roi(vis: np.ndarray, layer: _RoiLayer) -> None:
+        if layer.mask.size:
+            region = vis[layer.y0:layer.y1, layer.x0:layer.x1]
+            blended = cv2.addWeighted(layer.patch, ROI_ALPHA, region, 1.0 - ROI_ALPHA, 0.0)
+            # uint8 마스크 copyTo 는 view 에 그대로 써짐 (np.copyto(where=) 보다 훨씬 빠름)
+            cv2.copyTo(blended, layer.mask, region)
+        cv2.polylines(vis, [layer.pts], True, layer.color, 2)
+
+    @staticmethod
+    def _blend(vis: np.ndarray, x: int, y: int, alpha: np.ndarray, color) -> None:
+        """vis[y:, x:] 위치에 alpha(HxWx1, 0~1) 만큼 color 를 섞음 (화면 밖은 잘라냄)"""
+        h, w = alpha.shape[:2]
+        H, W = vis.shape[:2]
+        x0, y0, x1, y1 = max(0, x), max(0, y), min(W, x + w), min(H, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        region = vis[y0:y1, x0:x1]
+        region[:] = (region * (1.0 - a) + np.asarray(color, np.float32) * a).astype(np.uint8)
+
+    def _label(self, vis: np.ndarray, x1: int, y1: int, x2: int, track_id: int, cls_text: str) -> None:
+        id_glyph = self.glyph(f"ID:{track_id} ") if track_id else None
+        cls_glyph = self.glyph(cls_text)
+        id_w = (id_glyph.right - id_glyph.left) if id_glyph else 0
+
+        first = id_glyph or cls_glyph
+        full_left = first.left
+        full_top = min(g.top for g in (id_glyph, cls_glyph) if g is not None)
+        full_bottom = max(g.bottom for g in (id_glyph, cls_glyph) if g is not None)
+        text_w = id_w + cls_glyph.right - full_left
+        text_h = full_bottom - full_top
+
+        box_w = text_w + LABEL_PADDING * 2
+        box_h = text_h + LABEL_PADDING * 2
+        box_left = int((x1 + x2) / 2.0 - box_w / 2)
+        box_top = max(0, y1 - box_h)
+
+        # 반투명 검정 배경 (PIL rectangle 은 끝 좌표 포함)
+        H, W = vis.shape[:2]
+        bx0, by0 = max(0, box_left), box_top
+        bx1, by1 = min(W, box_left + box_w + 1), min(H, box_top + box_h + 1)
+        if bx0 < bx1 and by0 < by1:
+            region = vis[by0:by1, bx0:bx1]
+            cv2.convertScaleAbs(region, dst=region, alpha=1.0 - LABEL_BG_ALPHA)
+
+        text_x = box_left + (box_w - text_w) / 2 - full_left
+        text_y = box_top + (box_h - text_h) / 2 - full_top
+        cursor_x = text_x
+        if id_glyph is not None:
+            self._blend(vis, int(round(cursor_x + id_glyph.left)), int(round(text_y + id_glyph.top)),
+                        id_glyph.alpha, self._color(track_color(track_id)))
+            cursor_x += id_w
+        self._blend(vis, int(round(cursor_x + cls_glyph.left)), int(round(text_y + cls_glyph.top)),
+                    cls_glyph.alpha, (255, 255, 255))
+
+    def render(
+        self,
+        img: np.ndarray,
+        detections: Sequence[dict],
+        roi_dir: Optional[Dict[str, Optional[np.ndarray]]] = None,
+    ) -> np.ndarray:
+        vis = img.copy()
+        h, w = vis.shape[:2]
+
+        if roi_dir:
+            for direction, color in ROI_COLORS.items():
+                pts = roi_dir.get(direction)
+                if pts is not None:
+                    self._tint_roi(vis, self.roi_layer(pts, self._color(color), h, w))
+
+        for d in detections:
+            x1, y1, x2, y2 = map(int, d["bbox"])
+            track_id = d.get("track_id") or 0
+            color = self._color(track_color(track_id))
+
+            # PIL rectangle(width=2) 과 같은 위치: 바깥 테두리 + 한 픽셀 안쪽
+            cv2.rectangle(vis, (x1, y1), (x2, y2), color, 1)
+            cv2.rectangle(vis, (x1 + 1, y1 + 1), (x2 - 1, y2 - 1), color, 1)
+
+            self._label(vis, x1, y1, x2, track_id, f"{d['cls']} {(float(d['conf']) * 100):.1f}%")
+
+            cx, cy = int((x1 + x2) / 2.0), int((y1 + y2) / 2.0)
+            self._blend(vis, cx - CENTER_RADIUS, cy - CENTER_RADIUS, self._disk, self._color(CENTER_COLOR))
+
+        return vis
+
+
+_DEFAULT_RENDERER = AnnotationRenderer()
+
+
+def draw_detections(
+    img: np.ndarray,
+    detections: Sequence[dict],
+    roi_dir: Optional[Dict[str, Optional[np.ndarray]]] = None,
+) -> np.ndarray:
+    return _DEFAULT_RENDERER.render(img, detections, roi_dir)
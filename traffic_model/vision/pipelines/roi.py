@@ -0,0 +1,128 @@
+# ROI(상행/하행 폴리곤) 판정을 numpy 벡터 연산으로 처리
+# 프레임마다 검출 박스 중심점 배열 전체를 한 번에 upstream/downstream/outside 로 분류한다.
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+OUTSIDE = 0
+UPSTREAM = 1
+DOWNSTREAM = 2
+
+_DIRECTION_LABEL = {UPSTREAM: "up", DOWNSTREAM: "down"}
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    points: (N, 2), polygon: (M, 2) -> (N,) bool
+    ray casting + 경계선 위의 점은 안쪽으로 취급 (cv2.pointPolygonTest(...) >= 0 과 동일)
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    poly = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    if len(pts) == 0 or len(poly) < 3:
+        return np.zeros(len(pts), dtype=bool)
+
+    px = pts[:, 0:1]  # (N, 1)
+    py = pts[:, 1:2]
+    x1 = poly[:, 0][None, :]  # (1, M)
+    y1 = poly[:, 1][None, :]
+    x2 = np.roll(poly[:, 0], -1)[None, :]
+    y2 = np.roll(poly[:, 1], -1)[None, :]
+
+    # 수평 반직선과 각 변의 교차 여부
+    crosses = (y1 > py) != (y2 > py)
+    dy = np.where(y2 == y1, 1.0, y2 - y1)
+    x_at = x1 + (py - y1) * (x2 - x1) / dy
+    inside = np.count_nonzero(crosses & (px < x_at), axis=1) % 2 == 1
+
+    # 변 위의 점 (외적 0 + 변의 bbox 안)
+    cross = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+    on_edge = (
+        (np.abs(cross) < 1e-9)
+        & (px >= np.minimum(x1, x2)) & (px <= np.maximum(x1, x2))
+        & (py >= np.minimum(y1, y2)) & (py <= np.maximum(y1, y2))
+    )
+    return inside | on_edge.any(axis=1)
+
+
+def bbox_centers(bboxes) -> np.ndarray:
+    b = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    return np.stack(((b[:, 0] + b[:, 2]) / 2.0, (b[:, 1] + b[:, 3]) / 2.0), axis=1)
+
+
+class _Polygon:
+    def __init__(self, pts: np.ndarray) -> None:
+        self.pts = pts
+        # 폴리곤 외곽 사각형으로 먼저 걸러서 대부분의 바깥 점은 변 검사를 생략
+        self.x_min, self.y_min = pts.min(axis=0)
+        self.x_max, self.y_max = pts.max(axis=0)
+
+    def contains(self, centers: np.ndarray) -> np.ndarray:
+        out = np.zeros(len(centers), dtype=bool)
+        cand = (
+            (centers[:, 0] >= self.x_min) & (centers[:, 0] <= self.x_max)
+            & (centers[:, 1] >= self.y_min) & (centers[:, 1] <= self.y_max)
+        )
+        if cand.any():
+            out[cand] = points_in_polygon(centers[cand], self.pts)
+        return out
+
+
+class DirectionalRoi:
+    """
+    cctv_id 하나의 상행/하행 ROI.
+    upstream/downstream 은 (M, 2) int32 폴리곤 또는 None
+    """
+
+    def __init__(self, upstream: Optional[np.ndarray], downstream: Optional[np.ndarray]) -> None:
+        self.upstream = upstream
+        self.downstream = downstream
+        self._up = _Polygon(upstream) if upstream is not None else None
+        self._down = _Polygon(downstream) if downstream is not None else None
+
+    @property
+    def defined(self) -> bool:
+        return self._up is not None or self._down is not None
+
+    @property
+    def polygons(self) -> Dict[str, Optional[np.ndarray]]:
+        return {"upstream": self.upstream, "downstream": self.downstream}
+
+    def classify(self, centers: np.ndarray) -> np.ndarray:
+        """(N, 2) 중심점 -> (N,) OUTSIDE/UPSTREAM/DOWNSTREAM (겹치면 상행 우선)"""
+        out = np.full(len(centers), OUTSIDE, dtype=np.int8)
+        if len(centers) == 0:
+            return out
+        if self._down is not None:
+            out[self._down.contains(centers)] = DOWNSTREAM
+        if self._up is not None:
+            out[self._up.contains(centers)] = UPSTREAM
+        return out
+
+    def filter_detections(self, preds: List[dict]) -> List[dict]:
+        """
+        - ROI 가 정의되어 있으면 ROI 밖 검출은 제외
+        - 방향별로 같은 track_id 는 한 번만 사용
+        - 남은 검출 dict 에 "direction" ("up"/"down"/None) 을 추가 (복사 없이 그대로 수정)
+        """
+        if not preds:
+            return []
+        if not self.defined:
+            for d in preds:
+                d["direction"] = None
+            return preds
+
+        codes = self.classify(bbox_centers([d["bbox"] for d in preds]))
+        seen = {UPSTREAM: set(), DOWNSTREAM: set()}
+        filtered: List[dict] = []
+        for d, code in zip(preds, codes.tolist()):
+            if code == OUTSIDE:
+                continue
+            track_id = d.get("track_id")
+            if track_id is not None:
+                if track_id in seen[code]:
+                    continue
+                seen[code].add(track_id)
+            d["direction"] = _DIRECTION_LABEL[code]
+            filtered.append(d)
+        return filtered